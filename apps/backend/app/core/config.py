@@ -17,6 +17,37 @@ class Settings(BaseSettings):
     # Redis for caching
     redis_url: str = "redis://localhost:6379"
     
+    # Portfolio brief
+    portfolio_brief_cache_ttl_seconds: int = 300
+    portfolio_brief_section_timeout_seconds: float = 0.25
+
+    # Portfolio snapshot retention
+    snapshot_daily_retention_days: int = 90
+    snapshot_weekly_retention_days: int = 730
+
+    # Venture capital
+    vc_summary_cache_ttl_seconds: int = 900
+    # In-process company search index (non-PostgreSQL) is rebuilt at least this often,
+    # so writes made by other processes show up
+    company_search_index_ttl_seconds: int = 60
+
+    # Daily pack HTTP caching (today's pack can still be refreshed)
+    daily_pack_max_age_seconds: int = 300
+    daily_pack_historical_max_age_seconds: int = 86400
+
+    # Upstream market data response cache (SQLite file, LRU-evicted beyond max bytes)
+    market_data_cache_path: str = ".cache/market_data.sqlite3"
+    market_data_cache_max_bytes: int = 64 * 1024 * 1024
+    market_data_cache_default_ttl_seconds: int = 300
+    # Interactive callers get an expired response this long past expiry while it is refreshed
+    market_data_stale_while_revalidate_seconds: int = 300
+
+    # Live portfolio valuation stream; symbols are polled no more often than this, and
+    # spaced out so all pollers together use at most this share of the quote api's quota
+    quote_poll_interval_seconds: float = 15.0
+    quote_poll_quota_share: float = 0.5
+    stream_heartbeat_seconds: float = 15.0
+
     # CORS
     cors_origins: list[str] = ["http://localhost:3000", "https://yourdomain.com"]
     
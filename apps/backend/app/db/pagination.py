@@ -0,0 +1,95 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import json
+from datetime import date
+from typing import Any, Callable, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+
+    Args:
+        sort_value: Value of the sort column (date or number)
+        row_id: Primary key of the row (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(sort_value, date):
+        sort_value = {"d": sort_value.isoformat()}
+    payload = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    The sort value must be a number, a string or an encoded date, and the
+    row id an integer, so a crafted cursor can't reach the SQL predicate.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(sort_value, dict):
+            sort_value = date.fromisoformat(sort_value["d"])
+        elif isinstance(sort_value, bool) or not isinstance(sort_value, (int, float, str)):
+            raise TypeError(f"unsupported sort value type: {type(sort_value).__name__}")
+        if isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise TypeError(f"unsupported row id type: {type(row_id).__name__}")
+        return sort_value, row_id
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_page(
+    query: Query,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    key: Callable[[Any], Tuple[Any, int]],
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of a query in descending (sort_column, id) order.
+
+    The cursor becomes a WHERE predicate on the sort key and LIMIT is pushed
+    into SQL (one extra row detects whether another page exists), so the cost
+    of a page depends on the page size, not on the position in the result set.
+
+    Args:
+        query: Base query (filters applied, no ordering or limit)
+        sort_column: Column or expression to sort by, descending
+        id_column: Primary key column used as the tie-breaker
+        limit: Page size
+        key: Returns the (sort value, id) of a fetched row
+        cursor: Cursor returned with the previous page, if any
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id),
+            )
+        )
+
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*key(rows[-1]))
+    return rows, next_cursor
+
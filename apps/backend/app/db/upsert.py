@@ -0,0 +1,77 @@
+"""Dialect-aware bulk upsert helpers."""
+
+from typing import Any, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    rows: list[dict],
+    conflict_columns: Iterable[str],
+    update_columns: Iterable[str],
+    increment_columns: Iterable[str] = (),
+    keep_existing_if_null: Iterable[str] = (),
+) -> int:
+    """
+    Insert rows in a single statement, updating existing rows on conflict.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite so a whole
+    batch costs one round trip instead of a SELECT + INSERT/UPDATE per row.
+    Rows sharing the same conflict key within a batch are collapsed (last wins,
+    increment columns are summed), since a single statement cannot update the
+    same row twice.
+
+    Args:
+        db: Database session
+        model: SQLAlchemy model class
+        rows: Column -> value dictionaries to write
+        conflict_columns: Columns of the unique constraint to upsert on
+        update_columns: Columns to overwrite when the row already exists
+        increment_columns: Columns added to the existing value (counters, totals)
+        keep_existing_if_null: Update columns that keep the existing value when
+            the new row has NULL (a field the source didn't provide)
+
+    Returns:
+        Number of rows written
+    """
+    conflict_columns = list(conflict_columns)
+    update_columns = list(update_columns)
+    increment_columns = list(increment_columns)
+    keep_existing_if_null = set(keep_existing_if_null)
+
+    deduped: dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row[c] for c in conflict_columns)
+        if increment_columns and key in deduped:
+            previous = deduped[key]
+            row = {**row, **{c: previous[c] + row[c] for c in increment_columns}}
+        deduped[key] = row
+    if not deduped:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert not supported for dialect: {dialect}")
+
+    # Parameters are passed executemany-style so the statement compiles once and is
+    # cached; the driver still sends multi-row VALUES batches (insertmanyvalues)
+    stmt = insert(model)
+    if update_columns or increment_columns:
+        set_ = {
+            c: func.coalesce(stmt.excluded[c], getattr(model, c)) if c in keep_existing_if_null else stmt.excluded[c]
+            for c in update_columns
+        }
+        set_.update({c: getattr(model, c) + stmt.excluded[c] for c in increment_columns})
+        stmt = stmt.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    db.execute(stmt, list(deduped.values()))
+    return len(deduped)
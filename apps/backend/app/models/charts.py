@@ -33,9 +33,9 @@ class ChartSignal(Base):
 
     __tablename__ = "chart_signals"
     __table_args__ = (
-        Index("idx_symbol_timeframe_date", "symbol", "timeframe", "date"),
+        Index("idx_symbol_timeframe_date", "symbol", "timeframe", "signal_date"),
         Index("idx_signal_type", "signal_type"),
-        UniqueConstraint("symbol", "timeframe", "date", name="uq_symbol_timeframe_date"),
+        UniqueConstraint("symbol", "timeframe", "signal_date", name="uq_symbol_timeframe_date"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
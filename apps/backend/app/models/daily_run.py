@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON, ForeignKey, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -21,4 +21,44 @@ class DailyRun(Base):
     earnings = relationship("Earnings", back_populates="daily_run")
     ipos = relationship("IPOs", back_populates="daily_run")
     charts = relationship("Chart", back_populates="daily_run")
-    content = relationship("Content", back_populates="daily_run")
\ No newline at end of file
+    content = relationship("Content", back_populates="daily_run")
+
+class DailyPack(Base):
+    """Serialized daily pack of a DailyRun (gzip-compressed JSON), served as-is."""
+
+    __tablename__ = "daily_packs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    daily_run_id = Column(Integer, ForeignKey("daily_runs.id"), unique=True, nullable=False)
+    date = Column(Date, unique=True, index=True, nullable=False)
+    etag = Column(String, nullable=False)  # Hash of the uncompressed JSON
+    body = Column(LargeBinary, nullable=False)  # gzip-compressed JSON document
+    size_bytes = Column(Integer, nullable=False)  # Uncompressed size
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class DailyRunSection(Base):
+    """Outcome and timing of one feeds.yaml section in a DailyRun build (the run's waterfall)."""
+
+    __tablename__ = "daily_run_sections"
+    __table_args__ = (
+        UniqueConstraint("daily_run_id", "section_id", name="uq_daily_run_section"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    daily_run_id = Column(Integer, ForeignKey("daily_runs.id"), nullable=False)
+    section_id = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # 'ok', 'failed', 'timeout', 'skipped'
+    error = Column(String)
+    wave = Column(Integer, nullable=False)  # Topological wave in the section DAG
+    depends_on = Column(JSON)  # Section ids whose output this section consumed
+    request_count = Column(Integer, nullable=False, default=0)
+    start_ms = Column(Float)  # Offset from the start of the build
+    duration_ms = Column(Float)
+    input_hash = Column(String)  # Hash of config, resolved requests and upstream output hashes
+    output_hash = Column(String)  # Hash of the normalized output (data and snapshot rows)
+    output = Column(JSON)  # Normalized data, fed to dependent sections that are not refetched
+    row_ids = Column(JSON)  # Snapshot rows written by the section: {table: [ids]}
+    fetched_at = Column(DateTime(timezone=True))  # Last successful fetch
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
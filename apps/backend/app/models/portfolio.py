@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, JSON, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, DateTime, Numeric, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -17,6 +17,9 @@ class UserPortfolio(Base):
 
 class PortfolioHolding(Base):
     __tablename__ = "portfolio_holdings"
+    __table_args__ = (
+        UniqueConstraint("portfolio_id", "symbol", name="uq_portfolio_holding"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     portfolio_id = Column(Integer, ForeignKey("user_portfolios.id"), nullable=False)
@@ -28,12 +31,29 @@ class PortfolioHolding(Base):
 
 class PortfolioSnapshot(Base):
     __tablename__ = "portfolio_snapshots"
+    __table_args__ = (
+        Index("idx_portfolio_snapshot_resolution", "portfolio_id", "resolution", "snapshot_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     portfolio_id = Column(Integer, ForeignKey("user_portfolios.id"), nullable=False)
     snapshot_date = Column(Date, nullable=False)
     total_value = Column(Numeric)
     total_gain_loss = Column(Numeric)
-    holdings_json = Column(JSON)
+    holdings_json = Column(JSON)  # Legacy inline holdings; moved to holdings_blob on compaction
+    holdings_hash = Column(String, ForeignKey("portfolio_holdings_blobs.content_hash"))
+    resolution = Column(SmallInteger, nullable=False, default=0, server_default="0")  # 0 daily, 1 week-end, 2 month-end
 
-    portfolio = relationship("UserPortfolio", back_populates="snapshots")
\ No newline at end of file
+    portfolio = relationship("UserPortfolio", back_populates="snapshots")
+    holdings_blob = relationship("PortfolioHoldingsBlob")
+
+
+class PortfolioHoldingsBlob(Base):
+    """Deduplicated holdings content shared by snapshots with identical holdings."""
+
+    __tablename__ = "portfolio_holdings_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True)  # sha256 of canonical JSON
+    holdings_json = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
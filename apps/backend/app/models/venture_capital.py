@@ -29,6 +29,7 @@ class PrivateCompany(Base):
     website = Column(String)
     funding_stage = Column(String, nullable=False)  # 'seed', 'series_a', 'series_b', 'series_c', 'series_d+', 'pre_ipo'
     status = Column(String, nullable=False)  # 'active', 'acquired', 'ipo', 'shut_down'
+    ipo_date = Column(Date)  # Listing date once status is 'ipo'
     is_ai_focused = Column(Boolean, default=False)  # Flag for AI companies
     is_space_tech = Column(Boolean, default=False)  # Flag for space tech
     last_valuation = Column(Numeric)  # Last known valuation in USD
@@ -53,6 +54,7 @@ class FundingRound(Base):
         Index("idx_company_id", "company_id"),
         Index("idx_round_type", "round_type"),
         Index("idx_announcement_date", "announcement_date"),
+        Index("idx_funding_round_date_id", "announcement_date", "id"),  # Keyset pagination
         UniqueConstraint("company_id", "round_type", "announcement_date", name="uq_funding_round"),
     )
 
@@ -70,6 +72,7 @@ class FundingRound(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     company = relationship("PrivateCompany", back_populates="funding_rounds")
+    participants = relationship("FundingRoundInvestor", back_populates="funding_round", cascade="all, delete-orphan")
 
 
 class CompanyInvestor(Base):
@@ -79,11 +82,13 @@ class CompanyInvestor(Base):
     __table_args__ = (
         Index("idx_company_id", "company_id"),
         Index("idx_investor_name", "investor_name"),
+        Index("idx_company_investor_investor_id", "investor_id"),
         UniqueConstraint("company_id", "investor_name", name="uq_company_investor"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("private_companies.id"), nullable=False)
+    investor_id = Column(Integer, ForeignKey("investors.id"))  # Resolved investor entity
     investor_name = Column(String, nullable=False)  # VC fund name
     investor_type = Column(String)  # 'venture_capital', 'angel', 'corporate', 'private_equity', 'strategic'
     stake_percentage = Column(Numeric)  # Ownership percentage
@@ -94,6 +99,7 @@ class CompanyInvestor(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     company = relationship("PrivateCompany", back_populates="investors")
+    investor = relationship("Investor", back_populates="holdings")
 
 
 class AcquisitionDeal(Base):
@@ -104,6 +110,8 @@ class AcquisitionDeal(Base):
         Index("idx_target_company_id", "target_company_id"),
         Index("idx_acquirer_name", "acquirer_name"),
         Index("idx_deal_date", "deal_date"),
+        Index("idx_acquisition_date_id", "deal_date", "id"),  # Keyset pagination
+        UniqueConstraint("target_company_id", "acquirer_name", "deal_date", name="uq_acquisition_deal"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -175,6 +183,8 @@ class IPOPipeline(Base):
     __table_args__ = (
         Index("idx_company_id", "company_id"),
         Index("idx_expected_year", "expected_ipo_year"),
+        Index("idx_ipo_pipeline_readiness_id", "readiness_score", "id"),  # Keyset pagination
+        Index("idx_ipo_pipeline_confidence_readiness", "confidence_level", "readiness_score", "id"),
         UniqueConstraint("company_id", name="uq_ipo_pipeline"),
     )
 
@@ -185,9 +195,148 @@ class IPOPipeline(Base):
     expected_valuation = Column(Numeric)  # Expected IPO valuation
     estimated_offering_size = Column(Numeric)  # Expected proceeds
     target_exchange = Column(String)  # 'NYSE', 'NASDAQ', 'LSE', etc.
-    readiness_score = Column(Integer)  # 1-10 likelihood
-    confidence_level = Column(String)  # 'high', 'medium', 'low'
+    readiness_score = Column(Integer, nullable=False, default=0, server_default="0")  # 1-10 likelihood (0 = not yet scored)
+    confidence_level = Column(String)  # 'high', 'medium', 'low' (derived by IPOReadinessService)
     underwriter = Column(String)  # Lead investment bank
     notes = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    company = relationship("PrivateCompany")
+
+
+class Investor(Base):
+    """Normalized investor entity (VC fund, angel, corporate) referenced by integer key."""
+
+    __tablename__ = "investors"
+    __table_args__ = (
+        Index("idx_investor_fund_id", "fund_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)  # Canonical display name
+    normalized_name = Column(String, nullable=False, unique=True)  # Lower-cased, legal suffixes stripped
+    investor_type = Column(String)  # 'venture_capital', 'angel', 'corporate', 'private_equity', 'strategic'
+    fund_id = Column(Integer, ForeignKey("venture_capital_funds.id"))  # Set when the investor is a tracked fund
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    fund = relationship("VentureCapitalFund")
+    aliases = relationship("InvestorAlias", back_populates="investor", cascade="all, delete-orphan")
+    holdings = relationship("CompanyInvestor", back_populates="investor")
+
+
+class InvestorAlias(Base):
+    """Alternative spellings and short names that resolve to an investor (e.g. 'a16z')."""
+
+    __tablename__ = "investor_aliases"
+    __table_args__ = (
+        Index("idx_investor_alias_investor_id", "investor_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    investor_id = Column(Integer, ForeignKey("investors.id"), nullable=False)
+    alias = Column(String, nullable=False)
+    normalized_alias = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    investor = relationship("Investor", back_populates="aliases")
+
+
+class FundingRoundInvestor(Base):
+    """Investors participating in a funding round (replaces the comma-separated list)."""
+
+    __tablename__ = "funding_round_investors"
+    __table_args__ = (
+        Index("idx_round_investor_investor_id", "investor_id"),
+        UniqueConstraint("funding_round_id", "investor_id", name="uq_funding_round_investor"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    funding_round_id = Column(Integer, ForeignKey("funding_rounds.id"), nullable=False)
+    investor_id = Column(Integer, ForeignKey("investors.id"), nullable=False)
+    is_lead = Column(Boolean, default=False)
+
+    funding_round = relationship("FundingRound", back_populates="participants")
+    investor = relationship("Investor")
+
+
+class CoInvestmentEdge(Base):
+    """Precomputed co-investment adjacency: investor pairs sharing portfolio companies."""
+
+    __tablename__ = "co_investment_edges"
+    __table_args__ = (
+        Index("idx_co_investment_investor_shared", "investor_id", "shared_companies"),
+        Index("idx_co_investment_shared", "shared_companies"),
+        UniqueConstraint("investor_id", "co_investor_id", name="uq_co_investment_edge"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    investor_id = Column(Integer, ForeignKey("investors.id"), nullable=False)
+    co_investor_id = Column(Integer, ForeignKey("investors.id"), nullable=False)
+    shared_companies = Column(Integer, nullable=False)  # Distinct companies both invested in
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CompanyValuationTrend(Base):
+    """Precomputed per-company valuation trend statistics (rebuilt in batch)."""
+
+    __tablename__ = "company_valuation_trends"
+    __table_args__ = (
+        Index("idx_valuation_trend_change", "latest_change_percent"),
+        Index("idx_valuation_trend_latest_date", "latest_valuation_date"),
+        UniqueConstraint("company_id", name="uq_company_valuation_trend"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("private_companies.id"), nullable=False)
+    valuation_count = Column(Integer, nullable=False)
+    first_valuation_date = Column(Date)
+    first_valuation = Column(Numeric)
+    latest_valuation_date = Column(Date)
+    latest_valuation = Column(Numeric)
+    previous_valuation = Column(Numeric)
+    max_valuation = Column(Numeric)
+    min_valuation = Column(Numeric)
+    latest_change_percent = Column(Numeric)  # Latest mark vs the one before it
+    total_change_percent = Column(Numeric)  # Latest mark vs the first one
+    trend = Column(String)  # 'up', 'down', 'flat'
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    company = relationship("PrivateCompany")
+
+
+class SectorValuationIndex(Base):
+    """Monthly chain-linked valuation index per sector (base 100)."""
+
+    __tablename__ = "sector_valuation_index"
+    __table_args__ = (
+        UniqueConstraint("sector", "period_date", name="uq_sector_valuation_index"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sector = Column(String, nullable=False)
+    period_date = Column(Date, nullable=False)  # First day of the month
+    index_value = Column(Numeric, nullable=False)
+    avg_change_percent = Column(Numeric)  # Mean mark-to-mark change of marks in the month
+    company_count = Column(Integer, nullable=False)  # Companies with a mark in the month
+
+
+class VCSectorStats(Base):
+    """Materialized company and funding totals per sector, stage and focus flags."""
+
+    __tablename__ = "vc_sector_stats"
+    __table_args__ = (
+        Index("idx_vc_sector_stats_stage", "funding_stage"),
+        UniqueConstraint("sector", "funding_stage", "is_ai_focused", "is_space_tech", name="uq_vc_sector_stats"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sector = Column(String, nullable=False)
+    funding_stage = Column(String, nullable=False)
+    is_ai_focused = Column(Boolean, nullable=False)
+    is_space_tech = Column(Boolean, nullable=False)
+    company_count = Column(Integer, nullable=False, default=0)
+    total_valuation = Column(Numeric, nullable=False, default=0)  # Sum of estimated_valuation
+    round_count = Column(Integer, nullable=False, default=0)
+    capital_raised = Column(Numeric, nullable=False, default=0)  # Sum of funding round amounts
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
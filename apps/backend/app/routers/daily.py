@@ -1,137 +1,167 @@
+import asyncio
+import gzip
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
-from app.models.daily_run import DailyRun
-from app.models.snapshots import IndexSnapshot, SectorSnapshot, CryptoAssetSnapshot, CryptoMarketSummary, MacroIndicatorSnapshot
-from app.models.news import News
-from app.models.earnings import Earnings
-from app.models.events import IPOs
-from app.models.content import Content
+from app.core.config import settings
+from app.models.daily_run import DailyRun, DailyRunSection
+from app.services.daily_pack_service import DailyPackService
+from app.services.daily_aggregation_service import build_daily_run, refresh_daily_run, format_waterfall
+from app.services.market_data import market_data_service
+from app.services.quote_stream_service import quote_hub
 
 router = APIRouter()
 
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip.
+
+    q-values are honoured ('gzip;q=0' refuses gzip); an explicit gzip entry
+    takes precedence over '*'.
+    """
+    qualities = {}
+    for entry in accept_encoding.lower().split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
 @router.get("/")
 async def get_daily_markets(
+    request: Request,
     target_date: Optional[date] = None,
     db: Session = Depends(get_db)
 ):
     """
     Get daily markets data for today or specified date.
     Returns the complete daily pack including market data, news, earnings, etc.
+
+    The pack is precomputed when the run is generated and served from storage
+    as gzip-compressed JSON with an ETag; If-None-Match revalidates to a 304.
     """
+    is_today = target_date is None or target_date == date.today()
     if target_date is None:
         target_date = date.today()
 
-    # Get the daily run for the target date
+    pack = DailyPackService(db).get_pack(target_date)
+    if pack is None:
+        raise HTTPException(status_code=404, detail=f"No data available for {target_date}")
+
+    etag, body = pack
+    max_age = settings.daily_pack_max_age_seconds if is_today else settings.daily_pack_historical_max_age_seconds
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body = gzip.decompress(body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/build")
+async def build_daily(target_date: Optional[date] = None):
+    """
+    Build (or rebuild) the daily run from feeds.yaml.
+
+    All enabled sections are fetched concurrently; the run, its snapshot rows
+    and its daily pack are written in one transaction. Returns per-section
+    status and timings.
+    """
+    return await build_daily_run(target_date)
+
+@router.post("/runs/{target_date}/refresh")
+async def refresh_daily(
+    target_date: date,
+    sections: Optional[list[str]] = Query(None),
+):
+    """
+    Incrementally refresh a day's run.
+
+    Refetches only failed, missing, stale (past refresh_ttl_minutes) or
+    changed-input sections, plus any named in `sections`; snapshot rows are
+    replaced only for sections whose output actually changed.
+    """
+    try:
+        return await refresh_daily_run(target_date, sections=sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/runs/{target_date}/waterfall")
+async def get_run_waterfall(target_date: date, db: Session = Depends(get_db)):
+    """
+    Per-section timing waterfall of a day's build.
+
+    Returns each section's status, DAG wave, dependencies, start offset and
+    duration (ordered by start), plus the same data as a text chart.
+    """
     daily_run = db.query(DailyRun).filter(DailyRun.date == target_date).first()
     if not daily_run:
         raise HTTPException(status_code=404, detail=f"No data available for {target_date}")
 
-    # Fetch related data
-    indices = db.query(IndexSnapshot).filter(IndexSnapshot.daily_run_id == daily_run.id).all()
-    sectors = db.query(SectorSnapshot).filter(SectorSnapshot.daily_run_id == daily_run.id).all()
-    crypto_assets = db.query(CryptoAssetSnapshot).filter(CryptoAssetSnapshot.daily_run_id == daily_run.id).all()
-    crypto_summary = db.query(CryptoMarketSummary).filter(CryptoMarketSummary.daily_run_id == daily_run.id).first()
-    macro_indicators = db.query(MacroIndicatorSnapshot).filter(MacroIndicatorSnapshot.daily_run_id == daily_run.id).all()
-    news = db.query(News).filter(News.daily_run_id == daily_run.id).all()
-    earnings = db.query(Earnings).filter(Earnings.daily_run_id == daily_run.id).all()
-    ipos = db.query(IPOs).filter(IPOs.daily_run_id == daily_run.id).all()
-    content = db.query(Content).filter(Content.daily_run_id == daily_run.id).all()
-
-    # Structure the response
-    response = {
-        "date": daily_run.date,
-        "market_data": {
-            "indices": [
-                {
-                    "symbol": idx.symbol,
-                    "name": idx.name,
-                    "value": idx.value,
-                    "change": idx.change,
-                    "change_percent": idx.change_percent,
-                    "volume": idx.volume
-                } for idx in indices
-            ],
-            "sectors": [
-                {
-                    "name": sector.name,
-                    "symbol": sector.symbol,
-                    "change_percent": sector.change_percent
-                } for sector in sectors
-            ],
-            "crypto": {
-                "assets": [
-                    {
-                        "name": asset.name,
-                        "symbol": asset.symbol,
-                        "price_usd": asset.price_usd,
-                        "price_aud": asset.price_aud,
-                        "change_24h": asset.change_24h,
-                        "market_cap": asset.market_cap
-                    } for asset in crypto_assets
-                ],
-                "summary": {
-                    "total_market_cap": crypto_summary.total_market_cap if crypto_summary else None,
-                    "total_volume": crypto_summary.total_volume if crypto_summary else None,
-                    "market_cap_change_percentage_24h_usd": crypto_summary.market_cap_change_percentage_24h_usd if crypto_summary else None,
-                    "fear_greed_index": crypto_summary.fear_greed_index if crypto_summary else None
-                } if crypto_summary else {}
-            }
-        },
-        "macro_data": {
-            "indicators": [
-                {
-                    "name": indicator.name,
-                    "value": indicator.value,
-                    "unit": indicator.unit,
-                    "change": indicator.change
-                } for indicator in macro_indicators
-            ]
-        },
-        "news": [
-            {
-                "category": article.category,
-                "title": article.title,
-                "summary": article.summary,
-                "url": article.url,
-                "source": article.source,
-                "published_at": article.published_at
-            } for article in news
-        ],
-        "earnings": [
-            {
-                "symbol": earning.symbol,
-                "company_name": earning.company_name,
-                "eps_estimate": earning.eps_estimate,
-                "eps_actual": earning.eps_actual,
-                "revenue_estimate": earning.revenue_estimate,
-                "revenue_actual": earning.revenue_actual,
-                "date": earning.date
-            } for earning in earnings
-        ],
-        "ipos": [
-            {
-                "symbol": ipo.symbol,
-                "company_name": ipo.company_name,
-                "ipo_date": ipo.ipo_date,
-                "price_range": ipo.price_range,
-                "shares_offered": ipo.shares_offered
-            } for ipo in ipos
-        ],
-        "content": [
-            {
-                "type": item.type,
-                "content": item.content,
-                "generated_by": item.generated_by
-            } for item in content
-        ]
+    rows = db.query(DailyRunSection).filter(
+        DailyRunSection.daily_run_id == daily_run.id
+    ).order_by(DailyRunSection.start_ms, DailyRunSection.section_id).all()
+
+    sections = [
+        {
+            "id": row.section_id,
+            "status": row.status,
+            "error": row.error,
+            "wave": row.wave,
+            "depends_on": row.depends_on or [],
+            "requests": row.request_count,
+            "start_ms": row.start_ms or 0.0,
+            "duration_ms": row.duration_ms or 0.0,
+        }
+        for row in rows
+    ]
+    return {
+        "date": target_date,
+        "daily_run_id": daily_run.id,
+        "total_ms": max((s["start_ms"] + s["duration_ms"] for s in sections), default=0.0),
+        "sections": sections,
+        "chart": format_waterfall(sections),
     }
 
-    return response
+@router.get("/upstreams/stats")
+async def get_upstream_stats():
+    """
+    Upstream market data traffic metrics.
+
+    Response cache hits, misses, stale lookups, revalidations and size,
+    single-flight calls saved by coalescing identical in-flight requests,
+    per-client rate limit headroom (minute / day tokens, queue) and
+    circuit breaker state (stale responses served, short-circuited calls),
+    plus the live quote stream's polled symbols, streams and poll interval.
+    """
+    stats = await asyncio.to_thread(market_data_service.stats)
+    return {**stats, "quote_stream": quote_hub.stats()}
 
 @router.get("/health")
 async def daily_health():
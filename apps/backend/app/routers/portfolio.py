@@ -1,14 +1,21 @@
+import asyncio
+import json
 from datetime import date
 from decimal import Decimal
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.db.session import SessionLocal
 from app.models.portfolio import UserPortfolio, PortfolioHolding, PortfolioSnapshot
 from app.services.portfolio_service import PortfolioService
+from app.services.portfolio_brief_service import build_portfolio_brief, invalidate_portfolio_brief
+from app.services.holdings_import_service import HoldingsImportService
+from app.services.quote_stream_service import stream_portfolio_valuations
 
 
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
@@ -36,6 +43,18 @@ class HoldingUpdate(BaseModel):
     avg_buy_price: Optional[Decimal] = None
 
 
+class PortfolioBriefRequest(BaseModel):
+    portfolio_id: int
+    news_days: int = 7
+    refresh: bool = False
+
+
+class SnapshotCompactionRequest(BaseModel):
+    portfolio_id: Optional[int] = None
+    daily_retention_days: Optional[int] = None
+    weekly_retention_days: Optional[int] = None
+
+
 class PortfolioResponse(BaseModel):
     id: int
     user_id: str
@@ -88,6 +107,26 @@ async def create_portfolio(
     }
 
 
+@router.post("/snapshots/compact")
+async def compact_portfolio_snapshots(
+    request: SnapshotCompactionRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Apply tiered retention to portfolio snapshots.
+
+    Keeps daily snapshots for the recent window, week-end snapshots beyond it
+    and month-end snapshots beyond the weekly window, and deduplicates
+    unchanged holdings by content hash.
+    """
+    service = PortfolioService(db)
+    return service.compact_portfolio_snapshots(
+        request.portfolio_id,
+        request.daily_retention_days,
+        request.weekly_retention_days,
+    )
+
+
 @router.get("/{user_id}")
 async def get_user_portfolios(
     user_id: str,
@@ -168,6 +207,7 @@ async def add_holding(
     )
     db.add(new_holding)
     db.commit()
+    invalidate_portfolio_brief(portfolio_id)
 
     return {
         "id": new_holding.id,
@@ -177,6 +217,43 @@ async def add_holding(
     }
 
 
+@router.post("/{portfolio_id}/holdings/import")
+async def import_holdings(
+    portfolio_id: int,
+    request: Request,
+    format: Optional[str] = Query(None, regex="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import holdings from a CSV or NDJSON broker export.
+
+    The request body is parsed as it streams in and holdings are upserted in
+    batches on (portfolio_id, symbol), so existing positions are overwritten.
+    The format is taken from the 'format' query parameter, or the Content-Type
+    header (text/csv or application/x-ndjson) when omitted.
+
+    Returns:
+    - Rows read and holdings upserted
+    - Per-line errors for rows that failed validation
+    """
+    portfolio = db.query(UserPortfolio).filter(
+        UserPortfolio.id == portfolio_id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    service = HoldingsImportService(db)
+    report = await service.import_stream(portfolio_id, request.stream(), format)
+    invalidate_portfolio_brief(portfolio_id)
+
+    return report
+
+
 @router.put("/{portfolio_id}/holdings/{holding_id}")
 async def update_holding(
     portfolio_id: int,
@@ -199,6 +276,7 @@ async def update_holding(
         holding.avg_buy_price = update.avg_buy_price
 
     db.commit()
+    invalidate_portfolio_brief(portfolio_id)
     return {
         "id": holding.id,
         "symbol": holding.symbol,
@@ -224,6 +302,7 @@ async def delete_holding(
 
     db.delete(holding)
     db.commit()
+    invalidate_portfolio_brief(portfolio_id)
     return {"status": "deleted"}
 
 
@@ -231,9 +310,17 @@ async def delete_holding(
 async def get_portfolio_performance(
     portfolio_id: int,
     days: int = 30,
+    mode: str = Query("auto", regex="^(snapshots|reconstructed|auto)$"),
     db: Session = Depends(get_db)
 ):
-    """Get portfolio performance metrics and historical data."""
+    """
+    Get portfolio performance metrics and historical data.
+
+    Modes:
+    - snapshots: stored daily snapshots only
+    - reconstructed: rebuild every day from holdings x stored closes
+    - auto: snapshots where available, reconstructed for uncovered days
+    """
     portfolio = db.query(UserPortfolio).filter(
         UserPortfolio.id == portfolio_id
     ).first()
@@ -242,7 +329,7 @@ async def get_portfolio_performance(
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
     service = PortfolioService(db)
-    performance = service.get_portfolio_performance(portfolio_id, days)
+    performance = service.get_portfolio_performance(portfolio_id, days, mode)
 
     return performance
 
@@ -268,20 +355,111 @@ async def get_portfolio_relevant_news(
     return {"news": news}
 
 
+def _load_stream_holdings(portfolio_id: int) -> list[PortfolioHolding]:
+    """
+    Load holdings for a valuation stream, raising 404 for unknown portfolios.
+
+    Streams stay open for as long as the client listens, so holdings are read
+    with a short-lived session that is closed before streaming starts instead
+    of a request-scoped one that would pin a pool connection.
+    """
+    db = SessionLocal()
+    try:
+        portfolio = db.query(UserPortfolio).filter(
+            UserPortfolio.id == portfolio_id
+        ).first()
+
+        if not portfolio:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+
+        return db.query(PortfolioHolding).filter(
+            PortfolioHolding.portfolio_id == portfolio_id
+        ).all()
+    finally:
+        db.close()
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Drain client messages until the WebSocket disconnects."""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.get("/{portfolio_id}/stream")
+async def stream_portfolio_valuation(portfolio_id: int):
+    """
+    Stream live portfolio valuations as Server-Sent Events.
+
+    A 'valuation' event with revalued totals and per-holding P&L is pushed
+    whenever a held symbol's quote changes; quotes that arrive while a slow
+    client is still reading are coalesced into the next event.
+    """
+    holdings = _load_stream_holdings(portfolio_id)
+
+    async def event_stream():
+        async for update in stream_portfolio_valuations(portfolio_id, holdings):
+            if update is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: valuation\ndata: {json.dumps(update)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{portfolio_id}/ws")
+async def portfolio_valuation_websocket(websocket: WebSocket, portfolio_id: int):
+    """
+    Push live portfolio valuations over a WebSocket (same payloads as /stream).
+
+    The stream is checked for a client disconnect on every update and
+    heartbeat, so a closed socket releases its quote subscription within
+    one heartbeat interval even when no quotes are changing.
+    """
+    try:
+        holdings = _load_stream_holdings(portfolio_id)
+    except HTTPException:
+        await websocket.close(code=4404)
+        return
+
+    await websocket.accept()
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    updates = stream_portfolio_valuations(portfolio_id, holdings)
+    try:
+        async for update in updates:
+            if disconnected.done():
+                break
+            if update is not None:
+                await websocket.send_json(update)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        # Unsubscribes from the quote hub, stopping its poller when idle
+        await updates.aclose()
+
+
 @router.post("/brief")
-async def portfolio_brief(request: dict):
-    """Generate portfolio analysis and narrative."""
-    # Placeholder implementation
-    return {
-        "allocation": {},
-        "stats": {},
-        "risk_flags": [],
-        "relevant_news": [],
-        "macro_context": [],
-        "narrative": {
-            "summary": "",
-            "risk": "",
-            "macro": "",
-            "actions": ""
-        }
-    }
\ No newline at end of file
+async def portfolio_brief(
+    request: PortfolioBriefRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate portfolio analysis and narrative.
+
+    Sections are built concurrently with per-section deadlines; any section
+    that misses its deadline is listed in 'partial_sections'.
+    """
+    portfolio = db.query(UserPortfolio).filter(
+        UserPortfolio.id == request.portfolio_id
+    ).first()
+
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+
+    return await build_portfolio_brief(
+        request.portfolio_id, request.news_days, request.refresh
+    )
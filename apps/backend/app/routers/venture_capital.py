@@ -3,11 +3,19 @@
 from datetime import date, datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.services.venture_capital_service import VentureCapitalService
+from app.services.vc_summary_service import get_vc_market_summary
+from app.services.investor_graph_service import InvestorGraphService
+from app.services.company_search_service import CompanySearchService
+from app.services.fund_returns_service import FundReturnsService
+from app.services.vc_ingest_service import DATASETS, VCIngestService
+from app.services.valuation_trend_service import ValuationTrendService
+from app.services.vc_sector_stats_service import VCSectorStatsService
+from app.services.ipo_readiness_service import IPOReadinessService
 
 router = APIRouter(prefix="/venture-capital", tags=["venture-capital"])
 
@@ -43,6 +51,7 @@ async def get_vc_fund_portfolio(
 async def get_ipo_pipeline(
     confidence: Optional[str] = Query(None, regex="^(high|medium|low)$"),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -50,7 +59,8 @@ async def get_ipo_pipeline(
 
     Query Parameters:
     - confidence: Filter by 'high', 'medium', or 'low' (optional)
-    - limit: Maximum number of companies to return (default 50)
+    - limit: Page size (default 50)
+    - cursor: next_cursor from the previous page (optional)
 
     Returns:
     - Current valuation and expected IPO valuation
@@ -60,10 +70,12 @@ async def get_ipo_pipeline(
     - Lead underwriter
     """
     service = VentureCapitalService(db)
-    result = service.get_ipo_pipeline(confidence_level=confidence)
+    try:
+        result = service.get_ipo_pipeline(confidence_level=confidence, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Apply limit
-    pipeline = result.get("pipeline", [])[:limit]
+    pipeline = result["pipeline"]
 
     return {
         "timestamp": datetime.now().isoformat(),
@@ -73,13 +85,34 @@ async def get_ipo_pipeline(
         "low_confidence": result["low_confidence"],
         "limit": limit,
         "returned": len(pipeline),
+        "next_cursor": result["next_cursor"],
         "pipeline": pipeline,
     }
 
 
+@router.post("/ipo-pipeline/score")
+async def score_ipo_pipeline(db: Session = Depends(get_db)):
+    """
+    Recompute readiness scores and confidence levels for every IPO candidate.
+
+    Scores (1-10) combine funding recency, valuation trajectory, revenue
+    estimate, round sizes and recent IPO activity in the company's sector.
+    Run after valuation trends are recomputed.
+    """
+    service = IPOReadinessService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.score_pipeline()
+    }
+
+
 @router.get("/landscape/{sector}")
 async def get_sector_landscape(
     sector: str,
+    include_companies: bool = Query(False),
+    companies_limit: int = Query(10, ge=1, le=100),
+    stage: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -93,13 +126,27 @@ async def get_sector_landscape(
     - space: Space technology and commercial space
     - healthcare, proptech, etc.
 
+    Query Parameters:
+    - include_companies: Add a page of companies to each stage (default false)
+    - companies_limit: Companies per stage page (default 10)
+    - stage: Restrict to one funding stage (optional)
+    - cursor: A stage's next_cursor, used together with stage (optional)
+
     Returns:
     - Total companies and total valuation
-    - Companies organized by funding stage
-    - Average valuation per stage
+    - Company count, total and average valuation per funding stage
     """
     service = VentureCapitalService(db)
-    result = service.get_sector_overview(sector)
+    try:
+        result = service.get_sector_overview(
+            sector,
+            include_companies=include_companies,
+            companies_limit=companies_limit,
+            stage=stage,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
@@ -111,38 +158,78 @@ async def get_sector_landscape(
 
 
 @router.get("/ai-landscape")
-async def get_ai_startup_landscape(db: Session = Depends(get_db)):
+async def get_ai_startup_landscape(
+    include_companies: bool = Query(False),
+    companies_limit: int = Query(10, ge=1, le=100),
+    stage: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
     """
     Get overview of AI-focused companies by funding stage.
 
+    Query Parameters:
+    - include_companies: Add a page of companies to each stage (default false)
+    - companies_limit: Companies per stage page (default 10)
+    - stage: Restrict to one funding stage (optional)
+    - cursor: A stage's next_cursor, used together with stage (optional)
+
     Returns:
     - Total AI companies and total valuation
-    - Companies grouped by funding stage (seed to pre-IPO)
-    - Company count and average valuation per stage
-    - Space tech flag for AI-enabled aerospace companies
+    - Company count, total and average valuation per funding stage (seed to pre-IPO)
     """
     service = VentureCapitalService(db)
+    try:
+        result = service.get_ai_startup_landscape(
+            include_companies=include_companies,
+            companies_limit=companies_limit,
+            stage=stage,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return {
         "timestamp": datetime.now().isoformat(),
-        **service.get_ai_startup_landscape()
+        **result
     }
 
 
 @router.get("/space-tech-landscape")
-async def get_space_tech_landscape(db: Session = Depends(get_db)):
+async def get_space_tech_landscape(
+    include_companies: bool = Query(False),
+    companies_limit: int = Query(10, ge=1, le=100),
+    stage: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
     """
     Get overview of space technology companies.
 
+    Query Parameters:
+    - include_companies: Add a page of companies to each stage (default false)
+    - companies_limit: Companies per stage page (default 10)
+    - stage: Restrict to one funding stage (optional)
+    - cursor: A stage's next_cursor, used together with stage (optional)
+
     Returns:
     - Total space tech companies and valuation
-    - Companies grouped by funding stage
-    - Recent funding activity
-    - Readiness for space market
+    - Company count, total and average valuation per funding stage
     """
     service = VentureCapitalService(db)
+    try:
+        result = service.get_space_tech_landscape(
+            include_companies=include_companies,
+            companies_limit=companies_limit,
+            stage=stage,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return {
         "timestamp": datetime.now().isoformat(),
-        **service.get_space_tech_landscape()
+        **result
     }
 
 
@@ -150,6 +237,7 @@ async def get_space_tech_landscape(db: Session = Depends(get_db)):
 async def track_acquisition_activity(
     days: int = Query(90, ge=1, le=365),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -157,7 +245,8 @@ async def track_acquisition_activity(
 
     Query Parameters:
     - days: Number of days to look back (default 90)
-    - limit: Maximum number of deals to return (default 50)
+    - limit: Page size (default 50)
+    - cursor: next_cursor from the previous page (optional)
 
     Returns:
     - Deal details (acquirer, target, price, status)
@@ -166,9 +255,12 @@ async def track_acquisition_activity(
     - Total deal value in period
     """
     service = VentureCapitalService(db)
-    result = service.track_acquisition_activity(days=days)
+    try:
+        result = service.track_acquisition_activity(days=days, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    deals = result.get("deals", [])[:limit]
+    deals = result["deals"]
 
     return {
         "timestamp": datetime.now().isoformat(),
@@ -177,6 +269,7 @@ async def track_acquisition_activity(
         "total_deal_value": result["total_deal_value"],
         "limit": limit,
         "returned": len(deals),
+        "next_cursor": result["next_cursor"],
         "deals": deals,
     }
 
@@ -185,6 +278,7 @@ async def track_acquisition_activity(
 async def get_recent_funding_rounds(
     days: int = Query(90, ge=1, le=365),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -192,7 +286,8 @@ async def get_recent_funding_rounds(
 
     Query Parameters:
     - days: Number of days to look back (default 90)
-    - limit: Maximum number of rounds to return (default 50)
+    - limit: Page size (default 50)
+    - cursor: next_cursor from the previous page (optional)
 
     Returns:
     - Company information and sector
@@ -202,9 +297,12 @@ async def get_recent_funding_rounds(
     - Announcement date
     """
     service = VentureCapitalService(db)
-    result = service.get_recent_funding_rounds(days=days)
+    try:
+        result = service.get_recent_funding_rounds(days=days, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    rounds = result.get("rounds", [])[:limit]
+    rounds = result["rounds"]
 
     return {
         "timestamp": datetime.now().isoformat(),
@@ -214,10 +312,69 @@ async def get_recent_funding_rounds(
         "avg_round_size": result["avg_round_size"],
         "limit": limit,
         "returned": len(rounds),
+        "next_cursor": result["next_cursor"],
         "rounds": rounds,
     }
 
 
+@router.get("/valuations/movers")
+async def get_valuation_movers(
+    direction: str = Query("up", regex="^(up|down)$"),
+    days: int = Query(365, ge=1, le=3650),
+    limit: int = Query(20, ge=1, le=100),
+    sector: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the biggest valuation markups ('up') or markdowns ('down').
+
+    Ranks companies by the change between their two most recent valuation
+    marks, considering only companies marked within the past N days. Served
+    from precomputed trends (see POST /valuations/recompute).
+    """
+    service = ValuationTrendService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.get_valuation_movers(direction=direction, days=days, limit=limit, sector=sector)
+    }
+
+
+@router.get("/valuations/index/{sector}")
+async def get_sector_valuation_index(
+    sector: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the monthly chain-linked valuation index for a sector (base 100).
+
+    Each month moves the index by the average mark-to-mark change of the
+    sector's companies that were revalued that month.
+    """
+    service = ValuationTrendService(db)
+    result = service.get_sector_valuation_index(sector)
+
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **result
+    }
+
+
+@router.post("/valuations/recompute")
+async def recompute_valuation_trends(db: Session = Depends(get_db)):
+    """
+    Recompute valuation changes, per-company trends and sector indexes in one
+    batch pass over all valuation marks.
+    """
+    service = ValuationTrendService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.recompute_valuation_trends()
+    }
+
+
 @router.get("/valuations/{company_id}")
 async def track_valuation_trends(
     company_id: int,
@@ -259,6 +416,7 @@ async def calculate_fund_returns(
     - Current portfolio value
     - Multiple on Invested Capital (MOIC)
     - Unrealized gains
+    - Cash-flow IRR, TVPI, DPI and RVPI
     - Breakdown of exited vs active companies
     """
     service = VentureCapitalService(db)
@@ -273,6 +431,29 @@ async def calculate_fund_returns(
     }
 
 
+@router.get("/funds/returns")
+async def get_fund_leaderboard(
+    sort_by: str = Query("irr", regex="^(irr|tvpi|dpi|rvpi)$"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Rank all VC funds by a cash-flow return metric.
+
+    Query Parameters:
+    - sort_by: 'irr', 'tvpi', 'dpi' or 'rvpi' (default 'irr')
+    - limit: Maximum number of funds to return (default 20)
+
+    All funds are evaluated in one batch (bulk queries plus a vectorized IRR
+    solve), not one fund at a time.
+    """
+    service = FundReturnsService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.get_fund_leaderboard(sort_by=sort_by, limit=limit)
+    }
+
+
 @router.get("/investors")
 async def get_top_investors(
     limit: int = Query(20, ge=1, le=100),
@@ -299,6 +480,163 @@ async def get_top_investors(
     }
 
 
+@router.get("/investors/resolve")
+async def resolve_investor(
+    name: str = Query(..., min_length=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Resolve an investor name or alias to its investor entity.
+
+    Matching ignores case, punctuation and legal suffixes (LLC, LP, Inc, ...).
+    """
+    service = InvestorGraphService(db)
+    result = service.resolve_investor(name)
+
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+
+    return result
+
+
+@router.post("/investors/{investor_id}/aliases")
+async def add_investor_alias(
+    investor_id: int,
+    alias: str = Query(..., min_length=1),
+    db: Session = Depends(get_db)
+):
+    """Register an alternative name (e.g. 'a16z') for an investor."""
+    service = InvestorGraphService(db)
+    result = service.add_investor_alias(investor_id, alias)
+
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+    return result
+
+
+@router.get("/investors/{investor_id}/co-investors")
+async def get_co_investors(
+    investor_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the investors that most often co-invest with an investor.
+
+    Served from the precomputed co-investment index, ranked by the number of
+    shared portfolio companies.
+    """
+    service = InvestorGraphService(db)
+    result = service.get_co_investors(investor_id, limit=limit)
+
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **result
+    }
+
+
+@router.get("/syndicates")
+async def get_top_syndicates(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Get the investor pairs with the most shared portfolio companies."""
+    service = InvestorGraphService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.get_top_syndicates(limit=limit)
+    }
+
+
+@router.post("/investors/sync")
+async def sync_investor_entities(db: Session = Depends(get_db)):
+    """
+    Resolve free-text investor names into investor entities and rebuild the
+    co-investment index.
+    """
+    service = InvestorGraphService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.sync_investor_entities()
+    }
+
+
+@router.post("/ingest/{dataset}")
+async def ingest_vc_dataset(
+    dataset: str,
+    request: Request,
+    format: Optional[str] = Query(None, regex="^(csv|jsonl)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk load a CSV or JSONL export of VC data.
+
+    Datasets: companies, funding_rounds, company_investors, valuations,
+    acquisitions. The body is parsed as it streams in and rows are upserted
+    in batches on each table's unique key; company references are given by
+    company_name (or company_id). Load companies first.
+
+    The format is taken from the 'format' query parameter, or the
+    Content-Type header (text/csv or application/x-ndjson) when omitted.
+
+    Returns:
+    - Rows read, rows upserted and batches written
+    - Per-line errors for rows that failed validation
+    """
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "jsonl" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    service = VCIngestService(db)
+    report = await service.ingest_stream(dataset, request.stream(), format)
+
+    if dataset == "valuations" and report["rows_upserted"]:
+        report["valuation_trends"] = ValuationTrendService(db).recompute_valuation_trends()
+
+    return report
+
+
+@router.post("/sector-stats/rebuild")
+async def rebuild_sector_stats(db: Session = Depends(get_db)):
+    """
+    Rebuild the materialized per-sector/stage statistics from scratch.
+
+    The statistics are kept current on ordinary writes; use this after
+    out-of-band loads or to repair drift.
+    """
+    service = VCSectorStatsService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.rebuild()
+    }
+
+
+@router.get("/companies/search")
+async def search_companies(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """
+    Typeahead search over private companies.
+
+    Matches name prefixes and misspelled names (trigram similarity), plus
+    subsector and description text, ranked by relevance.
+    """
+    service = CompanySearchService(db)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **service.search_companies(q, limit=limit)
+    }
+
+
 @router.get("/companies/{company_id}")
 async def get_company_details(
     company_id: int,
@@ -316,9 +654,14 @@ async def get_company_details(
     - Acquisition details (if exited)
     - IPO pipeline status (if applicable)
     """
+    from sqlalchemy.orm import selectinload
+
     from app.models.venture_capital import PrivateCompany
 
-    company = db.query(PrivateCompany).filter(
+    company = db.query(PrivateCompany).options(
+        selectinload(PrivateCompany.investors),
+        selectinload(PrivateCompany.funding_rounds),
+    ).filter(
         PrivateCompany.id == company_id
     ).first()
 
@@ -385,12 +728,13 @@ async def get_company_details(
 
 
 @router.get("/summary")
-async def get_vc_market_summary(
-    db: Session = Depends(get_db)
-):
+async def get_vc_market_summary_endpoint():
     """
     Get high-level summary of the VC and startup ecosystem.
 
+    Figures come from SQL aggregates run concurrently and are cached until the
+    next committed write to any VC table.
+
     Returns:
     - Total companies tracked
     - Total capital invested
@@ -399,38 +743,7 @@ async def get_vc_market_summary(
     - IPO pipeline status
     - Key sector metrics
     """
-    service = VentureCapitalService(db)
-
-    # Aggregate data from multiple queries
-    ai_landscape = service.get_ai_startup_landscape()
-    space_landscape = service.get_space_tech_landscape()
-    recent_funding = service.get_recent_funding_rounds(days=90)
-    recent_acquisitions = service.track_acquisition_activity(days=90)
-    ipo_pipeline = service.get_ipo_pipeline()
-    top_investors = service.get_top_investors(limit=10)
-
     return {
         "timestamp": datetime.now().isoformat(),
-        "summary": {
-            "total_ai_companies": ai_landscape["total_ai_companies"],
-            "total_ai_valuation": ai_landscape["total_ai_valuation"],
-            "total_space_tech_companies": space_landscape["total_space_tech_companies"],
-            "total_space_tech_valuation": space_landscape["total_valuation"],
-        },
-        "recent_activity": {
-            "funding_rounds_90d": recent_funding["total_funding_rounds"],
-            "capital_raised_90d": recent_funding["total_capital_raised"],
-            "acquisitions_90d": recent_acquisitions["total_deals"],
-            "acquisition_value_90d": recent_acquisitions["total_deal_value"],
-        },
-        "ipo_pipeline": {
-            "total_candidates": ipo_pipeline["total_ipo_candidates"],
-            "high_confidence": ipo_pipeline["high_confidence"],
-            "medium_confidence": ipo_pipeline["medium_confidence"],
-            "low_confidence": ipo_pipeline["low_confidence"],
-        },
-        "top_investors": {
-            "count": top_investors["top_investors"],
-            "sample": top_investors["investors"][:5],
-        },
+        **await get_vc_market_summary(days=90),
     }
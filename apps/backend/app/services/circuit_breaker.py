@@ -0,0 +1,105 @@
+"""Per-upstream circuit breakers: fail fast while an upstream is down, probe it to recover."""
+
+import time
+from typing import Any, Dict, Optional
+
+
+# Defaults when feeds.yaml apis.<client>.circuit_breaker does not set them
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_SECONDS = 30.0
+DEFAULT_TIMEOUT_SECONDS = 10.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when an upstream's breaker is open and there is no cached response to fall back on."""
+
+
+class CircuitBreaker:
+    """
+    Breaker for one upstream.
+
+    Closed: requests flow; consecutive failures (network errors, timeouts,
+    5xx) up to failure_threshold open it. Open: requests are refused for
+    reset_seconds, then the next one becomes the single half-open probe.
+    Half-open: the probe's success closes the breaker, its failure reopens
+    it. Every request is bounded by timeout_seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_seconds: float = DEFAULT_RESET_SECONDS,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.timeout_seconds = timeout_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.counters = {"successes": 0, "failures": 0, "opened": 0, "short_circuited": 0, "stale_served": 0}
+
+    @classmethod
+    def from_config(cls, name: str, config: Optional[Dict[str, Any]]) -> "CircuitBreaker":
+        """Build a breaker from a feeds.yaml api's circuit_breaker block (defaults if None)."""
+        config = config or {}
+        return cls(
+            name,
+            failure_threshold=int(config.get("failure_threshold", DEFAULT_FAILURE_THRESHOLD)),
+            reset_seconds=float(config.get("reset_seconds", DEFAULT_RESET_SECONDS)),
+            timeout_seconds=float(config.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS)),
+        )
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may go upstream now.
+
+        Once an open breaker's reset period has passed, the first caller is
+        let through as the half-open probe; everyone else is refused until
+        the probe settles.
+        """
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            return True
+        self.counters["short_circuited"] += 1
+        return False
+
+    def record_success(self) -> None:
+        """The upstream answered: close the breaker."""
+        self.counters["successes"] += 1
+        self.failures = 0
+        self.state = "closed"
+
+    def record_failure(self) -> None:
+        """The upstream failed: open the breaker on the threshold, or if the probe failed."""
+        self.counters["failures"] += 1
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self._open()
+
+    def release_probe(self) -> None:
+        """A probe ended without an upstream answer (cancelled, rate limited): stay open."""
+        if self.state == "half_open":
+            self._open()
+
+    def _open(self) -> None:
+        if self.state != "open":
+            self.counters["opened"] += 1
+        self.state = "open"
+        self.opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        """State, consecutive failures, seconds until a probe is allowed and counters."""
+        retry_in = None
+        if self.state == "open":
+            retry_in = round(max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at)), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in_seconds": retry_in,
+            **self.counters,
+        }
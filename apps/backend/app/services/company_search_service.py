@@ -0,0 +1,283 @@
+"""Fuzzy private company search backed by trigram indexes."""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.venture_capital import PrivateCompany
+from app.services.vc_summary_service import get_vc_write_generation
+
+
+# Minimum trigram similarity for a fuzzy (non-prefix) match
+MIN_SIMILARITY = 0.2
+
+# Ranking weights
+NAME_PREFIX_BOOST = 1.0
+SUBSECTOR_WEIGHT = 0.5
+DESCRIPTION_WEIGHT = 0.3
+
+
+def trigrams(text: Optional[str]) -> set:
+    """
+    Split text into trigrams the way pg_trgm does.
+
+    Words are lower-cased and padded with two leading spaces and one trailing
+    space, so prefixes get their own trigrams and typeahead queries match.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Set of trigram strings
+    """
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CompanySearchIndex:
+    """
+    In-process trigram index over company name and subsector.
+
+    Used when the database has no trigram support (SQLite). Posting lists are
+    numpy arrays over dense company positions, so scoring a query is a
+    bincount plus vector arithmetic rather than a Python loop over companies.
+    """
+
+    def __init__(self, companies: List[tuple]):
+        self.ids = np.array([c[0] for c in companies], dtype=np.int64)
+        self.names = [c[1] for c in companies]
+        self.sectors = [c[2] for c in companies]
+        self.subsectors = [c[3] for c in companies]
+
+        self.name_postings, self.name_sizes = self._build_postings(self.names)
+        self.subsector_postings, self.subsector_sizes = self._build_postings(self.subsectors)
+
+        # Description word -> positions (word-level keeps memory bounded for long text)
+        description_words: Dict[str, list] = {}
+        for position, company in enumerate(companies):
+            for word in set(re.findall(r"[a-z0-9]+", (company[4] or "").lower())):
+                description_words.setdefault(word, []).append(position)
+        self.description_postings = {
+            w: np.array(p, dtype=np.int32) for w, p in description_words.items()
+        }
+
+        # Sorted lower-cased names for prefix lookups by bisection
+        self._prefix_order = sorted(range(len(companies)), key=lambda i: self.names[i].lower())
+        self._prefix_keys = [self.names[i].lower() for i in self._prefix_order]
+
+    @staticmethod
+    def _build_postings(values: List[Optional[str]]):
+        """Build trigram -> positions posting lists and per-row trigram counts."""
+        postings: Dict[str, list] = {}
+        sizes = np.zeros(len(values), dtype=np.float64)
+        for position, value in enumerate(values):
+            grams = trigrams(value)
+            sizes[position] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        return {g: np.array(p, dtype=np.int32) for g, p in postings.items()}, sizes
+
+    def _similarity(self, query_grams: set, postings: dict, sizes: np.ndarray) -> np.ndarray:
+        """Jaccard trigram similarity of the query against every row."""
+        lists = [postings[g] for g in query_grams if g in postings]
+        if not lists:
+            return np.zeros(len(sizes))
+        shared = np.bincount(np.concatenate(lists), minlength=len(sizes)).astype(np.float64)
+        union = len(query_grams) + sizes - shared
+        return np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Rank companies against a query.
+
+        Args:
+            query: Search text (prefix or approximate name)
+            limit: Number of results to return
+
+        Returns:
+            Ranked list of company matches with scores
+        """
+        q = query.strip().lower()
+        if not q or not self.names:
+            return []
+
+        query_grams = trigrams(q)
+        name_sim = self._similarity(query_grams, self.name_postings, self.name_sizes)
+        subsector_sim = self._similarity(query_grams, self.subsector_postings, self.subsector_sizes)
+
+        scores = name_sim + SUBSECTOR_WEIGHT * subsector_sim
+        matched = (name_sim >= MIN_SIMILARITY) | (subsector_sim >= MIN_SIMILARITY)
+
+        start = bisect_left(self._prefix_keys, q)
+        end = bisect_left(self._prefix_keys, q + "\uffff")
+        if end > start:
+            prefix_positions = np.array(self._prefix_order[start:end])
+            scores[prefix_positions] += NAME_PREFIX_BOOST
+            matched[prefix_positions] = True
+
+        # Descriptions containing every query word
+        words = re.findall(r"[a-z0-9]+", q)
+        description_hits = None
+        for word in words:
+            hits = self.description_postings.get(word, np.array([], dtype=np.int32))
+            description_hits = hits if description_hits is None else np.intersect1d(description_hits, hits)
+        if description_hits is not None and len(description_hits):
+            scores[description_hits] += DESCRIPTION_WEIGHT
+            matched[description_hits] = True
+
+        candidates = np.flatnonzero(matched)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit)[:limit]
+            candidates = candidates[top]
+
+        results = sorted(
+            ((float(scores[position]), position) for position in candidates), reverse=True
+        )
+
+        return [
+            {
+                "id": int(self.ids[position]),
+                "name": self.names[position],
+                "sector": self.sectors[position],
+                "subsector": self.subsectors[position],
+                "score": round(score, 4),
+            }
+            for score, position in results
+        ]
+
+
+_index_lock = threading.Lock()
+_index: Optional[CompanySearchIndex] = None
+_index_generation: Optional[int] = None
+_index_built_at = 0.0
+
+
+def get_company_search_index(db: Session) -> CompanySearchIndex:
+    """
+    Get the in-process search index, rebuilding it after VC writes.
+
+    Writes committed in this process bump the VC write generation and are
+    picked up immediately; writes from other processes (workers, the ingest
+    CLI) are picked up once the index is older than
+    settings.company_search_index_ttl_seconds.
+
+    Args:
+        db: Database session used to load companies on rebuild
+
+    Returns:
+        Current CompanySearchIndex
+    """
+    global _index, _index_generation, _index_built_at
+
+    generation = get_vc_write_generation()
+    now = time.monotonic()
+    with _index_lock:
+        if (
+            _index is None
+            or _index_generation != generation
+            or now - _index_built_at > settings.company_search_index_ttl_seconds
+        ):
+            companies = db.query(
+                PrivateCompany.id,
+                PrivateCompany.company_name,
+                PrivateCompany.sector,
+                PrivateCompany.subsector,
+                PrivateCompany.description,
+            ).all()
+            _index = CompanySearchIndex(companies)
+            _index_generation = generation
+            _index_built_at = now
+        return _index
+
+
+class CompanySearchService:
+    """Service for ranked, typo-tolerant private company search."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_companies(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Search companies by name prefix or approximate name, subsector and description.
+
+        Uses pg_trgm similarity and GIN trigram indexes on PostgreSQL, and the
+        in-process trigram index elsewhere.
+
+        Args:
+            query: Search text
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with the query and ranked results
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            results = self._search_postgres(query, limit)
+        else:
+            results = get_company_search_index(self.db).search(query, limit)
+
+        return {
+            "query": query,
+            "count": len(results),
+            "results": results,
+        }
+
+    def _search_postgres(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Rank companies with pg_trgm (requires migration 005 indexes).
+
+        Every match condition is a trigram operator or prefix LIKE backed by an
+        index, so candidates come from index scans and only they are scored.
+        Descriptions match on word similarity (q <% description) rather than
+        ILIKE '%q%', which can't use the trigram index for short queries.
+        """
+        q = query.strip()
+        prefix = q.lower().replace("%", r"\%").replace("_", r"\_") + "%"
+
+        name_sim = func.greatest(
+            func.similarity(PrivateCompany.company_name, q),
+            func.word_similarity(q, PrivateCompany.company_name),
+        )
+        subsector_sim = func.coalesce(func.similarity(PrivateCompany.subsector, q), 0)
+        score = (
+            name_sim
+            + SUBSECTOR_WEIGHT * subsector_sim
+            + case((func.lower(PrivateCompany.company_name).like(prefix), NAME_PREFIX_BOOST), else_=0)
+            + DESCRIPTION_WEIGHT * func.coalesce(func.word_similarity(q, PrivateCompany.description), 0)
+        ).label("score")
+
+        rows = self.db.query(
+            PrivateCompany.id,
+            PrivateCompany.company_name,
+            PrivateCompany.sector,
+            PrivateCompany.subsector,
+            score,
+        ).filter(
+            or_(
+                literal(q).op("<%")(PrivateCompany.company_name),
+                PrivateCompany.company_name.op("%")(q),
+                func.lower(PrivateCompany.company_name).like(prefix),
+                PrivateCompany.subsector.op("%")(q),
+                literal(q).op("<%")(PrivateCompany.description),
+            )
+        ).order_by(score.desc()).limit(limit).all()
+
+        return [
+            {
+                "id": r.id,
+                "name": r.company_name,
+                "sector": r.sector,
+                "subsector": r.subsector,
+                "score": round(float(r.score), 4),
+            }
+            for r in rows
+        ]
@@ -0,0 +1,984 @@
+"""Concurrent daily run aggregation engine driven by feeds.yaml."""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.daily_run import DailyRun, DailyRunSection
+from app.models.snapshots import IndexSnapshot, SectorSnapshot, CryptoAssetSnapshot, CryptoMarketSummary, MacroIndicatorSnapshot
+from app.models.news import News
+from app.models.earnings import Earnings
+from app.models.events import IPOs
+from app.models.content import Content
+from app.models.content_static import Lesson, Fact, Quote
+from app.services.daily_pack_service import DailyPackService
+from app.services.feeds_config import compile_plan, load_feeds_config, request_fingerprint
+from app.services.market_data import market_data_service
+
+
+# Snapshot tables of a run (rows are tracked per section in DailyRunSection.row_ids)
+SNAPSHOT_MODELS = (
+    IndexSnapshot,
+    SectorSnapshot,
+    CryptoAssetSnapshot,
+    CryptoMarketSummary,
+    MacroIndicatorSnapshot,
+    News,
+    Earnings,
+    IPOs,
+    Content,
+)
+
+SNAPSHOT_MODELS_BY_TABLE = {model.__tablename__: model for model in SNAPSHOT_MODELS}
+
+# Upstream responses worth another attempt
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Query string of a URL quoted in an error message (may carry API keys)
+URL_QUERY_PATTERN = re.compile(r"(https?://[^\s?'\"]+)\?[^\s'\"]*")
+
+# Alpha Vantage GLOBAL_QUOTE fields (section mapping.fields override these)
+DEFAULT_QUOTE_FIELDS = {
+    "symbol": "Global Quote.01. symbol",
+    "price": "Global Quote.05. price",
+    "volume": "Global Quote.06. volume",
+    "change": "Global Quote.09. change",
+    "change_percent": "Global Quote.10. change percent",
+}
+
+# Internal content sources (feeds.yaml 'source') -> table
+INTERNAL_SOURCES = {"db.lessons": Lesson, "db.facts": Fact, "db.quotes": Quote}
+
+
+def _lookup(payload: Any, path: str) -> Any:
+    """Read a dotted field path whose keys may themselves contain dots ('Global Quote.05. price')."""
+    while isinstance(payload, dict):
+        if path in payload:
+            return payload[path]
+        head, sep, path = path.partition(".")
+        if not sep:
+            return None
+        payload = payload.get(head)
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    """Parse a numeric upstream value ('1.25%', '1,234.5', 3) (None if unparseable)."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(str(value).replace(",", "").rstrip("%"))
+    except ValueError:
+        return None
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse an upstream timestamp ('2024-11-24 09:30:00', ISO 8601 with Z)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Parse an upstream date (a trailing time part is ignored)."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _quote(payload: Any, fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Extract a quote card from a quote response (None if the upstream returned no price)."""
+    price = _number(_lookup(payload, fields["price"]))
+    if price is None:
+        return None
+    return {
+        "symbol": _lookup(payload, fields["symbol"]),
+        "price": price,
+        "change": _number(_lookup(payload, fields["change"])),
+        "change_percent": _number(_lookup(payload, fields["change_percent"])),
+        "volume": _number(_lookup(payload, fields.get("volume", ""))),
+    }
+
+
+def _normalize_market_data(section: dict, responses: Dict[str, Any], today: date, upstream: Dict[str, Any]) -> dict:
+    """Quote cards (index snapshots), stock cards, sector tiles, FX rates and crypto price cards."""
+    config = section["config"]
+    fields = {**DEFAULT_QUOTE_FIELDS, **(config.get("mapping") or {}).get("fields", {})}
+    tile_names = {tile["symbol"]: tile["name"] for tile in config.get("sectors", [])}
+    data: Dict[str, Any] = {}
+    rows: Dict[Any, list] = {}
+
+    for key, payload in responses.items():
+        kind, _, symbol = key.partition(":")
+        if key == "main":
+            # CoinGecko simple price: {coin_id: {usd, aud, usd_24h_change}}
+            assets = [
+                {
+                    "name": coin_id.replace("-", " ").title(),
+                    "symbol": coin_id,
+                    "price_usd": _number(prices.get("usd")),
+                    "price_aud": _number(prices.get("aud")),
+                    "change_24h": _number(prices.get("usd_24h_change")),
+                    "market_cap": _number(prices.get("usd_market_cap")),
+                }
+                for coin_id, prices in payload.items()
+            ]
+            data["assets"] = assets
+            rows.setdefault(CryptoAssetSnapshot, []).extend({**a, "date": today} for a in assets)
+        elif key == "crypto":
+            data["crypto"] = payload
+        elif kind == "fx":
+            rate = _number(_lookup(payload, "Realtime Currency Exchange Rate.5. Exchange Rate"))
+            if rate is not None:
+                data.setdefault("rates", {})[symbol] = rate
+        elif (quote := _quote(payload, fields)) is None:
+            continue
+        elif kind == "stock":
+            data.setdefault("stocks", []).append(quote)
+        elif kind == "sector":
+            tile = {"name": tile_names.get(symbol, symbol), "symbol": symbol, "change_percent": quote["change_percent"]}
+            data.setdefault("sectors", []).append(tile)
+            rows.setdefault(SectorSnapshot, []).append({**tile, "date": today})
+        else:
+            data.setdefault("quotes", []).append(quote)
+            rows.setdefault(IndexSnapshot, []).append({
+                "symbol": quote["symbol"] or symbol,
+                "name": symbol,
+                "value": quote["price"],
+                "change": quote["change"],
+                "change_percent": quote["change_percent"],
+                "volume": quote["volume"],
+                "date": today,
+            })
+
+    fx = config.get("fx")
+    if fx and data.get("stocks"):
+        # Rates come from the fx section, which ran first; without them cards stay unconverted
+        rate = ((upstream.get(fx["source"]) or {}).get("rates") or {}).get(fx["pair"])
+        if rate is not None:
+            converted = f"price_{fx['pair'].partition('/')[2].lower()}"
+            for quote in data["stocks"]:
+                quote[converted] = round(quote["price"] * rate, 4)
+
+    return {"data": data, "rows": rows}
+
+
+def _normalize_composite(section: dict, responses: Dict[str, Any], today: date, upstream: Dict[str, Any]) -> dict:
+    """Composite sections keep each source's payload; the crypto summary also becomes a snapshot row."""
+    rows: Dict[Any, list] = {}
+    market_cap = (responses.get("market_cap") or {}).get("data")
+    fear_greed = (responses.get("fear_greed") or {}).get("data")
+    if market_cap is not None or fear_greed is not None:
+        market_cap = market_cap or {}
+        rows[CryptoMarketSummary] = [{
+            "total_market_cap": _number((market_cap.get("total_market_cap") or {}).get("usd")),
+            "total_volume": _number((market_cap.get("total_volume") or {}).get("usd")),
+            "market_cap_change_percentage_24h_usd": _number(market_cap.get("market_cap_change_percentage_24h_usd")),
+            "fear_greed_index": int(fear_greed[0]["value"]) if fear_greed else None,
+            "date": today,
+        }]
+    return {"data": responses, "rows": rows}
+
+
+def _normalize_news(section: dict, responses: Dict[str, Any], today: date, upstream: Dict[str, Any]) -> dict:
+    """News articles from newsdata ('results') or marketaux ('data'), categorized by section."""
+    payload = responses["main"]
+    articles = [
+        {
+            "category": section["id"],
+            "title": item.get("title"),
+            "summary": item.get("description") or item.get("snippet"),
+            "url": item.get("link") or item.get("url"),
+            "source": item.get("source_id") or item.get("source"),
+            "published_at": _parse_datetime(item.get("pubDate") or item.get("published_at")),
+        }
+        for item in payload.get("results") or payload.get("data") or []
+    ]
+    return {"data": articles, "rows": {News: articles}}
+
+
+def _normalize_earnings(section: dict, responses: Dict[str, Any], today: date, upstream: Dict[str, Any]) -> dict:
+    """FMP earnings calendar entries."""
+    earnings = [
+        {
+            "symbol": item.get("symbol"),
+            "company_name": item.get("company") or item.get("name"),
+            "eps_estimate": _number(item.get("epsEstimated")),
+            "eps_actual": _number(item.get("eps")),
+            "revenue_estimate": _number(item.get("revenueEstimated")),
+            "revenue_actual": _number(item.get("revenue")),
+            "date": _parse_date(item.get("date")),
+        }
+        for item in responses["main"] or []
+    ]
+    return {"data": earnings, "rows": {Earnings: earnings}}
+
+
+def _normalize_ipo(section: dict, responses: Dict[str, Any], today: date, upstream: Dict[str, Any]) -> dict:
+    """FMP IPO calendar entries."""
+    ipos = [
+        {
+            "symbol": item.get("symbol"),
+            "company_name": item.get("company"),
+            "ipo_date": _parse_date(item.get("date")),
+            "price_range": item.get("priceRange"),
+            "shares_offered": _number(item.get("shares")),
+        }
+        for item in responses["main"] or []
+    ]
+    return {"data": ipos, "rows": {IPOs: ipos}}
+
+
+def _normalize_macro(section: dict, responses: Dict[str, Any], today: date, upstream: Dict[str, Any]) -> dict:
+    """Latest value and change of each Trading Economics series."""
+    indicators = []
+    for key, history in responses.items():
+        points = sorted(history or [], key=lambda p: p.get("DateTime") or "")
+        values = [v for v in (_number(p.get("Value")) for p in points) if v is not None]
+        if not values:
+            continue
+        indicators.append({
+            "name": key.partition(":")[2],
+            "value": values[-1],
+            "unit": points[-1].get("Unit"),
+            "change": values[-1] - values[-2] if len(values) > 1 else None,
+        })
+    return {
+        "data": indicators,
+        "rows": {MacroIndicatorSnapshot: [{**i, "date": today} for i in indicators]},
+    }
+
+
+# Section type -> normalizer of its upstream responses
+NORMALIZERS: Dict[str, Callable[[dict, Dict[str, Any], date, Dict[str, Any]], dict]] = {
+    "market_data": _normalize_market_data,
+    "composite": _normalize_composite,
+    "news": _normalize_news,
+    "earnings": _normalize_earnings,
+    "ipo": _normalize_ipo,
+    "macro": _normalize_macro,
+}
+
+
+def _internal_content(section: dict, today: date, upstream: Dict[str, Any]) -> dict:
+    """
+    Build an internal content section (lesson, fact, quote or chart) from our own data.
+
+    Runs in a worker thread with its own database session.
+    """
+    config = section["config"]
+
+    if section["type"] == "internal_chart":
+        item = {"chart_type": config.get("chart_type"), "data_source": config["data_source"], "data": upstream[config["data_source"]]}
+        generated_by = f"section:{config['data_source']}"
+    else:
+        model = INTERNAL_SOURCES[config["source"]]
+        db = SessionLocal()
+        try:
+            count = db.query(func.count(model.id)).scalar()
+            if not count:
+                raise ValueError(f"{config['source']} is empty")
+            offset = today.toordinal() % count if config.get("strategy") == "rotate_daily" else random.randrange(count)
+            row = db.query(model).order_by(model.id).offset(offset).first()
+        finally:
+            db.close()
+        item = {c.name: getattr(row, c.name) for c in model.__table__.columns if c.name not in ("id", "created_at")}
+        generated_by = config["source"]
+
+    content = {
+        "type": section["id"],
+        "content": json.dumps(jsonable_encoder(item)),
+        "generated_by": generated_by,
+    }
+    return {"data": item, "rows": {Content: [content]}}
+
+
+class BatchUnavailableError(LookupError):
+    """Raised when the account can't use a bulk endpoint (e.g. a premium-only function on a free key)."""
+
+
+# Batch kinds the upstream refused for this process; later runs plan plain calls instead
+_unavailable_batch_kinds: set[str] = set()
+
+
+def _split_bulk_quotes(request: dict, payload: Any) -> Any:
+    """A GLOBAL_QUOTE-shaped response for one symbol of a REALTIME_BULK_QUOTES response."""
+    symbol = request["params"]["symbol"]
+    notice = str((payload or {}).get("Information") or "")
+    if "data" not in (payload or {}) and "premium" in notice.lower():
+        raise BatchUnavailableError(f"REALTIME_BULK_QUOTES unavailable: {notice[:120]}")
+    for quote in (payload or {}).get("data") or []:
+        if quote.get("symbol") == symbol:
+            return {"Global Quote": {
+                "01. symbol": symbol,
+                "02. open": quote.get("open"),
+                "03. high": quote.get("high"),
+                "04. low": quote.get("low"),
+                "05. price": quote.get("close"),
+                "06. volume": quote.get("volume"),
+                "08. previous close": quote.get("previous_close"),
+                "09. change": quote.get("change"),
+                "10. change percent": quote.get("change_percent"),
+            }}
+    raise LookupError(f"{symbol} missing from bulk quotes")
+
+
+def _split_simple_price(request: dict, payload: Any) -> Any:
+    """One request's coins and currencies out of a merged CoinGecko /simple/price response."""
+    currencies = request["params"].get("vs_currencies", "usd").split(",")
+    split = {}
+    for coin_id in request["params"]["ids"].split(","):
+        if coin_id not in payload:
+            raise LookupError(f"{coin_id} missing from merged simple price")
+        split[coin_id] = {
+            field: value for field, value in payload[coin_id].items()
+            if field.split("_", 1)[0] in currencies
+        }
+    return split
+
+
+# Batch kind -> extractor of one request's response from a bulk call's response
+BATCH_SPLITTERS: Dict[str, Callable[[dict, Any], Any]] = {
+    "alpha_vantage_bulk_quotes": _split_bulk_quotes,
+    "coingecko_simple_price": _split_simple_price,
+}
+
+
+class UpstreamCalls:
+    """
+    The upstream calls of one run, each made at most once and shared by every request it serves.
+
+    Calls start on first demand, so sections that are not refetched cost
+    nothing. Every fetch attempt is counted per client, along with how
+    many the response cache answered without a fresh download. Sections
+    served a stale fallback (upstream breaker open or failing) are tracked.
+    """
+
+    def __init__(
+        self,
+        plan: dict,
+        semaphores: Dict[str, asyncio.Semaphore],
+        priority: str,
+        refresh_sections: frozenset = frozenset(),
+    ):
+        self.calls = plan["calls"]
+        self.priority = priority
+        # Sections refreshed on request: their calls skip fresh cache entries
+        self.refresh_sections = refresh_sections
+        self.request_count = sum(len(section["requests"]) for section in plan["sections"])
+        self.semaphores = semaphores
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.attempts: Dict[str, int] = {}
+        self.cache_before = dict(market_data_service.cache.counters)
+        self.stale_calls: set[str] = set()
+        self.stale_sections: set[str] = set()
+
+    async def _fetch(self, call_id: str, call: dict, retries: int, backoff: float, refresh: bool) -> Any:
+        """Make one call within its client's concurrency limit, retrying transient failures."""
+        for attempt in range(retries + 1):
+            try:
+                async with self.semaphores[call["client"]]:
+                    self.attempts[call["client"]] = self.attempts.get(call["client"], 0) + 1
+                    response = await market_data_service.fetch_response(
+                        call["client"], call["endpoint"], call["params"], priority=self.priority, refresh=refresh
+                    )
+                if response["stale"]:
+                    self.stale_calls.add(call_id)
+                return response["body"]
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                    raise
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(backoff * 2 ** attempt)
+
+    async def _shared(self, call_id: str, call: dict, retries: int, backoff: float, refresh: bool) -> Any:
+        """Await a call's single task (a waiter timing out does not cancel it for the others)."""
+        if call_id not in self.tasks:
+            self.tasks[call_id] = asyncio.create_task(self._fetch(call_id, call, retries, backoff, refresh))
+        return await asyncio.shield(self.tasks[call_id])
+
+    async def response(self, section: dict, request: dict) -> Any:
+        """
+        The response to one section request, from the call planned for it.
+
+        A request missing from its bulk call's response is fetched on its
+        own. When the bulk endpoint is unavailable on the account, its batch
+        kind is also disabled for later runs of this process.
+        """
+        call_id = section["calls"][request["key"]]
+        call = self.calls[call_id]
+        refresh = not self.refresh_sections.isdisjoint(call["sections"])
+        payload = await self._shared(call_id, call, call["retries"], call["retry_backoff"], refresh)
+        if call["batch"] is not None:
+            try:
+                payload = BATCH_SPLITTERS[call["batch"]](request, payload)
+            except LookupError as e:
+                if isinstance(e, BatchUnavailableError):
+                    _unavailable_batch_kinds.add(call["batch"])
+                call_id = request_fingerprint(request)
+                payload = await self._shared(
+                    call_id, request, section["retries"], section["retry_backoff"],
+                    section["id"] in self.refresh_sections,
+                )
+        if call_id in self.stale_calls:
+            self.stale_sections.add(section["id"])
+        return payload
+
+    async def close(self) -> None:
+        """Cancel calls nobody waits for anymore (their sections timed out)."""
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Planned versus made upstream calls, fetch attempts per client and response cache outcomes."""
+        counters = market_data_service.cache.counters
+        return {
+            "requests_planned": self.request_count,
+            "calls_planned": len(self.calls),
+            "calls_made": len(self.tasks),
+            "fetch_attempts": sum(self.attempts.values()),
+            "fetch_attempts_by_client": dict(sorted(self.attempts.items())),
+            "stale_calls": len(self.stale_calls),
+            "cache": {
+                name: counters[name] - self.cache_before.get(name, 0)
+                for name in ("hits", "misses", "stale", "revalidated")
+            },
+        }
+
+
+async def _section_output(section: dict, upstream_calls: UpstreamCalls, today: date, upstream: Dict[str, Any]) -> dict:
+    """Fetch a section's requests concurrently and normalize them (partial responses are kept)."""
+    if not section["requests"]:
+        return await asyncio.to_thread(_internal_content, section, today, upstream)
+
+    fetched = await asyncio.gather(
+        *(upstream_calls.response(section, r) for r in section["requests"]),
+        return_exceptions=True,
+    )
+    responses = {
+        request["key"]: payload
+        for request, payload in zip(section["requests"], fetched)
+        if not isinstance(payload, BaseException)
+    }
+    if not responses:
+        raise fetched[0]
+    return NORMALIZERS[section["type"]](section, responses, today, upstream)
+
+
+def _output_hash(output: dict) -> str:
+    """Content hash of a section's normalized output (data and snapshot rows)."""
+    document = {
+        "data": output["data"],
+        "rows": {model.__tablename__: rows for model, rows in output["rows"].items()},
+    }
+    return hashlib.sha256(
+        json.dumps(jsonable_encoder(document), sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def _input_hash(section: dict, upstream_hashes: Dict[str, Optional[str]]) -> str:
+    """Content hash of what a section is built from: its config, resolved requests and upstream outputs."""
+    document = {
+        "config": section["config"],
+        "requests": section["requests"],
+        "upstream": upstream_hashes,
+    }
+    return hashlib.sha256(
+        json.dumps(document, sort_keys=True, separators=(",", ":"), default=str).encode()
+    ).hexdigest()
+
+
+def _refresh_reason(
+    section: dict,
+    stored: Optional[dict],
+    input_hash: str,
+    now: datetime,
+    named: set[str],
+    refresh_all: bool,
+) -> Optional[str]:
+    """Why a section has to be refetched (None if its stored output is still current)."""
+    if refresh_all:
+        return "full_build"
+    if section["id"] in named:
+        return "requested"
+    if stored is None:
+        return "missing"
+    if stored["status"] != "ok":
+        return "failed"
+    if stored["input_hash"] != input_hash:
+        # Config, resolved params or an upstream section's output changed
+        return "inputs_changed"
+    fetched_at = stored["fetched_at"]
+    if fetched_at is None:
+        return "stale"
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    if fetched_at + timedelta(seconds=section["ttl"]) <= now:
+        return "stale"
+    return None
+
+
+async def _run_section(
+    section: dict,
+    upstream_calls: UpstreamCalls,
+    today: date,
+    dependencies: list[dict],
+    stored: Optional[dict],
+    input_hash: str,
+    reason: str,
+    started: float,
+) -> dict:
+    """
+    Refetch one section within its deadline, once the sections it depends on are done.
+
+    Upstream sections' data is handed over in memory (fresh, or their stored
+    output when they were not refetched); if a required one has no data the
+    section is skipped, while optional ones (fx rates) are just left out. A
+    failed refetch keeps the section's stored output available.
+
+    Returns:
+        Section outcome with status ('ok', 'timeout', 'failed', 'skipped'),
+        whether it was built from stale upstream responses, output, content
+        hashes and timings
+    """
+    section_started = time.monotonic()
+    output, error = None, None
+    unavailable = [
+        d["id"] for d in dependencies if d["data"] is None and d["id"] not in section["optional_depends_on"]
+    ]
+    if unavailable:
+        status, error = "skipped", f"dependencies have no data: {', '.join(unavailable)}"
+    else:
+        upstream = {d["id"]: d["data"] for d in dependencies if d["data"] is not None}
+        try:
+            output = await asyncio.wait_for(_section_output(section, upstream_calls, today, upstream), section["timeout"])
+            status = "ok"
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"timed out after {section['timeout']:g}s"
+        except Exception as e:
+            status, error = "failed", _section_error(e)
+
+    stored_hash = stored["output_hash"] if stored else None
+    output_hash = _output_hash(output) if output is not None else stored_hash
+
+    return {
+        "id": section["id"],
+        "status": status,
+        "error": error,
+        "reason": reason,
+        "output": output,
+        "data": output["data"] if output is not None else (stored["output"] if stored else None),
+        "input_hash": input_hash,
+        "output_hash": output_hash,
+        "changed": output is not None and output_hash != stored_hash,
+        "stale": output is not None and section["id"] in upstream_calls.stale_sections,
+        "wave": section["wave"],
+        "depends_on": section["depends_on"],
+        "requests": len(section["requests"]),
+        "start_ms": round((section_started - started) * 1000, 1),
+        "duration_ms": round((time.monotonic() - section_started) * 1000, 1),
+    }
+
+
+def _section_error(error: Exception) -> str:
+    """
+    Describe a section failure without leaking upstream credentials.
+
+    httpx errors quote the request URL, whose query string carries API keys,
+    and section errors are stored on daily_run_sections and served by the
+    build, refresh and waterfall endpoints. HTTP and transport errors are
+    reduced to host, status or error type; URL query strings are stripped
+    from any other message.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"{error.request.url.host} HTTP {error.response.status_code}"
+    if isinstance(error, httpx.HTTPError):
+        try:
+            return f"{error.request.url.host} {type(error).__name__}"
+        except RuntimeError:
+            return type(error).__name__
+    return URL_QUERY_PATTERN.sub(r"\1", str(error)) or type(error).__name__
+
+
+def _cached_section(section: dict, stored: dict, started: float) -> dict:
+    """Outcome of a section whose stored output is still current."""
+    return {
+        "id": section["id"],
+        "status": "cached",
+        "error": None,
+        "reason": None,
+        "output": None,
+        "data": stored["output"],
+        "input_hash": stored["input_hash"],
+        "output_hash": stored["output_hash"],
+        "changed": False,
+        "stale": False,
+        "wave": section["wave"],
+        "depends_on": section["depends_on"],
+        "requests": 0,
+        "start_ms": round((time.monotonic() - started) * 1000, 1),
+        "duration_ms": 0.0,
+    }
+
+
+def _load_run_state(target_date: date) -> Dict[str, dict]:
+    """
+    Stored per-section state of a day's run (empty if there is no run yet).
+
+    Sections written before row tracking existed are left out, so they are refetched.
+    """
+    db: Session = SessionLocal()
+    try:
+        rows = db.query(DailyRunSection).join(
+            DailyRun, DailyRun.id == DailyRunSection.daily_run_id
+        ).filter(DailyRun.date == target_date).all()
+        return {
+            row.section_id: {
+                "status": row.status,
+                "input_hash": row.input_hash,
+                "output_hash": row.output_hash,
+                "output": row.output,
+                "fetched_at": row.fetched_at,
+            }
+            for row in rows
+            if row.row_ids is not None
+        }
+    finally:
+        db.close()
+
+
+def _delete_section_rows(db: Session, row_ids: Optional[Dict[str, list]]) -> None:
+    """Delete the snapshot rows a section wrote, by table and primary key."""
+    for table, ids in (row_ids or {}).items():
+        model = SNAPSHOT_MODELS_BY_TABLE[table]
+        if ids:
+            db.execute(delete(model).where(model.id.in_(ids)))
+
+
+def _persist_run(target_date: date, plan: dict, results: Dict[str, dict]) -> Dict[str, Any]:
+    """
+    Apply a build's section outcomes to the run in one transaction.
+
+    Only sections whose output hash changed have their snapshot rows
+    replaced; unchanged and cached sections keep theirs, and failed sections
+    keep their last good rows. Section state, the run's market/macro JSON
+    and the daily pack are updated in the same transaction.
+    """
+    db: Session = SessionLocal()
+    try:
+        daily_run = db.query(DailyRun).filter(DailyRun.date == target_date).first()
+        created = daily_run is None
+        if created:
+            daily_run = DailyRun(date=target_date)
+            db.add(daily_run)
+            db.flush()
+
+        existing = {
+            row.section_id: row
+            for row in db.query(DailyRunSection).filter(DailyRunSection.daily_run_id == daily_run.id)
+        }
+        if not created and (not existing or any(row.row_ids is None for row in existing.values())):
+            # Run written before per-section row tracking: every section was refetched
+            for model in SNAPSHOT_MODELS:
+                db.execute(delete(model).where(model.daily_run_id == daily_run.id))
+
+        changed = []
+        planned = {section["id"] for section in plan["sections"]}
+        for section_id, row in existing.items():
+            if section_id not in planned:
+                # Section removed or disabled in feeds.yaml
+                _delete_section_rows(db, row.row_ids)
+                db.delete(row)
+                changed.append(section_id)
+
+        rows_written: Dict[str, int] = {}
+        fetched_at = datetime.now(timezone.utc)
+        for section in plan["sections"]:
+            outcome = results[section["id"]]
+            if outcome["status"] == "cached":
+                continue
+
+            row = existing.get(section["id"])
+            if row is None:
+                row = DailyRunSection(daily_run_id=daily_run.id, section_id=section["id"])
+                db.add(row)
+            row.status = outcome["status"]
+            row.error = outcome["error"]
+            row.wave = outcome["wave"]
+            row.depends_on = outcome["depends_on"]
+            row.request_count = outcome["requests"]
+            row.start_ms = outcome["start_ms"]
+            row.duration_ms = outcome["duration_ms"]
+            if row.row_ids is None:
+                row.row_ids = {}
+            if outcome["status"] != "ok":
+                continue
+
+            row.input_hash = outcome["input_hash"]
+            # Output built from stale fallbacks is kept, but due for the next refresh
+            row.fetched_at = None if outcome["stale"] else fetched_at
+            if not outcome["changed"]:
+                continue
+
+            _delete_section_rows(db, row.row_ids)
+            row_ids = {}
+            for model, model_rows in outcome["output"]["rows"].items():
+                if not model_rows:
+                    continue
+                ids = db.execute(
+                    insert(model).returning(model.id, sort_by_parameter_order=True),
+                    [{**r, "daily_run_id": daily_run.id} for r in model_rows],
+                ).scalars().all()
+                row_ids[model.__tablename__] = list(ids)
+                rows_written[model.__tablename__] = rows_written.get(model.__tablename__, 0) + len(ids)
+            row.row_ids = row_ids
+            row.output = jsonable_encoder(outcome["output"]["data"])
+            row.output_hash = outcome["output_hash"]
+            changed.append(section["id"])
+
+        pack = None
+        if created or changed:
+            db.flush()
+            types = {section["id"]: section["type"] for section in plan["sections"]}
+            outputs = db.query(DailyRunSection.section_id, DailyRunSection.output).filter(
+                DailyRunSection.daily_run_id == daily_run.id,
+                DailyRunSection.output.isnot(None),
+            ).all()
+            daily_run.market_data = {
+                section_id: output for section_id, output in outputs
+                if types.get(section_id) in ("market_data", "composite")
+            }
+            daily_run.macro_data = {
+                section_id: output for section_id, output in outputs if types.get(section_id) == "macro"
+            }
+            db.flush()
+            pack = DailyPackService(db).publish(daily_run)
+        db.commit()
+
+        return {
+            "daily_run_id": daily_run.id,
+            "sections_changed": changed,
+            "rows_written": rows_written,
+            "pack": pack,
+        }
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _without_unavailable_batches(config: dict) -> dict:
+    """Copy of a feeds config with batch kinds the upstream refused removed from its apis."""
+    apis = config.get("apis") or {}
+    refused = {
+        name for name, api in apis.items()
+        if (api.get("batch") or {}).get("kind") in _unavailable_batch_kinds
+    }
+    if not refused:
+        return config
+    return {
+        **config,
+        "apis": {
+            name: {key: value for key, value in api.items() if key != "batch"} if name in refused else api
+            for name, api in apis.items()
+        },
+    }
+
+
+async def _build(
+    target_date: Optional[date],
+    config: Optional[dict],
+    named: set[str],
+    refresh_all: bool,
+) -> Dict[str, Any]:
+    """Run the section DAG for a day, refetching only the sections that need it, and persist the outcome."""
+    target_date = target_date or date.today()
+    plan = compile_plan(_without_unavailable_batches(config or load_feeds_config()), target_date)
+    unknown = named - {section["id"] for section in plan["sections"]}
+    if unknown:
+        raise ValueError(f"Unknown or disabled section(s): {sorted(unknown)}")
+
+    market_data_service.configure_upstreams(plan["apis"])
+    semaphores = {name: asyncio.Semaphore(limit) for name, limit in plan["concurrency"].items()}
+    # Past dates are backfills: they queue behind interactive and today's traffic for rate limit tokens
+    priority = "backfill" if target_date < date.today() else "scheduled"
+    # Sections named in a refresh are manual retries: refetch rather than reuse fresh cache entries
+    upstream_calls = UpstreamCalls(plan, semaphores, priority, frozenset(named))
+    state = {} if refresh_all else await asyncio.to_thread(_load_run_state, target_date)
+
+    started = time.monotonic()
+    now = datetime.now(timezone.utc)
+    results: Dict[str, dict] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(section: dict) -> None:
+        await asyncio.gather(*(tasks[d] for d in section["depends_on"]))
+        dependencies = [results[d] for d in section["depends_on"]]
+        stored = state.get(section["id"])
+        input_hash = _input_hash(section, {d["id"]: d["output_hash"] for d in dependencies})
+        reason = _refresh_reason(section, stored, input_hash, now, named, refresh_all)
+        if reason is None:
+            results[section["id"]] = _cached_section(section, stored, started)
+        else:
+            results[section["id"]] = await _run_section(
+                section, upstream_calls, target_date, dependencies, stored, input_hash, reason, started
+            )
+
+    # Sections are in wave order, so dependencies' tasks always exist already
+    for section in plan["sections"]:
+        tasks[section["id"]] = asyncio.create_task(run(section))
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        await upstream_calls.close()
+    fetch_seconds = time.monotonic() - started
+
+    persisted = await asyncio.to_thread(_persist_run, target_date, plan, results)
+
+    return {
+        "date": target_date.isoformat(),
+        **persisted,
+        "sections_refreshed": [r["id"] for r in results.values() if r["status"] != "cached"],
+        "sections_cached": [r["id"] for r in results.values() if r["status"] == "cached"],
+        "sections_failed": [r["id"] for r in results.values() if r["status"] not in ("ok", "cached")],
+        "sections_stale": [r["id"] for r in results.values() if r["stale"]],
+        "waves": plan["waves"],
+        "tokens": plan["tokens"],
+        "upstream": upstream_calls.stats(),
+        "fetch_seconds": round(fetch_seconds, 3),
+        "total_seconds": round(time.monotonic() - started, 3),
+        "sections": [
+            {key: value for key, value in results[s["id"]].items() if key not in ("output", "data")}
+            for s in plan["sections"]
+        ],
+    }
+
+
+async def build_daily_run(target_date: Optional[date] = None, config: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Build a day's DailyRun from feeds.yaml, fetching every section.
+
+    The config is compiled into an execution plan whose section dependencies
+    (data_source, fx.source, depends_on) form a DAG. Every section starts as
+    soon as the sections it depends on have finished, so each topological
+    wave runs fully in parallel and no section waits on unrelated ones;
+    upstream output is passed in memory. Section requests are served by
+    planned upstream calls (identical requests deduplicated across
+    sections, compatible ones merged into bulk calls), each made once and
+    counted in the report. Sections have their own deadline and per-call
+    retries, and in-flight calls are capped per api client. Failed sections (and dependents that need their data) are reported and keep
+    their previous rows. The run, the snapshot rows of sections whose
+    output changed, the per-section timing waterfall and the daily pack are
+    written in a single transaction.
+
+    Args:
+        target_date: Run date (defaults to today)
+        config: Parsed feeds.yaml (loaded from disk if None)
+
+    Returns:
+        Build report with per-section status, waves and timings
+    """
+    return await _build(target_date, config, named=set(), refresh_all=True)
+
+
+async def refresh_daily_run(
+    target_date: Optional[date] = None,
+    sections: Optional[list[str]] = None,
+    config: Optional[dict] = None,
+) -> Dict[str, Any]:
+    """
+    Incrementally refresh a day's DailyRun.
+
+    Only sections that are named, failed last time, missing, past their
+    refresh_ttl_minutes, or whose input hash changed (config, resolved
+    params or an upstream section's output) are refetched; the rest feed
+    their dependents from their stored output. Sections whose refetched
+    output hashes the same as before keep their snapshot rows untouched.
+
+    Args:
+        target_date: Run date (defaults to today)
+        sections: Section ids to refetch regardless of state
+        config: Parsed feeds.yaml (loaded from disk if None)
+
+    Returns:
+        Build report listing refreshed, cached, changed and failed sections
+
+    Raises:
+        ValueError: If a named section is unknown or disabled
+    """
+    return await _build(target_date, config, named=set(sections or ()), refresh_all=False)
+
+
+def format_waterfall(sections: list[dict], width: int = 60) -> str:
+    """
+    Render section timings as a text waterfall (one bar per section, offset by start time).
+
+    Args:
+        sections: Section outcomes with id, status, start_ms and duration_ms
+        width: Width of the timeline in characters
+
+    Returns:
+        Multi-line waterfall chart
+    """
+    if not sections:
+        return ""
+    end_ms = max(s["start_ms"] + s["duration_ms"] for s in sections) or 1.0
+    label_width = max(len(s["id"]) for s in sections)
+    lines = []
+    for s in sorted(sections, key=lambda s: (s["start_ms"], s["id"])):
+        offset = int(s["start_ms"] / end_ms * width)
+        length = max(1, round(s["duration_ms"] / end_ms * width))
+        lines.append(
+            f"{s['id']:<{label_width}} |{' ' * offset}{'#' * length:<{width - offset}}| "
+            f"{s['duration_ms']:>8.1f} ms  {s['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Command-line entry point: python -m app.services.daily_aggregation_service [--date YYYY-MM-DD] [--refresh]"""
+    parser = argparse.ArgumentParser(description="Build the daily run from feeds.yaml")
+    parser.add_argument("--date", type=date.fromisoformat, help="Run date (defaults to today)")
+    parser.add_argument("--refresh", action="store_true", help="Only refetch failed, stale or changed sections")
+    parser.add_argument("--section", action="append", dest="sections", help="Section to refetch (with --refresh; repeatable)")
+    parser.add_argument("--waterfall", action="store_true", help="Print the section timing waterfall")
+    args = parser.parse_args(argv)
+
+    async def run() -> Dict[str, Any]:
+        try:
+            if args.refresh or args.sections:
+                return await refresh_daily_run(args.date, sections=args.sections)
+            return await build_daily_run(args.date)
+        finally:
+            await market_data_service.close()
+
+    report = asyncio.run(run())
+    print(json.dumps(report, indent=2))
+    if args.waterfall:
+        print(format_waterfall(report["sections"]))
+
+
+if __name__ == "__main__":
+    main()
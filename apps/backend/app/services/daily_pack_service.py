@@ -0,0 +1,207 @@
+"""Precomputed daily pack documents: built once per DailyRun, served as stored bytes."""
+
+import gzip
+import hashlib
+import json
+from datetime import date
+from typing import Any, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.db.upsert import bulk_upsert
+from app.models.daily_run import DailyRun, DailyPack
+from app.models.snapshots import IndexSnapshot, SectorSnapshot, CryptoAssetSnapshot, CryptoMarketSummary, MacroIndicatorSnapshot
+from app.models.news import News
+from app.models.earnings import Earnings
+from app.models.events import IPOs
+from app.models.content import Content
+
+
+PACK_COMPRESSION_LEVEL = 6
+
+
+def build_daily_pack(db: Session, daily_run: DailyRun) -> Dict[str, Any]:
+    """
+    Assemble the complete daily pack of a run from its snapshot rows.
+
+    Args:
+        db: Database session
+        daily_run: Run to assemble
+
+    Returns:
+        Daily pack dictionary (market data, macro, news, earnings, IPOs, content)
+    """
+    indices = db.query(IndexSnapshot).filter(IndexSnapshot.daily_run_id == daily_run.id).all()
+    sectors = db.query(SectorSnapshot).filter(SectorSnapshot.daily_run_id == daily_run.id).all()
+    crypto_assets = db.query(CryptoAssetSnapshot).filter(CryptoAssetSnapshot.daily_run_id == daily_run.id).all()
+    crypto_summary = db.query(CryptoMarketSummary).filter(CryptoMarketSummary.daily_run_id == daily_run.id).first()
+    macro_indicators = db.query(MacroIndicatorSnapshot).filter(MacroIndicatorSnapshot.daily_run_id == daily_run.id).all()
+    news = db.query(News).filter(News.daily_run_id == daily_run.id).all()
+    earnings = db.query(Earnings).filter(Earnings.daily_run_id == daily_run.id).all()
+    ipos = db.query(IPOs).filter(IPOs.daily_run_id == daily_run.id).all()
+    content = db.query(Content).filter(Content.daily_run_id == daily_run.id).all()
+
+    return {
+        "date": daily_run.date,
+        "market_data": {
+            "indices": [
+                {
+                    "symbol": idx.symbol,
+                    "name": idx.name,
+                    "value": idx.value,
+                    "change": idx.change,
+                    "change_percent": idx.change_percent,
+                    "volume": idx.volume
+                } for idx in indices
+            ],
+            "sectors": [
+                {
+                    "name": sector.name,
+                    "symbol": sector.symbol,
+                    "change_percent": sector.change_percent
+                } for sector in sectors
+            ],
+            "crypto": {
+                "assets": [
+                    {
+                        "name": asset.name,
+                        "symbol": asset.symbol,
+                        "price_usd": asset.price_usd,
+                        "price_aud": asset.price_aud,
+                        "change_24h": asset.change_24h,
+                        "market_cap": asset.market_cap
+                    } for asset in crypto_assets
+                ],
+                "summary": {
+                    "total_market_cap": crypto_summary.total_market_cap,
+                    "total_volume": crypto_summary.total_volume,
+                    "market_cap_change_percentage_24h_usd": crypto_summary.market_cap_change_percentage_24h_usd,
+                    "fear_greed_index": crypto_summary.fear_greed_index
+                } if crypto_summary else {}
+            }
+        },
+        "macro_data": {
+            "indicators": [
+                {
+                    "name": indicator.name,
+                    "value": indicator.value,
+                    "unit": indicator.unit,
+                    "change": indicator.change
+                } for indicator in macro_indicators
+            ]
+        },
+        "news": [
+            {
+                "category": article.category,
+                "title": article.title,
+                "summary": article.summary,
+                "url": article.url,
+                "source": article.source,
+                "published_at": article.published_at
+            } for article in news
+        ],
+        "earnings": [
+            {
+                "symbol": earning.symbol,
+                "company_name": earning.company_name,
+                "eps_estimate": earning.eps_estimate,
+                "eps_actual": earning.eps_actual,
+                "revenue_estimate": earning.revenue_estimate,
+                "revenue_actual": earning.revenue_actual,
+                "date": earning.date
+            } for earning in earnings
+        ],
+        "ipos": [
+            {
+                "symbol": ipo.symbol,
+                "company_name": ipo.company_name,
+                "ipo_date": ipo.ipo_date,
+                "price_range": ipo.price_range,
+                "shares_offered": ipo.shares_offered
+            } for ipo in ipos
+        ],
+        "content": [
+            {
+                "type": item.type,
+                "content": item.content,
+                "generated_by": item.generated_by
+            } for item in content
+        ]
+    }
+
+
+def encode_pack(pack: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serialize a daily pack to compact, gzip-compressed JSON.
+
+    The gzip header carries no timestamp, so identical packs produce
+    identical bytes; the ETag hashes the uncompressed JSON.
+
+    Returns:
+        Dictionary with etag, body (compressed bytes) and size_bytes (uncompressed)
+    """
+    raw = json.dumps(jsonable_encoder(pack), separators=(",", ":")).encode()
+    return {
+        "etag": f'"{hashlib.sha256(raw).hexdigest()[:32]}"',
+        "body": gzip.compress(raw, compresslevel=PACK_COMPRESSION_LEVEL, mtime=0),
+        "size_bytes": len(raw),
+    }
+
+
+class DailyPackService:
+    """Service for publishing and reading precomputed daily packs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def publish(self, daily_run: DailyRun) -> Dict[str, Any]:
+        """
+        Build, serialize and store the pack of a run (replacing any previous pack).
+
+        Called by the daily pipeline once a run's snapshot rows are written.
+        The caller commits.
+
+        Returns:
+            Dictionary with the stored pack's etag and sizes
+        """
+        encoded = self._store(daily_run)
+        return {
+            "daily_run_id": daily_run.id,
+            "etag": encoded["etag"],
+            "size_bytes": encoded["size_bytes"],
+            "compressed_bytes": len(encoded["body"]),
+        }
+
+    def _store(self, daily_run: DailyRun) -> Dict[str, Any]:
+        """Encode a run's pack and upsert it keyed on the run."""
+        encoded = encode_pack(build_daily_pack(self.db, daily_run))
+        bulk_upsert(
+            self.db,
+            DailyPack,
+            [{"daily_run_id": daily_run.id, "date": daily_run.date, **encoded}],
+            conflict_columns=("daily_run_id",),
+            update_columns=("date", "etag", "body", "size_bytes"),
+        )
+        return encoded
+
+    def get_pack(self, target_date: date) -> Optional[tuple[str, bytes]]:
+        """
+        Get the (etag, compressed body) of a date's pack with one keyed read.
+
+        Runs generated before packs existed are published on first request.
+
+        Returns:
+            Tuple of (etag, gzip bytes), or None if there is no run for the date
+        """
+        row = self.db.query(DailyPack.etag, DailyPack.body).filter(DailyPack.date == target_date).first()
+        if row:
+            return row.etag, row.body
+
+        daily_run = self.db.query(DailyRun).filter(DailyRun.date == target_date).first()
+        if not daily_run:
+            return None
+
+        encoded = self._store(daily_run)
+        self.db.commit()
+        return encoded["etag"], encoded["body"]
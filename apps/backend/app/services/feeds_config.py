@@ -0,0 +1,456 @@
+"""feeds.yaml loading and compilation into an execution plan of upstream requests."""
+
+import json
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from app.services.rate_limiter import DEFAULT_MAX_WAIT_SECONDS
+
+
+FEEDS_CONFIG_PATH = Path(__file__).resolve().parents[2] / "feeds.yaml"
+
+# Engine defaults when feeds.yaml meta does not set them
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_SECTION_TIMEOUT_SECONDS = 20.0
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_SECONDS = 1.0
+DEFAULT_REFRESH_TTL_MINUTES = 1440
+
+# Section types served from our own tables instead of an upstream API
+INTERNAL_SECTION_TYPES = ("internal_lesson", "internal_fact", "internal_quote", "internal_chart")
+
+# Bulk call shapes (feeds.yaml apis.<client>.batch.kind) and their default maximum batch size
+BATCH_KINDS = {
+    "alpha_vantage_bulk_quotes": 100,
+    "coingecko_simple_price": 250,
+}
+
+
+def load_feeds_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Read feeds.yaml (meta, apis and sections)."""
+    with open(path or FEEDS_CONFIG_PATH) as f:
+        return yaml.safe_load(f)
+
+
+def resolve_token(value: Any, today: date) -> Any:
+    """
+    Resolve a date placeholder (TODAY, TODAY_MINUS_N, TODAY_PLUS_N) to an ISO date.
+
+    Other values are returned unchanged.
+    """
+    if not isinstance(value, str) or not value.startswith("TODAY"):
+        return value
+    if value == "TODAY":
+        return today.isoformat()
+    sign, _, days = value[len("TODAY_"):].partition("_")
+    if sign not in ("MINUS", "PLUS") or not days.isdigit():
+        return value
+    offset = int(days) if sign == "PLUS" else -int(days)
+    return (today + timedelta(days=offset)).isoformat()
+
+
+def run_tokens(config: Dict[str, Any], today: date) -> Dict[str, str]:
+    """
+    Resolve every date placeholder used by the sections, once per run.
+
+    All sections then share one resolution, even if compilation straddles midnight.
+
+    Returns:
+        Dictionary mapping placeholder to ISO date
+    """
+    tokens = {}
+
+    def collect(value: Any) -> None:
+        if isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+        elif isinstance(value, str) and value not in tokens:
+            resolved = resolve_token(value, today)
+            if resolved != value:
+                tokens[value] = resolved
+
+    collect(config.get("sections", []))
+    return tokens
+
+
+def _query_params(params: Dict[str, Any], tokens: Dict[str, str]) -> Dict[str, Any]:
+    """Turn feeds.yaml params into query parameters (lists joined, booleans lowercased, tokens resolved)."""
+    query = {}
+    for name, value in (params or {}).items():
+        if isinstance(value, list):
+            value = ",".join(str(v) for v in value)
+        elif isinstance(value, bool):
+            value = str(value).lower()
+        query[name] = tokens.get(value, value) if isinstance(value, str) else value
+    return query
+
+
+def _quote_request(key: str, symbol: str) -> Dict[str, Any]:
+    """Alpha Vantage GLOBAL_QUOTE request for one symbol."""
+    return {
+        "key": key,
+        "client": "alpha_vantage",
+        "endpoint": "/query",
+        "params": {"function": "GLOBAL_QUOTE", "symbol": symbol},
+    }
+
+
+def compile_section_requests(section: Dict[str, Any], tokens: Dict[str, str]) -> list[dict]:
+    """
+    Expand one section config into the upstream requests it needs.
+
+    Each request is a dict with a key (unique within the section, used to
+    hand responses to the section's normalizer), client, endpoint and
+    query params with placeholders resolved from the run's tokens.
+    Internal sections compile to no requests.
+    """
+    if section["type"] in INTERNAL_SECTION_TYPES:
+        return []
+
+    requests = []
+    client = section.get("client")
+
+    for spec in section.get("requests", []):
+        params = dict(spec.get("params") or {})
+        symbols = params.pop("symbols", None)
+        if symbols:
+            # One call per symbol: the endpoint takes a single symbol
+            requests.extend(
+                {
+                    "key": f"{spec['name']}:{symbol}",
+                    "client": client,
+                    "endpoint": spec.get("endpoint", ""),
+                    "params": {**_query_params(params, tokens), "symbol": symbol},
+                }
+                for symbol in symbols
+            )
+        else:
+            requests.append({
+                "key": spec["name"],
+                "client": client,
+                "endpoint": spec.get("endpoint", ""),
+                "params": _query_params(params, tokens),
+            })
+
+    if "stocks" in section:
+        requests.extend(_quote_request(f"stock:{s}", s) for s in section["stocks"]["symbols"])
+
+    if "crypto" in section:
+        crypto = section["crypto"]
+        requests.append({
+            "key": "crypto",
+            "client": crypto.get("client", "coingecko"),
+            "endpoint": "/simple/price",
+            "params": _query_params({
+                "ids": crypto["ids"],
+                "vs_currencies": crypto.get("vs_currency", "usd"),
+                "include_24hr_change": True,
+            }, tokens),
+        })
+
+    for pair in section.get("pairs", []):
+        requests.append({
+            "key": f"fx:{pair['from']}/{pair['to']}",
+            "client": client,
+            "endpoint": "/query",
+            "params": {"function": "CURRENCY_EXCHANGE_RATE", "from_currency": pair["from"], "to_currency": pair["to"]},
+        })
+
+    for tile in section.get("sectors", []):
+        requests.append(_quote_request(f"sector:{tile['symbol']}", tile["symbol"]))
+
+    for name, source in (section.get("sources") or {}).items():
+        requests.append({
+            "key": name,
+            "client": source["client"],
+            "endpoint": source.get("endpoint", ""),
+            "params": _query_params(source.get("params"), tokens),
+        })
+
+    for indicator in section.get("indicators", []):
+        requests.append({
+            "key": f"indicator:{indicator['name']}",
+            "client": client,
+            "endpoint": "/historical",
+            "params": {"s": indicator["series"], "fmt": "json"},
+        })
+
+    if not requests and client:
+        requests.append({
+            "key": "main",
+            "client": client,
+            "endpoint": section.get("endpoint", ""),
+            "params": _query_params(section.get("params"), tokens),
+        })
+
+    return requests
+
+
+def section_dependencies(section: Dict[str, Any]) -> set[str]:
+    """
+    Sections whose output a section consumes.
+
+    Declared with depends_on, or implied by data_source (charts drawn from
+    another section) and fx.source (prices converted with another section's rates).
+    """
+    dependencies = set(section.get("depends_on", []))
+    if section.get("data_source"):
+        dependencies.add(section["data_source"])
+    if section.get("fx"):
+        dependencies.add(section["fx"]["source"])
+    return dependencies
+
+
+def optional_section_dependencies(section: Dict[str, Any]) -> set[str]:
+    """
+    Dependencies a section can be built without.
+
+    fx.source only adds converted prices, so a section whose rates are
+    unavailable is built unconverted instead of being skipped.
+    """
+    return {section["fx"]["source"]} if section.get("fx") else set()
+
+
+def topological_waves(dependencies: Dict[str, set[str]]) -> list[list[str]]:
+    """
+    Group sections into waves: each wave depends only on earlier waves.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    remaining = {node: set(deps) for node, deps in dependencies.items()}
+    waves = []
+    while remaining:
+        wave = sorted(node for node, deps in remaining.items() if not deps)
+        if not wave:
+            raise ValueError(f"Dependency cycle between sections: {sorted(remaining)}")
+        waves.append(wave)
+        for node in wave:
+            del remaining[node]
+        for deps in remaining.values():
+            deps.difference_update(wave)
+    return waves
+
+
+def request_fingerprint(request: Dict[str, Any]) -> str:
+    """Identity of an upstream call: client, endpoint and query params (the section and key are ignored)."""
+    return json.dumps([request["client"], request["endpoint"], request["params"]], sort_keys=True, default=str)
+
+
+def _batch_group(kind: str, request: Dict[str, Any]) -> Optional[str]:
+    """
+    Group key of requests that can share one bulk call of a kind (None if the request can't).
+
+    alpha_vantage_bulk_quotes: GLOBAL_QUOTE requests, merged into
+    REALTIME_BULK_QUOTES calls on a comma-separated symbol list.
+    coingecko_simple_price: /simple/price requests with the same remaining
+    params, merged on the union of their ids and vs_currencies.
+    """
+    params = request["params"]
+    if kind == "alpha_vantage_bulk_quotes":
+        if params.get("function") != "GLOBAL_QUOTE" or set(params) != {"function", "symbol"}:
+            return None
+        return request_fingerprint({**request, "params": {}})
+    if kind == "coingecko_simple_price":
+        if request["endpoint"] != "/simple/price" or "ids" not in params:
+            return None
+        rest = {k: v for k, v in params.items() if k not in ("ids", "vs_currencies")}
+        return request_fingerprint({**request, "params": rest})
+    return None
+
+
+def _merge_batch(kind: str, requests: list[dict], max_size: int) -> list[tuple[dict, list[dict]]]:
+    """
+    Bulk calls covering a group of batchable requests, at most max_size items each.
+
+    Returns:
+        List of (bulk call params, requests it serves)
+    """
+    if kind == "alpha_vantage_bulk_quotes":
+        symbols = list(dict.fromkeys(r["params"]["symbol"] for r in requests))
+        batches = []
+        for start in range(0, len(symbols), max_size):
+            chunk = symbols[start:start + max_size]
+            members = [r for r in requests if r["params"]["symbol"] in chunk]
+            batches.append(({"function": "REALTIME_BULK_QUOTES", "symbol": ",".join(chunk)}, members))
+        return batches
+
+    # coingecko_simple_price: requests are packed whole, so each is served by one call
+    rest = {k: v for k, v in requests[0]["params"].items() if k not in ("ids", "vs_currencies")}
+    batches = []
+    ids: list[str] = []
+    currencies: list[str] = []
+    members: list[dict] = []
+    for request in requests:
+        request_ids = request["params"]["ids"].split(",")
+        merged = list(dict.fromkeys(ids + request_ids))
+        if members and len(merged) > max_size:
+            batches.append((ids, currencies, members))
+            merged, currencies, members = request_ids, [], []
+        ids = merged
+        currencies = list(dict.fromkeys(currencies + request["params"].get("vs_currencies", "usd").split(",")))
+        members.append(request)
+    batches.append((ids, currencies, members))
+    return [
+        ({**rest, "ids": ",".join(ids), "vs_currencies": ",".join(currencies)}, members)
+        for ids, currencies, members in batches
+    ]
+
+
+def plan_upstream_calls(sections: list[dict], apis: Dict[str, Any]) -> tuple[Dict[str, dict], Dict[str, Dict[str, str]]]:
+    """
+    Plan the upstream calls that serve every section request of a run.
+
+    Requests to a client with a batch kind (feeds.yaml apis.<client>.batch)
+    are merged into bulk calls where compatible; every other request is
+    deduplicated across sections by client, endpoint and params. A call
+    takes the most patient retry policy of the sections it serves.
+
+    Returns:
+        Tuple of (calls by id, each with client, endpoint, params, batch
+        kind, served sections and retry policy; call id per request key
+        of each section)
+    """
+    calls: Dict[str, dict] = {}
+    section_calls: Dict[str, Dict[str, str]] = {section["id"]: {} for section in sections}
+    groups: Dict[tuple, list[dict]] = {}
+    owners: Dict[int, dict] = {}
+
+    def assign(call_id: str, call: dict, section: dict, request: dict) -> None:
+        planned = calls.setdefault(call_id, {**call, "sections": [], "retries": 0, "retry_backoff": 0.0})
+        if section["id"] not in planned["sections"]:
+            planned["sections"].append(section["id"])
+        planned["retries"] = max(planned["retries"], section["retries"])
+        planned["retry_backoff"] = max(planned["retry_backoff"], section["retry_backoff"])
+        section_calls[section["id"]][request["key"]] = call_id
+
+    for section in sections:
+        for request in section["requests"]:
+            kind = (apis[request["client"]].get("batch") or {}).get("kind")
+            group = _batch_group(kind, request) if kind else None
+            if group is not None:
+                groups.setdefault((kind, group), []).append(request)
+                owners[id(request)] = section
+            else:
+                call = {key: request[key] for key in ("client", "endpoint", "params")}
+                assign(request_fingerprint(request), {**call, "batch": None}, section, request)
+
+    for (kind, _), requests in groups.items():
+        client = requests[0]["client"]
+        unique = {request_fingerprint(r): r for r in requests}
+        if len(unique) == 1:
+            # Nothing to merge: a plain (deduplicated) call
+            for request in requests:
+                call = {key: request[key] for key in ("client", "endpoint", "params")}
+                assign(request_fingerprint(request), {**call, "batch": None}, owners[id(request)], request)
+            continue
+
+        max_size = int((apis[client].get("batch") or {}).get("max_size", BATCH_KINDS[kind]))
+        for params, members in _merge_batch(kind, requests, max_size):
+            call = {"client": client, "endpoint": requests[0]["endpoint"], "params": params, "batch": kind}
+            call_id = request_fingerprint(call)
+            for request in members:
+                assign(call_id, call, owners[id(request)], request)
+
+    return calls, section_calls
+
+
+def rate_limit_wait(clients: set, apis: Dict[str, Any]) -> float:
+    """
+    Longest rate limit queue wait allowed to any of the api clients.
+
+    A request queues for a per minute token at most its client's
+    max_wait_seconds before the limiter rejects it (an exhausted daily
+    quota rejects at once), so extending a section's deadline by this keeps
+    a cold run's token queue from timing the section out.
+    """
+    waits = [
+        float(limits.get("max_wait_seconds", DEFAULT_MAX_WAIT_SECONDS))
+        for limits in ((apis[client].get("rate_limits") or {}) for client in clients)
+        if limits.get("per_minute")
+    ]
+    return max(waits, default=0.0)
+
+
+def compile_plan(config: Dict[str, Any], today: date) -> Dict[str, Any]:
+    """
+    Compile feeds.yaml into an execution plan for one run.
+
+    Section dependencies form a DAG; sections are ordered by topological
+    wave and each lists the sections it depends on. Date placeholders are
+    resolved once for the whole run, and section requests are mapped onto
+    a minimal set of deduplicated and batched upstream calls.
+
+    Returns:
+        Dictionary with per-client concurrency limits, the resolved tokens,
+        the waves, the upstream calls and one entry per enabled section
+        (config, requests and the call serving each, dependencies and
+        which of them are optional, timeout
+        plus its clients' rate limit queue wait, retry policy and refresh
+        TTL in seconds)
+
+    Raises:
+        ValueError: On unknown api clients or batch kinds, dependencies on
+            missing or disabled sections, or dependency cycles
+    """
+    meta = config.get("meta") or {}
+    apis = config.get("apis") or {}
+    default_concurrency = meta.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    tokens = run_tokens(config, today)
+
+    for name, api in apis.items():
+        kind = (api.get("batch") or {}).get("kind")
+        if kind is not None and kind not in BATCH_KINDS:
+            raise ValueError(f"Api client {name} uses unknown batch kind: {kind}")
+
+    enabled = [s for s in config.get("sections", []) if s.get("enabled", True)]
+    dependencies = {s["id"]: section_dependencies(s) for s in enabled}
+    for section_id, deps in dependencies.items():
+        missing = deps - set(dependencies)
+        if missing:
+            raise ValueError(f"Section {section_id} depends on missing or disabled section(s): {sorted(missing)}")
+    waves = topological_waves(dependencies)
+    wave_of = {section_id: n for n, wave in enumerate(waves) for section_id in wave}
+
+    sections = []
+    for section in sorted(enabled, key=lambda s: wave_of[s["id"]]):
+        requests = compile_section_requests(section, tokens)
+        unknown = {r["client"] for r in requests} - set(apis)
+        if unknown:
+            raise ValueError(f"Section {section['id']} uses unknown api client(s): {sorted(unknown)}")
+        sections.append({
+            "id": section["id"],
+            "type": section["type"],
+            "config": section,
+            "requests": requests,
+            "depends_on": sorted(dependencies[section["id"]]),
+            "optional_depends_on": sorted(optional_section_dependencies(section)),
+            "wave": wave_of[section["id"]],
+            "timeout": float(section.get("timeout_seconds", meta.get("section_timeout_seconds", DEFAULT_SECTION_TIMEOUT_SECONDS)))
+            + rate_limit_wait({r["client"] for r in requests}, apis),
+            "retries": int(section.get("retries", meta.get("retries", DEFAULT_RETRIES))),
+            "retry_backoff": float(meta.get("retry_backoff_seconds", DEFAULT_RETRY_BACKOFF_SECONDS)),
+            "ttl": 60 * float(section.get("refresh_ttl_minutes", meta.get("refresh_ttl_minutes", DEFAULT_REFRESH_TTL_MINUTES))),
+        })
+
+    calls, section_calls = plan_upstream_calls(sections, apis)
+    for section in sections:
+        section["calls"] = section_calls[section["id"]]
+
+    return {
+        "date": today,
+        "tokens": tokens,
+        "apis": apis,
+        "concurrency": {
+            name: int(api.get("max_concurrency", default_concurrency)) for name, api in apis.items()
+        },
+        "waves": waves,
+        "calls": calls,
+        "sections": sections,
+    }
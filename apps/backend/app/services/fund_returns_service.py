@@ -0,0 +1,365 @@
+"""Vectorized cash-flow returns engine (IRR, TVPI, DPI, RVPI) for VC funds."""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.venture_capital import (
+    PrivateCompany,
+    FundingRound,
+    CompanyInvestor,
+    AcquisitionDeal,
+    PrivateValuation,
+    VentureCapitalFund,
+    Investor,
+    FundingRoundInvestor,
+)
+
+
+# IRR search bounds (annualized rate) and solver settings
+IRR_LOWER_BOUND = -0.9999
+IRR_UPPER_BOUND = 100.0
+IRR_TOLERANCE = 1e-7
+NEWTON_ITERATIONS = 50
+BISECTION_ITERATIONS = 200
+
+DAYS_PER_YEAR = 365.25
+
+
+def _npv(fund_index: np.ndarray, years: np.ndarray, amounts: np.ndarray, rates: np.ndarray, n: int) -> np.ndarray:
+    """Net present value of every fund's cash flows at that fund's rate."""
+    discount = np.power(1.0 + rates[fund_index], -years)
+    return np.bincount(fund_index, weights=amounts * discount, minlength=n)
+
+
+def solve_irr(fund_index: np.ndarray, years: np.ndarray, amounts: np.ndarray, n: int) -> np.ndarray:
+    """
+    Solve the IRR of many cash-flow series at once.
+
+    Cash flows for all funds are passed as flat arrays; each iteration updates
+    every fund's rate with one bincount, so cost scales with the number of
+    cash flows rather than with the number of funds times iterations in Python.
+    Newton's method runs first; funds that fail to converge or leave the
+    search bounds are finished by vectorized bisection.
+
+    Args:
+        fund_index: Fund position (0..n-1) of each cash flow
+        years: Time of each cash flow in years since the fund's first flow
+        amounts: Signed amounts (contributions negative, distributions/NAV positive)
+        n: Number of funds
+
+    Returns:
+        Array of annualized IRRs (NaN where no sign change makes IRR undefined)
+    """
+    irr = np.full(n, np.nan)
+    if n == 0 or len(amounts) == 0:
+        return irr
+
+    has_inflow = np.bincount(fund_index, weights=(amounts > 0), minlength=n) > 0
+    has_outflow = np.bincount(fund_index, weights=(amounts < 0), minlength=n) > 0
+    solvable = has_inflow & has_outflow
+
+    # Newton
+    rates = np.full(n, 0.1)
+    converged = np.zeros(n, dtype=bool)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for _ in range(NEWTON_ITERATIONS):
+            base = 1.0 + rates[fund_index]
+            discount = np.power(base, -years)
+            value = np.bincount(fund_index, weights=amounts * discount, minlength=n)
+            slope = np.bincount(fund_index, weights=-years * amounts * discount / base, minlength=n)
+            step = np.divide(value, slope, out=np.zeros(n), where=slope != 0)
+            rates = np.where(converged, rates, rates - step)
+            converged |= np.abs(step) < IRR_TOLERANCE
+            rates = np.clip(np.nan_to_num(rates, nan=0.1), IRR_LOWER_BOUND, IRR_UPPER_BOUND)
+
+        newton_ok = converged & (rates > IRR_LOWER_BOUND) & (rates < IRR_UPPER_BOUND)
+        newton_ok &= np.abs(_npv(fund_index, years, amounts, rates, n)) <= (
+            1e-6 * np.maximum(np.bincount(fund_index, weights=np.abs(amounts), minlength=n), 1.0)
+        )
+
+        # Bisection for the rest
+        lo = np.full(n, IRR_LOWER_BOUND)
+        hi = np.full(n, IRR_UPPER_BOUND)
+        f_lo = _npv(fund_index, years, amounts, lo, n)
+        f_hi = _npv(fund_index, years, amounts, hi, n)
+        bracketed = np.sign(f_lo) != np.sign(f_hi)
+        for _ in range(BISECTION_ITERATIONS):
+            mid = (lo + hi) / 2
+            f_mid = _npv(fund_index, years, amounts, mid, n)
+            left = np.sign(f_mid) == np.sign(f_lo)
+            lo = np.where(left, mid, lo)
+            f_lo = np.where(left, f_mid, f_lo)
+            hi = np.where(left, hi, mid)
+            if np.all((hi - lo)[bracketed & ~newton_ok] < IRR_TOLERANCE):
+                break
+
+    irr = np.where(newton_ok, rates, np.where(bracketed, (lo + hi) / 2, np.nan))
+    irr[~solvable] = np.nan
+    return irr
+
+
+class FundReturnsService:
+    """Service for cash-flow based VC fund performance metrics."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load_fund_holdings(self, fund_ids: Optional[List[int]]) -> List[tuple]:
+        """
+        Load (fund_id, investor_id, holding) rows for the requested funds.
+
+        Holdings are matched on the fund's investor entity; rows whose investor
+        has not been resolved yet fall back to the fund name.
+        """
+        resolved = self.db.query(Investor.fund_id, CompanyInvestor).join(
+            Investor, CompanyInvestor.investor_id == Investor.id
+        ).filter(Investor.fund_id.isnot(None))
+
+        unresolved = self.db.query(VentureCapitalFund.id, CompanyInvestor).join(
+            VentureCapitalFund, CompanyInvestor.investor_name == VentureCapitalFund.fund_name
+        ).filter(CompanyInvestor.investor_id.is_(None))
+
+        if fund_ids is not None:
+            resolved = resolved.filter(Investor.fund_id.in_(fund_ids))
+            unresolved = unresolved.filter(VentureCapitalFund.id.in_(fund_ids))
+
+        return [(fund_id, h.investor_id, h) for fund_id, h in resolved.all() + unresolved.all()]
+
+    def _load_round_participation(self, investor_ids: Iterable[int]) -> Dict[tuple, List[tuple]]:
+        """Map (investor_id, company_id) to the (date, amount_raised) of rounds the investor joined."""
+        investor_ids = set(investor_ids)
+        if not investor_ids:
+            return {}
+
+        rows = self.db.query(
+            FundingRoundInvestor.investor_id,
+            FundingRound.company_id,
+            FundingRound.announcement_date,
+            FundingRound.amount_raised,
+        ).join(
+            FundingRound, FundingRoundInvestor.funding_round_id == FundingRound.id
+        ).filter(FundingRoundInvestor.investor_id.in_(investor_ids)).all()
+
+        participation: Dict[tuple, List[tuple]] = {}
+        for investor_id, company_id, announced, amount in rows:
+            participation.setdefault((investor_id, company_id), []).append(
+                (announced, float(amount or 0))
+            )
+        return participation
+
+    def _load_company_context(self, company_ids: Iterable[int]) -> Dict[str, Dict[int, Any]]:
+        """Bulk-load first round dates, exits and latest valuations for companies."""
+        company_ids = set(company_ids)
+        if not company_ids:
+            return {"first_round": {}, "exits": {}, "latest_valuation": {}}
+
+        first_round = dict(
+            self.db.query(FundingRound.company_id, func.min(FundingRound.announcement_date))
+            .filter(FundingRound.company_id.in_(company_ids))
+            .group_by(FundingRound.company_id)
+            .all()
+        )
+
+        exits: Dict[int, tuple] = {}
+        for deal in self.db.query(
+            AcquisitionDeal.target_company_id, AcquisitionDeal.deal_date, AcquisitionDeal.acquisition_price
+        ).filter(
+            AcquisitionDeal.target_company_id.in_(company_ids),
+            AcquisitionDeal.acquisition_price.isnot(None),
+        ).order_by(AcquisitionDeal.id):
+            exits.setdefault(deal.target_company_id, (deal.deal_date, float(deal.acquisition_price)))
+
+        latest_dates = self.db.query(
+            PrivateValuation.company_id,
+            func.max(PrivateValuation.valuation_date).label("valuation_date"),
+        ).filter(
+            PrivateValuation.company_id.in_(company_ids)
+        ).group_by(PrivateValuation.company_id).subquery()
+
+        latest_valuation = {
+            company_id: float(valuation)
+            for company_id, valuation in self.db.query(
+                PrivateValuation.company_id, PrivateValuation.valuation
+            ).join(
+                latest_dates,
+                (PrivateValuation.company_id == latest_dates.c.company_id)
+                & (PrivateValuation.valuation_date == latest_dates.c.valuation_date),
+            )
+        }
+
+        return {"first_round": first_round, "exits": exits, "latest_valuation": latest_valuation}
+
+    def calculate_fund_returns(
+        self, fund_ids: Optional[List[int]] = None, as_of: Optional[date] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Compute IRR, TVPI, DPI and RVPI for many funds in one pass.
+
+        Cash flows per holding:
+        - Contributions: invested_amount, split across the funding rounds the
+          fund joined (weighted by round size), else at first_investment_date
+          or the company's first round
+        - Distributions: stake of the acquisition price at the deal date
+        - Residual value: stake of the latest private valuation (or the
+          company's estimated valuation) at `as_of`, for companies not exited
+
+        Args:
+            fund_ids: Funds to evaluate (all funds if None)
+            as_of: Valuation date for residual value (default today)
+
+        Returns:
+            Dictionary mapping fund ID to its return metrics
+        """
+        as_of = as_of or date.today()
+
+        query = self.db.query(VentureCapitalFund.id, VentureCapitalFund.fund_name)
+        if fund_ids is not None:
+            query = query.filter(VentureCapitalFund.id.in_(fund_ids))
+        funds = query.all()
+        positions = {fund_id: i for i, (fund_id, _) in enumerate(funds)}
+        n = len(funds)
+
+        holdings = self._load_fund_holdings([f.id for f in funds])
+        participation = self._load_round_participation(
+            investor_id for _, investor_id, _ in holdings if investor_id is not None
+        )
+        context = self._load_company_context(h.company_id for _, _, h in holdings)
+
+        company_ids = {h.company_id for _, _, h in holdings}
+        companies = {
+            c.id: c
+            for c in self.db.query(
+                PrivateCompany.id,
+                PrivateCompany.status,
+                PrivateCompany.founded_date,
+                PrivateCompany.estimated_valuation,
+            ).filter(PrivateCompany.id.in_(company_ids))
+        } if company_ids else {}
+
+        flow_fund: List[int] = []
+        flow_date: List[int] = []
+        flow_amount: List[float] = []
+        paid_in = np.zeros(n)
+        distributed = np.zeros(n)
+        residual = np.zeros(n)
+        undated = np.zeros(n, dtype=np.int64)
+
+        def add_flow(position: int, when: date, amount: float) -> None:
+            flow_fund.append(position)
+            flow_date.append(when.toordinal())
+            flow_amount.append(amount)
+
+        for fund_id, investor_id, holding in holdings:
+            position = positions[fund_id]
+            company = companies.get(holding.company_id)
+            invested = float(holding.invested_amount or 0)
+            stake = float(holding.stake_percentage or 0) / 100
+
+            # Contributions
+            if invested:
+                paid_in[position] += invested
+                rounds = participation.get((investor_id, holding.company_id))
+                if rounds:
+                    sizes = np.array([amount for _, amount in rounds])
+                    weights = sizes / sizes.sum() if sizes.sum() > 0 else np.full(len(rounds), 1 / len(rounds))
+                    for (announced, _), weight in zip(rounds, weights):
+                        add_flow(position, announced, -invested * weight)
+                else:
+                    invested_on = (
+                        holding.first_investment_date
+                        or context["first_round"].get(holding.company_id)
+                        or (company.founded_date if company else None)
+                    )
+                    if invested_on:
+                        add_flow(position, invested_on, -invested)
+                    else:
+                        undated[position] += 1
+
+            # Distributions or residual value
+            exit_deal = context["exits"].get(holding.company_id)
+            if company and company.status == "acquired" and exit_deal:
+                proceeds = exit_deal[1] * stake
+                distributed[position] += proceeds
+                if proceeds:
+                    add_flow(position, exit_deal[0], proceeds)
+            elif company and company.status != "shut_down":
+                valuation = context["latest_valuation"].get(holding.company_id)
+                if valuation is None and company.estimated_valuation is not None:
+                    valuation = float(company.estimated_valuation)
+                value = (valuation or 0) * stake
+                residual[position] += value
+                if value:
+                    add_flow(position, as_of, value)
+
+        fund_index = np.array(flow_fund, dtype=np.int64)
+        ordinals = np.array(flow_date, dtype=np.float64)
+        amounts = np.array(flow_amount, dtype=np.float64)
+
+        # Time each flow from its fund's first flow
+        first = np.full(n, np.inf)
+        np.minimum.at(first, fund_index, ordinals)
+        years = (ordinals - first[fund_index]) / DAYS_PER_YEAR if len(ordinals) else ordinals
+
+        irr = solve_irr(fund_index, years, amounts, n)
+        flow_counts = np.bincount(fund_index, minlength=n)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dpi = np.where(paid_in > 0, distributed / paid_in, np.nan)
+            rvpi = np.where(paid_in > 0, residual / paid_in, np.nan)
+        tvpi = dpi + rvpi
+
+        def metric(values: np.ndarray, i: int, digits: int = 4) -> Optional[float]:
+            return None if np.isnan(values[i]) else round(float(values[i]), digits)
+
+        return {
+            fund_id: {
+                "fund_id": fund_id,
+                "fund_name": fund_name,
+                "paid_in": float(paid_in[i]),
+                "distributions": float(distributed[i]),
+                "residual_value": float(residual[i]),
+                "total_value": float(distributed[i] + residual[i]),
+                "irr": metric(irr, i, 6),
+                "tvpi": metric(tvpi, i),
+                "dpi": metric(dpi, i),
+                "rvpi": metric(rvpi, i),
+                "cash_flows": int(flow_counts[i]),
+                "first_cash_flow_date": (
+                    date.fromordinal(int(first[i])).isoformat() if np.isfinite(first[i]) else None
+                ),
+                "undated_investments": int(undated[i]),
+            }
+            for i, (fund_id, fund_name) in enumerate(funds)
+        }
+
+    def get_fund_leaderboard(
+        self, sort_by: str = "irr", limit: int = 20, as_of: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Rank all funds by a return metric, computed in one batch.
+
+        Args:
+            sort_by: Metric to rank by ('irr', 'tvpi', 'dpi', 'rvpi')
+            limit: Maximum number of funds to return
+            as_of: Valuation date for residual value (default today)
+
+        Returns:
+            Dictionary with ranked fund return metrics
+        """
+        returns = self.calculate_fund_returns(as_of=as_of)
+        ranked = sorted(
+            returns.values(),
+            key=lambda r: (r[sort_by] is not None, r[sort_by] or 0),
+            reverse=True,
+        )
+
+        return {
+            "as_of": (as_of or date.today()).isoformat(),
+            "sort_by": sort_by,
+            "total_funds": len(ranked),
+            "funds": ranked[:limit],
+        }
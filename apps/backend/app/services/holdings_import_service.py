@@ -0,0 +1,225 @@
+"""Holdings import service for streaming CSV/NDJSON broker exports into a portfolio."""
+
+import csv
+import json
+import re
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.upsert import bulk_upsert
+from app.models.portfolio import PortfolioHolding
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Rows written per INSERT ... ON CONFLICT statement / transaction
+IMPORT_BATCH_SIZE = 500
+
+# Cap on per-row errors returned in the report (the count is always exact)
+MAX_REPORTED_ERRORS = 1000
+
+# Tickers like CBA.AX, BRK-B, ^GSPC, GC=F, EURUSD=X
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9^][A-Z0-9.\-=^/]{0,19}$")
+
+# Broker export column names mapped to holding fields
+COLUMN_ALIASES = {
+    "symbol": ("symbol", "ticker", "code", "security", "instrument"),
+    "quantity": ("quantity", "qty", "shares", "units", "position"),
+    "avg_buy_price": ("avg_buy_price", "avg_price", "average_price", "cost_basis", "avg_cost", "price"),
+}
+
+
+def normalize_symbol(raw: Optional[str]) -> str:
+    """
+    Normalize a broker symbol to the ticker format used for stored prices.
+
+    Args:
+        raw: Symbol as found in the export
+
+    Returns:
+        Upper-cased, trimmed symbol
+
+    Raises:
+        ValueError: If the symbol is empty or malformed
+    """
+    # NDJSON exports may carry numeric codes (e.g. 700 for 0700.HK)
+    symbol = ("" if raw is None else str(raw)).strip().upper().replace(" ", "")
+    if not symbol:
+        raise ValueError("missing symbol")
+    if not SYMBOL_PATTERN.match(symbol):
+        raise ValueError(f"invalid symbol: {raw!r}")
+    return symbol
+
+
+def _parse_decimal(raw, field: str, required: bool) -> Optional[Decimal]:
+    """Parse a finite numeric field, tolerating thousands separators and currency signs."""
+    if raw is None or str(raw).strip() == "":
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    try:
+        value = Decimal(str(raw).strip().replace(",", "").lstrip("$"))
+    except (InvalidOperation, ArithmeticError):
+        raise ValueError(f"invalid {field}: {raw!r}")
+    # NaN and Infinity parse fine but can't be compared or stored
+    if not value.is_finite():
+        raise ValueError(f"invalid {field}: {raw!r}")
+    return value
+
+
+def _resolve_field(record: dict, field: str):
+    """Find a holding field in a record by any of its known column aliases."""
+    for alias in COLUMN_ALIASES[field]:
+        if alias in record:
+            return record[alias]
+    return None
+
+
+def parse_holding(record: dict) -> dict:
+    """
+    Validate and normalize one import record into holding column values.
+
+    Args:
+        record: Mapping of lower-cased column name to raw value
+
+    Returns:
+        Dictionary with symbol, quantity and avg_buy_price
+
+    Raises:
+        ValueError: If the record cannot be imported
+    """
+    symbol = normalize_symbol(_resolve_field(record, "symbol"))
+    quantity = _parse_decimal(_resolve_field(record, "quantity"), "quantity", required=True)
+    if quantity <= 0:
+        raise ValueError(f"quantity must be positive: {quantity}")
+
+    avg_buy_price = _parse_decimal(
+        _resolve_field(record, "avg_buy_price"), "avg_buy_price", required=False
+    )
+    if avg_buy_price is not None and avg_buy_price < 0:
+        raise ValueError(f"avg_buy_price must not be negative: {avg_buy_price}")
+
+    return {
+        "symbol": symbol,
+        "quantity": quantity,
+        "avg_buy_price": avg_buy_price,
+    }
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into decoded text lines.
+
+    Only the current partial line is buffered, so memory use is independent of
+    the upload size.
+
+    Args:
+        chunks: Async iterator of raw body chunks
+
+    Yields:
+        Lines without their line terminator
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8-sig", errors="replace")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8-sig", errors="replace")
+
+
+class HoldingsImportService:
+    """Service for bulk importing portfolio holdings from broker exports."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def import_stream(
+        self, portfolio_id: int, chunks: AsyncIterator[bytes], fmt: str
+    ) -> dict:
+        """
+        Stream-parse a CSV or NDJSON export and upsert its holdings.
+
+        Rows are validated as they arrive and written in batches of
+        IMPORT_BATCH_SIZE with one INSERT ... ON CONFLICT (portfolio_id, symbol)
+        statement each. Existing holdings for a symbol are overwritten, except
+        that a row without an average buy price keeps the stored one.
+
+        Args:
+            portfolio_id: ID of the portfolio to import into
+            chunks: Async iterator of raw body chunks
+            fmt: 'csv' (header row required) or 'ndjson'
+
+        Returns:
+            Import report with row counts and per-row errors
+        """
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+
+        batch: list[dict] = []
+        rows_read = 0
+        rows_imported = 0
+        error_count = 0
+        errors: list[dict] = []
+        header: Optional[list[str]] = None
+        line_number = 0
+
+        async for line in iter_lines(chunks):
+            line_number += 1
+            if not line.strip():
+                continue
+
+            try:
+                if fmt == "csv":
+                    values = next(csv.reader([line]))
+                    if header is None:
+                        header = [v.strip().lower() for v in values]
+                        continue
+                    record = dict(zip(header, values))
+                else:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("expected a JSON object")
+                    record = {str(k).lower(): v for k, v in record.items()}
+
+                rows_read += 1
+                holding = parse_holding(record)
+            except (ValueError, ArithmeticError, csv.Error) as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": str(e)})
+                continue
+
+            batch.append({"portfolio_id": portfolio_id, **holding})
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                rows_imported += self._write_batch(batch)
+                batch = []
+
+        if batch:
+            rows_imported += self._write_batch(batch)
+
+        return {
+            "portfolio_id": portfolio_id,
+            "format": fmt,
+            "rows_read": rows_read,
+            "holdings_upserted": rows_imported,
+            "error_count": error_count,
+            "errors": errors,
+            "errors_truncated": error_count > len(errors),
+        }
+
+    def _write_batch(self, batch: list[dict]) -> int:
+        """Upsert one batch of holdings in its own transaction."""
+        written = bulk_upsert(
+            self.db,
+            PortfolioHolding,
+            batch,
+            conflict_columns=("portfolio_id", "symbol"),
+            update_columns=("quantity", "avg_buy_price"),
+            keep_existing_if_null=("avg_buy_price",),
+        )
+        self.db.commit()
+        return written
@@ -0,0 +1,163 @@
+"""Persistent, size-bounded cache of upstream JSON responses (SQLite file, LRU eviction)."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    params TEXT NOT NULL,
+    body TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size_bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def normalize_params(params: Optional[Dict[str, Any]], exclude: tuple = ()) -> Dict[str, str]:
+    """Query params as sorted strings (booleans lowercased), without excluded (credential) params."""
+    normalized = {}
+    for name in sorted(params or {}):
+        if name in exclude:
+            continue
+        value = params[name]
+        normalized[name] = str(value).lower() if isinstance(value, bool) else str(value)
+    return normalized
+
+
+def cache_key(url: str, params: Dict[str, str]) -> str:
+    """Cache key of a request: hash of its URL and normalized params."""
+    return hashlib.sha256(json.dumps([url, params], separators=(",", ":")).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Upstream response cache persisted in a SQLite file.
+
+    Entries outlive their TTL: an expired entry is kept for conditional
+    revalidation (ETag / Last-Modified) until evicted. When the stored
+    bodies exceed max_bytes, least recently used entries are evicted.
+    Methods block on file I/O; async callers run them in a worker thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open (and create) the cache file on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def lookup(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find an entry and count a hit (fresh), stale (expired) or miss.
+
+        Returns:
+            Dictionary with body, etag, last_modified, stored_at, expires_at and fresh, or None
+        """
+        now = now or time.time()
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT body, etag, last_modified, stored_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            body, etag, last_modified, stored_at, expires_at = row
+            fresh = expires_at > now
+            self.counters["hits" if fresh else "stale"] += 1
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return {
+            "body": json.loads(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": stored_at,
+            "expires_at": expires_at,
+            "fresh": fresh,
+        }
+
+    def store(
+        self,
+        key: str,
+        url: str,
+        params: Dict[str, str],
+        body: Any,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store a response for ttl seconds, then evict LRU entries beyond max_bytes."""
+        now = time.time()
+        encoded = json.dumps(body, separators=(",", ":"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, json.dumps(params), encoded, etag, last_modified, now, now + ttl, now, len(encoded)),
+            )
+            self.counters["stores"] += 1
+            self._evict(conn)
+
+    def revalidated(self, key: str, ttl: float) -> None:
+        """Extend an entry's freshness after the upstream answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (now + ttl, now, key)
+            )
+            self.counters["revalidated"] += 1
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete least recently used entries until the stored bodies fit in max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size_bytes FROM responses ORDER BY accessed_at"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.counters["evictions"] += len(victims)
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            self._connection().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the number of entries and stored bytes."""
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM responses"
+            ).fetchone()
+        lookups = self.counters["hits"] + self.counters["misses"] + self.counters["stale"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else None,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,380 @@
+"""Investor entity resolution and co-investment graph index for VC data."""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, union
+from sqlalchemy.orm import Session, aliased
+
+from app.db.upsert import bulk_upsert
+from app.models.venture_capital import (
+    CoInvestmentEdge,
+    CompanyInvestor,
+    FundingRound,
+    FundingRoundInvestor,
+    Investor,
+    InvestorAlias,
+    VentureCapitalFund,
+)
+
+
+# Legal-form suffixes ignored when matching investor names
+LEGAL_SUFFIXES = {"llc", "lp", "llp", "inc", "ltd", "limited", "co", "corp", "gmbh", "plc", "sa", "ag"}
+
+
+def normalize_investor_name(name: str) -> str:
+    """
+    Normalize an investor name for matching.
+
+    Lower-cases, turns '&' into 'and', drops punctuation and trailing legal
+    suffixes, so 'Sequoia Capital, LLC' and 'sequoia capital' match.
+
+    Args:
+        name: Investor name as written in the source data
+
+    Returns:
+        Normalized name ('' if nothing meaningful remains)
+    """
+    normalized = name.lower().replace("&", " and ")
+    tokens = re.sub(r"[^a-z0-9]+", " ", normalized).split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def split_investor_list(raw: Optional[str]) -> List[str]:
+    """Split a comma/semicolon-separated investor list into names."""
+    if not raw:
+        return []
+    return [name.strip() for name in re.split(r"[,;]", raw) if name.strip()]
+
+
+class InvestorResolver:
+    """
+    In-memory name/alias -> investor ID map.
+
+    Loaded with two queries, then resolves names without touching the
+    database; unknown names are created on demand.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._ids: Dict[str, int] = dict(
+            db.query(Investor.normalized_name, Investor.id).all()
+        )
+        self._ids.update(
+            db.query(InvestorAlias.normalized_alias, InvestorAlias.investor_id).all()
+        )
+
+    def resolve(
+        self, name: str, investor_type: Optional[str] = None, create: bool = True
+    ) -> Optional[int]:
+        """
+        Resolve an investor name or alias to an investor ID.
+
+        Args:
+            name: Investor name as written in the source data
+            investor_type: Type recorded when a new investor is created
+            create: Create the investor if no name or alias matches
+
+        Returns:
+            Investor ID, or None if unknown and create is False
+        """
+        normalized = normalize_investor_name(name)
+        if not normalized:
+            return None
+
+        investor_id = self._ids.get(normalized)
+        if investor_id is None and create:
+            investor = Investor(
+                name=name.strip(),
+                normalized_name=normalized,
+                investor_type=investor_type,
+            )
+            self.db.add(investor)
+            self.db.flush()
+            investor_id = self._ids[normalized] = investor.id
+
+        return investor_id
+
+    def add_alias(self, investor_id: int, alias: str) -> None:
+        """Register an alternative name for an investor."""
+        normalized = normalize_investor_name(alias)
+        if not normalized or normalized in self._ids:
+            return
+        self.db.add(InvestorAlias(
+            investor_id=investor_id,
+            alias=alias.strip(),
+            normalized_alias=normalized,
+        ))
+        self._ids[normalized] = investor_id
+
+
+class InvestorGraphService:
+    """Service for investor entities and the co-investment adjacency index."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sync_investor_entities(self) -> Dict[str, Any]:
+        """
+        Resolve free-text investor names into investor entities.
+
+        Links tracked funds to their investor entity, fills
+        company_investors.investor_id, expands funding round lead/investor
+        strings into funding_round_investors, then rebuilds the co-investment
+        index.
+
+        Returns:
+            Dictionary with counts of linked rows
+        """
+        resolver = InvestorResolver(self.db)
+
+        # Funds -> investor entities
+        fund_links = []
+        for fund_id, fund_name in self.db.query(VentureCapitalFund.id, VentureCapitalFund.fund_name).all():
+            investor_id = resolver.resolve(fund_name, "venture_capital")
+            if investor_id:
+                fund_links.append({"id": investor_id, "fund_id": fund_id})
+        self.db.bulk_update_mappings(Investor, fund_links)
+
+        # Company cap tables
+        holdings = self.db.query(
+            CompanyInvestor.id,
+            CompanyInvestor.investor_name,
+            CompanyInvestor.investor_type,
+        ).filter(CompanyInvestor.investor_id.is_(None)).all()
+
+        holding_links = [
+            {"id": h.id, "investor_id": investor_id}
+            for h in holdings
+            if (investor_id := resolver.resolve(h.investor_name, h.investor_type))
+        ]
+        self.db.bulk_update_mappings(CompanyInvestor, holding_links)
+
+        # Funding round participants
+        participants = []
+        for round_id, lead, others in self.db.query(
+            FundingRound.id, FundingRound.lead_investor, FundingRound.investors
+        ).all():
+            for name in split_investor_list(others):
+                investor_id = resolver.resolve(name)
+                if investor_id:
+                    participants.append({
+                        "funding_round_id": round_id,
+                        "investor_id": investor_id,
+                        "is_lead": False,
+                    })
+            if lead:
+                investor_id = resolver.resolve(lead)
+                if investor_id:
+                    participants.append({
+                        "funding_round_id": round_id,
+                        "investor_id": investor_id,
+                        "is_lead": True,
+                    })
+
+        round_links = 0
+        for start in range(0, len(participants), 1000):
+            round_links += bulk_upsert(
+                self.db,
+                FundingRoundInvestor,
+                participants[start:start + 1000],
+                conflict_columns=("funding_round_id", "investor_id"),
+                update_columns=("is_lead",),
+            )
+
+        self.db.commit()
+        edges = self.rebuild_co_investment_index()
+
+        return {
+            "funds_linked": len(fund_links),
+            "company_investors_linked": len(holding_links),
+            "round_participants_linked": round_links,
+            "co_investment_edges": edges,
+        }
+
+    def rebuild_co_investment_index(self) -> int:
+        """
+        Rebuild the co-investment adjacency table in SQL.
+
+        An investor pair is adjacent when both appear on the same company's cap
+        table or in any of its funding rounds; the edge weight is the number of
+        distinct shared companies. Edges are stored in both directions.
+
+        Returns:
+            Number of edges written
+        """
+        positions = union(
+            select(CompanyInvestor.company_id, CompanyInvestor.investor_id).where(
+                CompanyInvestor.investor_id.isnot(None)
+            ),
+            select(FundingRound.company_id, FundingRoundInvestor.investor_id).join(
+                FundingRound, FundingRoundInvestor.funding_round_id == FundingRound.id
+            ),
+        ).subquery()
+
+        a = aliased(positions)
+        b = aliased(positions)
+        pairs = select(
+            a.c.investor_id,
+            b.c.investor_id,
+            func.count(a.c.company_id),
+        ).join(
+            b, (a.c.company_id == b.c.company_id) & (a.c.investor_id != b.c.investor_id)
+        ).group_by(a.c.investor_id, b.c.investor_id)
+
+        self.db.execute(delete(CoInvestmentEdge))
+        result = self.db.execute(
+            insert(CoInvestmentEdge).from_select(
+                ["investor_id", "co_investor_id", "shared_companies"], pairs
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def get_co_investors(self, investor_id: int, limit: int = 20) -> Dict[str, Any]:
+        """
+        Get the investors that most often co-invest with an investor.
+
+        Args:
+            investor_id: ID of the investor
+            limit: Maximum number of co-investors to return
+
+        Returns:
+            Dictionary with the investor and ranked co-investors
+        """
+        investor = self.db.query(Investor).filter(Investor.id == investor_id).first()
+        if not investor:
+            return {"error": "Investor not found"}
+
+        rows = self.db.query(
+            Investor.id, Investor.name, Investor.investor_type, CoInvestmentEdge.shared_companies
+        ).join(
+            Investor, CoInvestmentEdge.co_investor_id == Investor.id
+        ).filter(
+            CoInvestmentEdge.investor_id == investor_id
+        ).order_by(
+            CoInvestmentEdge.shared_companies.desc()
+        ).limit(limit).all()
+
+        return {
+            "investor": {
+                "id": investor.id,
+                "name": investor.name,
+                "investor_type": investor.investor_type,
+                "fund_id": investor.fund_id,
+            },
+            "co_investors": [
+                {
+                    "investor_id": r.id,
+                    "investor_name": r.name,
+                    "investor_type": r.investor_type,
+                    "shared_companies": r.shared_companies,
+                }
+                for r in rows
+            ],
+        }
+
+    def get_top_syndicates(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Get the investor pairs with the most shared portfolio companies.
+
+        Args:
+            limit: Maximum number of pairs to return
+
+        Returns:
+            Dictionary with ranked investor pairs
+        """
+        first = aliased(Investor)
+        second = aliased(Investor)
+
+        rows = self.db.query(
+            first.id, first.name, second.id, second.name, CoInvestmentEdge.shared_companies
+        ).join(
+            first, CoInvestmentEdge.investor_id == first.id
+        ).join(
+            second, CoInvestmentEdge.co_investor_id == second.id
+        ).filter(
+            CoInvestmentEdge.investor_id < CoInvestmentEdge.co_investor_id
+        ).order_by(
+            CoInvestmentEdge.shared_companies.desc()
+        ).limit(limit).all()
+
+        return {
+            "syndicates": [
+                {
+                    "investors": [
+                        {"investor_id": r[0], "investor_name": r[1]},
+                        {"investor_id": r[2], "investor_name": r[3]},
+                    ],
+                    "shared_companies": r[4],
+                }
+                for r in rows
+            ],
+        }
+
+    def resolve_investor(self, name: str) -> Dict[str, Any]:
+        """
+        Resolve a name or alias to an investor without creating one.
+
+        Args:
+            name: Investor name or alias
+
+        Returns:
+            Dictionary with the matched investor, or an error
+        """
+        normalized = normalize_investor_name(name)
+
+        investor = self.db.query(Investor).filter(
+            Investor.normalized_name == normalized
+        ).first()
+        if not investor:
+            alias = self.db.query(InvestorAlias).filter(
+                InvestorAlias.normalized_alias == normalized
+            ).first()
+            investor = alias.investor if alias else None
+
+        if not investor:
+            return {"error": f"Investor not found: {name}"}
+
+        return {
+            "query": name,
+            "normalized": normalized,
+            "investor": {
+                "id": investor.id,
+                "name": investor.name,
+                "investor_type": investor.investor_type,
+                "fund_id": investor.fund_id,
+                "aliases": [a.alias for a in investor.aliases],
+            },
+        }
+
+    def add_investor_alias(self, investor_id: int, alias: str) -> Dict[str, Any]:
+        """
+        Register an alternative name for an investor.
+
+        Args:
+            investor_id: ID of the investor
+            alias: Alternative name (e.g. 'a16z')
+
+        Returns:
+            Dictionary with the investor and alias, or an error
+        """
+        investor = self.db.query(Investor).filter(Investor.id == investor_id).first()
+        if not investor:
+            return {"error": "Investor not found"}
+
+        resolver = InvestorResolver(self.db)
+        existing = resolver.resolve(alias, create=False)
+        if existing is not None and existing != investor_id:
+            return {"error": f"Alias already resolves to investor {existing}"}
+
+        resolver.add_alias(investor_id, alias)
+        self.db.commit()
+
+        return {
+            "investor_id": investor_id,
+            "alias": alias.strip(),
+            "normalized_alias": normalize_investor_name(alias),
+        }
@@ -0,0 +1,195 @@
+"""Batch IPO readiness scoring for every ipo_pipeline company in one vectorized pass."""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.venture_capital import (
+    PrivateCompany,
+    FundingRound,
+    IPOPipeline,
+    CompanyValuationTrend,
+)
+
+
+# Relative weight of each readiness signal (sums to 1)
+READINESS_WEIGHTS = {
+    "funding_recency": 0.20,
+    "valuation_trajectory": 0.20,
+    "revenue": 0.30,
+    "round_size": 0.15,
+    "sector_window": 0.15,
+}
+
+# A round this many days old contributes exp(-1) of full recency credit
+FUNDING_RECENCY_DAYS = 365
+
+# Valuation growth (first mark to latest) earning full trajectory credit
+FULL_TRAJECTORY_MULTIPLE = 4.0
+
+# log10 ranges mapped onto 0..1: $10M -> 0, $1B -> 1 revenue; $10M -> 0, $1B -> 1 largest round
+REVENUE_LOG_RANGE = (7.0, 9.0)
+ROUND_SIZE_LOG_RANGE = (7.0, 9.0)
+
+# Sector IPO window: IPOs listed in the trailing window, half credit at this many
+IPO_WINDOW_DAYS = 365
+SECTOR_WINDOW_HALF_CREDIT = 3
+
+# Minimum readiness score per confidence level
+CONFIDENCE_THRESHOLDS = (("high", 8), ("medium", 5))
+
+# Rows per bulk UPDATE statement
+SCORE_BATCH_SIZE = 1000
+
+
+def _log_scale(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    """Map positive values onto 0..1 on a log10 scale (non-positive -> 0)."""
+    logs = np.log10(np.where(values > 0, values, 1.0))
+    return np.where(values > 0, np.clip((logs - low) / (high - low), 0.0, 1.0), 0.0)
+
+
+def score_features(
+    days_since_round: np.ndarray,
+    valuation_change_percent: np.ndarray,
+    revenue: np.ndarray,
+    largest_round: np.ndarray,
+    sector_ipos: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Score readiness signals for all companies at once.
+
+    Missing inputs are NaN and earn no credit for that signal.
+
+    Returns:
+        Dictionary with each 0..1 signal, the weighted readiness score (1-10)
+        and the confidence level per company
+    """
+    signals = {
+        "funding_recency": np.nan_to_num(np.exp(-np.maximum(days_since_round, 0) / FUNDING_RECENCY_DAYS)),
+        "valuation_trajectory": np.nan_to_num(np.clip(
+            np.log1p(np.maximum(valuation_change_percent, -99.0) / 100) / np.log(FULL_TRAJECTORY_MULTIPLE),
+            0.0, 1.0,
+        )),
+        "revenue": _log_scale(np.nan_to_num(revenue), *REVENUE_LOG_RANGE),
+        "round_size": _log_scale(np.nan_to_num(largest_round), *ROUND_SIZE_LOG_RANGE),
+        "sector_window": sector_ipos / (sector_ipos + SECTOR_WINDOW_HALF_CREDIT),
+    }
+
+    weighted = sum(READINESS_WEIGHTS[name] * signal for name, signal in signals.items())
+    scores = 1 + np.rint(weighted * 9).astype(int)
+
+    confidence = np.full(scores.shape, "low", dtype=object)
+    for level, minimum in reversed(CONFIDENCE_THRESHOLDS):
+        confidence[scores >= minimum] = level
+
+    return {**signals, "readiness_score": scores, "confidence_level": confidence}
+
+
+class IPOReadinessService:
+    """Service for deriving ipo_pipeline readiness scores and confidence levels."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def score_pipeline(self, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Recompute readiness_score and confidence_level for every pipeline company.
+
+        Inputs are loaded with one query each (funding stats grouped by
+        company, precomputed valuation trends, recent IPOs grouped by sector),
+        scored as numpy arrays and written back with executemany UPDATEs.
+
+        Recent IPOs are counted by PrivateCompany.ipo_date. Companies marked
+        'ipo' without a listing date fall back to updated_at, which is only
+        an approximation: any later edit to the company moves it.
+
+        Args:
+            as_of: Scoring date (defaults to today)
+
+        Returns:
+            Dictionary with the number of companies scored and per-level counts
+        """
+        as_of = as_of or date.today()
+
+        rounds = select(
+            FundingRound.company_id,
+            func.max(FundingRound.announcement_date).label("last_round_date"),
+            func.max(FundingRound.amount_raised).label("largest_round"),
+        ).group_by(FundingRound.company_id).subquery()
+
+        candidates = self.db.execute(
+            select(
+                IPOPipeline.id,
+                PrivateCompany.sector,
+                PrivateCompany.revenue_estimate,
+                rounds.c.last_round_date,
+                rounds.c.largest_round,
+                CompanyValuationTrend.total_change_percent,
+            ).join(
+                PrivateCompany, PrivateCompany.id == IPOPipeline.company_id
+            ).outerjoin(
+                rounds, rounds.c.company_id == IPOPipeline.company_id
+            ).outerjoin(
+                CompanyValuationTrend, CompanyValuationTrend.company_id == IPOPipeline.company_id
+            ).order_by(IPOPipeline.id)
+        ).all()
+
+        if not candidates:
+            return {
+                "companies_scored": 0,
+                "as_of": as_of.isoformat(),
+                "high": 0,
+                "medium": 0,
+                "low": 0,
+                "avg_readiness_score": None,
+            }
+
+        window_start = as_of - timedelta(days=IPO_WINDOW_DAYS)
+        sector_ipos = dict(
+            self.db.query(PrivateCompany.sector, func.count(PrivateCompany.id)).filter(
+                PrivateCompany.status == "ipo",
+                or_(
+                    PrivateCompany.ipo_date >= window_start,
+                    and_(
+                        PrivateCompany.ipo_date.is_(None),
+                        PrivateCompany.updated_at >= datetime.combine(
+                            window_start, datetime.min.time(), tzinfo=timezone.utc
+                        ),
+                    ),
+                ),
+            ).group_by(PrivateCompany.sector).all()
+        )
+
+        ids, sectors, revenue, last_round, largest, change = zip(*candidates)
+
+        def as_floats(values) -> np.ndarray:
+            return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+        result = score_features(
+            days_since_round=as_floats((as_of - d).days if d else None for d in last_round),
+            valuation_change_percent=as_floats(change),
+            revenue=as_floats(revenue),
+            largest_round=as_floats(largest),
+            sector_ipos=as_floats(sector_ipos.get(s, 0) for s in sectors),
+        )
+
+        rows = [
+            {"id": pipeline_id, "readiness_score": int(score), "confidence_level": level}
+            for pipeline_id, score, level in zip(ids, result["readiness_score"], result["confidence_level"])
+        ]
+        for start in range(0, len(rows), SCORE_BATCH_SIZE):
+            self.db.execute(update(IPOPipeline), rows[start:start + SCORE_BATCH_SIZE])
+        self.db.commit()
+
+        levels = result["confidence_level"]
+        return {
+            "companies_scored": len(rows),
+            "as_of": as_of.isoformat(),
+            "high": int(np.sum(levels == "high")),
+            "medium": int(np.sum(levels == "medium")),
+            "low": int(np.sum(levels == "low")),
+            "avg_readiness_score": round(float(result["readiness_score"].mean()), 2),
+        }
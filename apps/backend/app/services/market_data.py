@@ -1,24 +1,402 @@
+import asyncio
+import copy
+import os
+import time
+from urllib.parse import urlsplit
+
 import httpx
-from typing import Dict, Any
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.feeds_config import load_feeds_config
+from app.services.http_cache import ResponseCache, cache_key, normalize_params
+from app.services.rate_limiter import QuotaExceededError, RateLimiter
+
+# Response cache TTLs (seconds) of the built-in endpoints; feeds.yaml clients set their own
+CACHE_TTLS = {
+    "alpha_vantage_quote": 10,
+    "coingecko_price": 60,
+    "coingecko_global": 300,
+    "fear_greed": 3600,
+    "trading_economics": 86400,
+}
+
+
+def _response(body: Any, source: str, stale_reason: Optional[str] = None, age_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Response body with where it came from; stale responses carry why and how old they are."""
+    return {
+        "body": body,
+        "source": source,
+        "stale": source == "stale",
+        "stale_reason": stale_reason,
+        "age_seconds": round(age_seconds, 1) if age_seconds is not None else None,
+    }
+
 
 class MarketDataService:
     """Service for fetching market data from various APIs."""
 
     def __init__(self):
         self.client = httpx.AsyncClient(timeout=30.0)
+        self.upstreams: Dict[str, Dict[str, Any]] = {}
+        self.cache = ResponseCache(settings.market_data_cache_path, settings.market_data_cache_max_bytes)
+        # Single-flight: request key -> the one in-flight fetch, and its number of waiters
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.flight_counters = {"flights": 0, "calls_saved": 0, "abandoned": 0}
+        # Client name -> rate limiter (None when feeds.yaml sets no rate_limits)
+        self.rate_limiters: Dict[str, Optional[RateLimiter]] = {}
+        # Upstream (client name, or host for unconfigured URLs) -> circuit breaker
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        # Cache keys with a background refresh in progress, and the refresh tasks
+        # (the event loop only keeps weak references to tasks)
+        self._refreshing: set[str] = set()
+        self._refresh_tasks: set[asyncio.Task] = set()
+
+    def configure_upstreams(self, apis: Dict[str, Dict[str, Any]]) -> None:
+        """Register feeds.yaml api clients (base URL, API key env var and param, cache TTLs, rate limits) by name."""
+        self.upstreams.update(apis)
+
+    def rate_limiter(self, client: str) -> Optional[RateLimiter]:
+        """
+        The rate limiter of an api client, created from its feeds.yaml rate_limits on first use.
+
+        Built-in methods share their client's quota with daily builds, so
+        feeds.yaml is loaded if no build has configured the upstreams yet.
+        """
+        if client not in self.rate_limiters:
+            if client not in self.upstreams:
+                self.configure_upstreams(load_feeds_config().get("apis") or {})
+            limits = (self.upstreams.get(client) or {}).get("rate_limits")
+            self.rate_limiters[client] = RateLimiter.from_config(client, limits) if limits else None
+        return self.rate_limiters[client]
+
+    def circuit_breaker(self, name: str) -> CircuitBreaker:
+        """The circuit breaker of an upstream, created from its feeds.yaml circuit_breaker block on first use."""
+        if name not in self.circuit_breakers:
+            if name not in self.upstreams and "." not in name:
+                self.configure_upstreams(load_feeds_config().get("apis") or {})
+            config = (self.upstreams.get(name) or {}).get("circuit_breaker")
+            self.circuit_breakers[name] = CircuitBreaker.from_config(name, config)
+        return self.circuit_breakers[name]
+
+    def stale_while_revalidate(self, client: Optional[str]) -> float:
+        """Seconds past expiry an interactive caller is served a cached response while it is refreshed."""
+        upstream = (self.upstreams.get(client) or {}) if client else {}
+        return float(upstream.get(
+            "stale_while_revalidate_seconds", settings.market_data_stale_while_revalidate_seconds
+        ))
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: float = 0,
+        headers: Optional[Dict[str, str]] = None,
+        secret_params: tuple = (),
+        client: Optional[str] = None,
+        priority: str = "interactive",
+    ) -> Any:
+        """GET a JSON response body (see _request; stale fallbacks are returned as is)."""
+        response = await self._request(url, params, ttl, headers, secret_params, client, priority)
+        return response["body"]
+
+    async def _request(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: float = 0,
+        headers: Optional[Dict[str, str]] = None,
+        secret_params: tuple = (),
+        client: Optional[str] = None,
+        priority: str = "interactive",
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        GET a JSON response, coalescing identical concurrent requests (single flight).
+
+        The first caller starts the fetch; identical requests arriving while
+        it is in flight await the same future instead of calling upstream
+        again, and receive their own copy of the result or the same
+        exception. A caller that is cancelled stops waiting without
+        affecting the others; the fetch itself is cancelled once nobody is
+        waiting for it. Nothing outlives the flight: errors are not cached.
+        Refreshes (which skip fresh cache entries) only coalesce with other
+        refreshes.
+
+        Returns:
+            Dictionary with body, source ('network', 'cache', 'revalidated'
+            or 'stale'), stale, stale_reason and age_seconds
+        """
+        key = cache_key(url, {
+            **normalize_params(params),
+            **{f"header:{name}": value for name, value in (headers or {}).items()},
+            **({"flight:refresh": "true"} if refresh else {}),
+        })
+        flight = self._inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = asyncio.ensure_future(
+                self._cached_get(url, params, ttl, headers, secret_params, client, priority, refresh)
+            )
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda done: self._land(key, done))
+            self.flight_counters["flights"] += 1
+        else:
+            self.flight_counters["calls_saved"] += 1
+
+        self._waiters[flight] = self._waiters.get(flight, 0) + 1
+        try:
+            result = await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if self._waiters[flight] == 1 and not flight.done():
+                flight.cancel()
+                self.flight_counters["abandoned"] += 1
+            raise
+        finally:
+            self._waiters[flight] -= 1
+            if not self._waiters[flight]:
+                del self._waiters[flight]
+        # Followers get a copy so no caller can mutate another's result
+        return result if leader else copy.deepcopy(result)
+
+    def _land(self, key: str, flight: asyncio.Future) -> None:
+        """Forget a finished flight, so the next identical request fetches again."""
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.cancelled():
+            # Marks the exception retrieved when every waiter was cancelled
+            flight.exception()
+
+    async def _cached_get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        ttl: float,
+        headers: Optional[Dict[str, str]],
+        secret_params: tuple,
+        client: Optional[str],
+        priority: str,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        GET a JSON response through the on-disk response cache and the upstream's circuit breaker.
+
+        Fresh entries are served without a request unless refresh is set
+        (a manual retry), which treats them as expired. Expired entries are
+        revalidated with If-None-Match / If-Modified-Since when the upstream
+        sent an ETag or Last-Modified (a 304 renews them); otherwise the
+        response is refetched and stored for ttl seconds. A ttl of 0
+        bypasses the cache. Credentials (secret_params, headers) are not
+        part of the cache key and are never stored. Only requests that reach
+        the network spend the client's rate limit tokens, queued by priority.
+
+        The last good response is served marked stale instead of waiting on
+        the upstream when its breaker is open, and (except to refreshes)
+        when a refresh of it is already pending and to interactive callers
+        within the stale-while-revalidate window; the refresh (or half-open
+        probe) then runs in the background. With nothing cached, an open breaker fails
+        fast with CircuitOpenError.
+        """
+        breaker = self.circuit_breaker(client or urlsplit(url).netloc)
+        key_params = normalize_params(params, exclude=secret_params)
+        key = cache_key(url, key_params)
+        entry = await asyncio.to_thread(self.cache.lookup, key) if ttl > 0 else None
+        if entry and entry["fresh"] and not refresh:
+            return _response(entry["body"], "cache")
+
+        if key in self._refreshing and entry and not refresh:
+            return self._stale(entry, breaker, "refresh_pending")
+        if not breaker.allow_request():
+            if entry:
+                return self._stale(entry, breaker, "circuit_open")
+            raise CircuitOpenError(f"{breaker.name} circuit open; retry in {breaker.status()['retry_in_seconds']}s")
+
+        download = self._download(url, params, ttl, headers, key, key_params, entry, breaker, client, priority)
+        swr = self.stale_while_revalidate(client)
+        if entry and not refresh and (breaker.state == "half_open" or (
+            priority == "interactive" and time.time() - entry["expires_at"] <= swr
+        )):
+            # Answer now; the refresh (or probe) updates the cache and the breaker
+            self._refreshing.add(key)
+            task = asyncio.create_task(download)
+            self._refresh_tasks.add(task)
+            task.add_done_callback(lambda done: self._refreshed(key, done))
+            return self._stale(entry, breaker, "revalidating")
+        return await download
 
-    async def get_alpha_vantage_quote(self, symbol: str) -> Dict[str, Any]:
-        """Fetch quote data from Alpha Vantage."""
+    async def _download(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        ttl: float,
+        headers: Optional[Dict[str, str]],
+        key: str,
+        key_params: Dict[str, str],
+        entry: Optional[Dict[str, Any]],
+        breaker: CircuitBreaker,
+        client: Optional[str],
+        priority: str,
+    ) -> Dict[str, Any]:
+        """
+        Make the network request (within the breaker's timeout), record the outcome and update the cache.
+
+        Rate limiting (no token within the limiter's max wait, or an upstream
+        429) is not an outage: it leaves the breaker untouched and serves the
+        cached entry, marked stale, when there is one.
+        """
+        conditional = dict(headers or {})
+        if entry and entry["etag"]:
+            conditional["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            conditional["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            limiter = self.rate_limiter(client) if client else None
+            if limiter:
+                try:
+                    await limiter.acquire(priority)
+                except QuotaExceededError:
+                    if entry:
+                        return self._stale(entry, breaker, "rate_limited")
+                    raise
+            try:
+                response = await self.client.get(
+                    url, params=params, headers=conditional, timeout=breaker.timeout_seconds
+                )
+            except httpx.TransportError:
+                breaker.record_failure()
+                if entry:
+                    return self._stale(entry, breaker, "upstream_error")
+                raise
+            if response.status_code >= 500:
+                breaker.record_failure()
+                if entry:
+                    return self._stale(entry, breaker, "upstream_error")
+            elif response.status_code == 429:
+                if entry:
+                    return self._stale(entry, breaker, "rate_limited")
+            else:
+                breaker.record_success()
+        finally:
+            breaker.release_probe()
+
+        if response.status_code == 304 and entry:
+            await asyncio.to_thread(self.cache.revalidated, key, ttl)
+            return _response(entry["body"], "revalidated")
+        response.raise_for_status()
+        body = response.json()
+        if ttl > 0:
+            await asyncio.to_thread(
+                self.cache.store, key, url, key_params, body, ttl,
+                response.headers.get("etag"), response.headers.get("last-modified"),
+            )
+        return _response(body, "network")
+
+    def _stale(self, entry: Dict[str, Any], breaker: CircuitBreaker, reason: str) -> Dict[str, Any]:
+        """The last good cached response, marked stale."""
+        breaker.counters["stale_served"] += 1
+        return _response(entry["body"], "stale", reason, time.time() - entry["stored_at"])
+
+    def _refreshed(self, key: str, task: asyncio.Task) -> None:
+        """A background refresh finished (its failure is already recorded by the breaker)."""
+        self._refreshing.discard(key)
+        self._refresh_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def cache_ttl(self, client: str, endpoint: str = "") -> float:
+        """Response cache TTL of a feeds.yaml client endpoint (cache_ttls, then cache_ttl_seconds, then the default)."""
+        upstream = self.upstreams[client]
+        ttls = upstream.get("cache_ttls") or {}
+        if endpoint in ttls:
+            return float(ttls[endpoint])
+        return float(upstream.get("cache_ttl_seconds", settings.market_data_cache_default_ttl_seconds))
+
+    async def fetch(
+        self,
+        client: str,
+        endpoint: str = "",
+        params: Optional[Dict[str, Any]] = None,
+        priority: str = "interactive",
+        refresh: bool = False,
+    ) -> Any:
+        """Fetch the JSON body from a configured feeds.yaml api client (see fetch_response)."""
+        response = await self.fetch_response(client, endpoint, params, priority, refresh)
+        return response["body"]
+
+    async def fetch_response(
+        self,
+        client: str,
+        endpoint: str = "",
+        params: Optional[Dict[str, Any]] = None,
+        priority: str = "interactive",
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Fetch JSON from a configured feeds.yaml api client, adding its API key.
+
+        Goes through single flight, the response cache, the client's circuit
+        breaker and its rate limiter; priority ('interactive', 'scheduled',
+        'backfill', 'background') orders requests waiting for a rate limit token. refresh
+        skips a fresh cache entry (it is still revalidated conditionally).
+
+        Returns:
+            Dictionary with body, source, stale, stale_reason and age_seconds
+        """
+        upstream = self.upstreams[client]
+        url = upstream["base_url"].rstrip("/") + endpoint
+        params = dict(params or {})
+        secret_params = ()
+        if upstream.get("api_key_env") and upstream.get("api_key_param"):
+            params[upstream["api_key_param"]] = os.environ.get(upstream["api_key_env"], "")
+            secret_params = (upstream["api_key_param"],)
+        return await self._request(
+            url, params, self.cache_ttl(client, endpoint),
+            secret_params=secret_params, client=client, priority=priority, refresh=refresh,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Upstream traffic metrics: cache and single-flight counters, rate limit headroom and breaker state per upstream."""
+        return {
+            "cache": self.cache.stats(),
+            "single_flight": {**self.flight_counters, "in_flight": len(self._inflight)},
+            "rate_limits": {
+                client: limiter.headroom() for client, limiter in sorted(self.rate_limiters.items()) if limiter
+            },
+            "circuit_breakers": {
+                name: breaker.status() for name, breaker in sorted(self.circuit_breakers.items())
+            },
+            "refreshing": len(self._refreshing),
+        }
+
+    async def get_alpha_vantage_quote(self, symbol: str, priority: str = "interactive") -> Dict[str, Any]:
+        """
+        Fetch quote data from Alpha Vantage.
+
+        Spends the alpha_vantage quota shared with daily builds; pollers pass
+        priority 'background' so they queue behind builds and user requests.
+        """
         url = f"{settings.alpha_vantage_base_url}/query"
         params = {
             "function": "GLOBAL_QUOTE",
             "symbol": symbol,
             "apikey": settings.alpha_vantage_api_key
         }
-        response = await self.client.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return await self._get(
+            url, params, CACHE_TTLS["alpha_vantage_quote"], secret_params=("apikey",), client="alpha_vantage",
+            priority=priority,
+        )
+
+    async def get_latest_price(self, symbol: str, priority: str = "interactive") -> Optional[Decimal]:
+        """Fetch the latest traded price for a symbol (None if unavailable); see get_alpha_vantage_quote for priority."""
+        quote = await self.get_alpha_vantage_quote(symbol, priority)
+        price = quote.get("Global Quote", {}).get("05. price")
+        try:
+            return Decimal(price) if price else None
+        except InvalidOperation:
+            return None
 
     async def get_coingecko_price(self, ids: str, vs_currencies: str = "usd,aud", include_24hr_change: bool = True) -> Dict[str, Any]:
         """Fetch cryptocurrency prices from CoinGecko."""
@@ -28,24 +406,18 @@ class MarketDataService:
             "vs_currencies": vs_currencies,
             "include_24hr_change": str(include_24hr_change).lower()
         }
-        response = await self.client.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return await self._get(url, params, CACHE_TTLS["coingecko_price"], client="coingecko")
 
     async def get_coingecko_global(self) -> Dict[str, Any]:
         """Fetch global crypto market data from CoinGecko."""
         url = f"{settings.coingecko_base_url}/global"
-        response = await self.client.get(url)
-        response.raise_for_status()
-        return response.json()
+        return await self._get(url, ttl=CACHE_TTLS["coingecko_global"], client="coingecko")
 
     async def get_fear_greed_index(self, limit: int = 1) -> Dict[str, Any]:
         """Fetch Fear & Greed Index."""
         url = settings.fear_greed_base_url
         params = {"limit": limit, "format": "json"}
-        response = await self.client.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return await self._get(url, params, CACHE_TTLS["fear_greed"], client="fear_greed")
 
     async def get_trading_economics_indicator(self, series: str) -> Dict[str, Any]:
         """Fetch economic indicator from Trading Economics."""
@@ -55,9 +427,7 @@ class MarketDataService:
             "fmt": "json"
         }
         headers = {"Authorization": f"Bearer {settings.trading_economics_api_key}"}
-        response = await self.client.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return await self._get(url, params, CACHE_TTLS["trading_economics"], headers=headers, client="trading_economics")
 
     async def close(self):
         """Close the HTTP client."""
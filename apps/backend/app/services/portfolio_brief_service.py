@@ -0,0 +1,146 @@
+"""Portfolio brief service for building portfolio analysis sections concurrently."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.portfolio_service import PortfolioService
+
+
+logger = logging.getLogger(__name__)
+
+# Cached briefs: portfolio_id -> (expires_at, brief)
+_brief_cache: dict[int, tuple[float, dict]] = {}
+
+
+def _run_section(fn: Callable[[PortfolioService], Any]) -> Any:
+    """
+    Run one brief section against its own database session.
+
+    Sections run in worker threads, so each opens a session of its own and
+    closes it as soon as the section returns. Threads can't be cancelled: a
+    section that misses its deadline keeps running (and holds its session)
+    until its queries finish, but never touches another section's session.
+
+    Args:
+        fn: Callable taking a PortfolioService and returning the section data
+
+    Returns:
+        Section data
+    """
+    db = SessionLocal()
+    try:
+        return fn(PortfolioService(db))
+    finally:
+        db.close()
+
+
+async def _section(
+    name: str, fn: Callable[[PortfolioService], Any], timeout: float, default: Any
+) -> tuple[str, Any, bool]:
+    """
+    Build a brief section within its deadline.
+
+    On timeout the brief stops waiting for the section; the worker thread is
+    not cancelled and releases its session when it finishes (see _run_section).
+
+    Args:
+        name: Section name
+        fn: Callable taking a PortfolioService and returning the section data
+        timeout: Deadline for the section in seconds
+        default: Value returned when the section times out or fails
+
+    Returns:
+        Tuple of (name, data, complete)
+    """
+    try:
+        data = await asyncio.wait_for(asyncio.to_thread(_run_section, fn), timeout)
+        return name, data, True
+    except asyncio.TimeoutError:
+        logger.warning("Portfolio brief section %s timed out after %ss", name, timeout)
+        return name, default, False
+    except Exception:
+        logger.exception("Portfolio brief section %s failed", name)
+        return name, default, False
+
+
+def invalidate_portfolio_brief(portfolio_id: int) -> None:
+    """Drop the cached brief for a portfolio."""
+    _brief_cache.pop(portfolio_id, None)
+
+
+async def build_portfolio_brief(
+    portfolio_id: int, news_days: int = 7, refresh: bool = False
+) -> dict:
+    """
+    Build the portfolio brief with all sections fetched in parallel.
+
+    Allocation, stats, relevant news and macro context are fetched concurrently,
+    each with its own deadline. Risk flags are derived from allocation and stats.
+    Sections that time out or fail are listed under 'partial_sections' and the
+    rest of the brief is still returned. Complete briefs are cached per
+    portfolio for settings.portfolio_brief_cache_ttl_seconds.
+
+    Args:
+        portfolio_id: ID of the portfolio
+        news_days: Number of days of news to consider
+        refresh: Bypass the cache and rebuild the brief
+
+    Returns:
+        Dictionary with allocation, stats, risk flags, news, macro context and narrative
+    """
+    now = time.monotonic()
+    cached = _brief_cache.get(portfolio_id)
+    if cached and not refresh and cached[0] > now:
+        return {**cached[1], "cached": True}
+
+    timeout = settings.portfolio_brief_section_timeout_seconds
+
+    results = await asyncio.gather(
+        _section("allocation", lambda s: s.get_allocation(portfolio_id), timeout, {}),
+        _section("stats", lambda s: s.get_portfolio_stats(portfolio_id), timeout, {}),
+        _section(
+            "relevant_news",
+            lambda s: s.get_relevant_news(portfolio_id, news_days),
+            timeout,
+            [],
+        ),
+        _section("macro_context", lambda s: s.get_macro_context(), timeout, []),
+    )
+
+    sections = {name: data for name, data, _ in results}
+    partial = [name for name, _, complete in results if not complete]
+
+    sections["risk_flags"] = PortfolioService.get_risk_flags(
+        sections["allocation"], sections["stats"]
+    )
+    if "allocation" in partial or "stats" in partial:
+        partial.append("risk_flags")
+
+    brief = {
+        "portfolio_id": portfolio_id,
+        "allocation": sections["allocation"],
+        "stats": sections["stats"],
+        "risk_flags": sections["risk_flags"],
+        "relevant_news": sections["relevant_news"],
+        "macro_context": sections["macro_context"],
+        "narrative": {
+            "summary": "",
+            "risk": "",
+            "macro": "",
+            "actions": ""
+        },
+        "partial_sections": partial,
+        "cached": False,
+    }
+
+    if not partial:
+        _brief_cache[portfolio_id] = (
+            now + settings.portfolio_brief_cache_ttl_seconds,
+            brief,
+        )
+
+    return brief
@@ -1,17 +1,56 @@
 """Portfolio service for calculating portfolio performance and fetching relevant data."""
 
-from datetime import date
+import hashlib
+import json
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import Optional
 
 import httpx
+import numpy as np
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models.portfolio import UserPortfolio, PortfolioHolding, PortfolioSnapshot
+from app.models.charts import ChartTimeseries
+from app.models.portfolio import UserPortfolio, PortfolioHolding, PortfolioSnapshot, PortfolioHoldingsBlob
 from app.models.news import News
+from app.models.snapshots import MacroIndicatorSnapshot
 from app.core.config import settings
 
 
+# Performance modes: stored snapshots only, prices only, or snapshots with price backfill
+PERFORMANCE_MODES = ("snapshots", "reconstructed", "auto")
+
+# Calendar days scanned before the window so the first day has a close to carry forward
+PRICE_LOOKBACK_BUFFER_DAYS = 10
+
+# Snapshot resolutions: each snapshot is tagged with the coarsest period it closes
+RESOLUTION_DAILY = 0
+RESOLUTION_WEEKLY = 1
+RESOLUTION_MONTHLY = 2
+RESOLUTION_NAMES = {
+    RESOLUTION_DAILY: "daily",
+    RESOLUTION_WEEKLY: "weekly",
+    RESOLUTION_MONTHLY: "monthly",
+}
+
+# Longest lookback served at each resolution (10 years monthly is ~120 points)
+DAILY_RESOLUTION_MAX_DAYS = 366
+WEEKLY_RESOLUTION_MAX_DAYS = 5 * 366
+
+# Snapshot gaps longer than this (per resolution) are backfilled from prices
+MAX_SNAPSHOT_GAP_DAYS = {
+    RESOLUTION_DAILY: 4,  # weekend + holiday
+    RESOLUTION_WEEKLY: 10,
+    RESOLUTION_MONTHLY: 35,
+}
+
+# Risk flag thresholds
+CONCENTRATION_LIMIT_PERCENT = 25.0
+MIN_DIVERSIFIED_HOLDINGS = 5
+DRAWDOWN_ALERT_PERCENT = -10.0
+
+
 class PortfolioService:
     """Service for portfolio management and analysis."""
 
@@ -125,14 +164,220 @@ class PortfolioService:
             snapshot_date=snapshot_date,
             total_value=total_value,
             total_gain_loss=total_gain_loss,
-            holdings_json=holdings_json,
+            holdings_hash=self._store_holdings_blob(holdings_json),
         )
         self.db.add(snapshot)
         self.db.commit()
         return snapshot
 
+    def _store_holdings_blob(self, holdings_json: dict) -> str:
+        """
+        Store holdings content once, keyed by the hash of its canonical JSON.
+
+        Args:
+            holdings_json: Holdings mapping as stored on snapshots
+
+        Returns:
+            Content hash referencing the stored blob
+        """
+        return self._store_holdings_blobs([holdings_json])[0]
+
+    def _store_holdings_blobs(self, holdings: list[dict]) -> list[str]:
+        """
+        Store many holdings mappings as blobs with one lookup of existing hashes.
+
+        Args:
+            holdings: Holdings mappings as stored on snapshots
+
+        Returns:
+            Content hash of each mapping, in input order
+        """
+        hashes = [
+            hashlib.sha256(
+                json.dumps(h, sort_keys=True, separators=(",", ":")).encode()
+            ).hexdigest()
+            for h in holdings
+        ]
+        if not hashes:
+            return hashes
+
+        existing = {
+            row.content_hash
+            for row in self.db.query(PortfolioHoldingsBlob.content_hash).filter(
+                PortfolioHoldingsBlob.content_hash.in_(set(hashes))
+            )
+        }
+
+        for content_hash, holdings_json in zip(hashes, holdings):
+            if content_hash not in existing:
+                self.db.add(PortfolioHoldingsBlob(
+                    content_hash=content_hash,
+                    holdings_json=holdings_json,
+                ))
+                existing.add(content_hash)
+        self.db.flush()
+
+        return hashes
+
+    @staticmethod
+    def get_snapshot_holdings(snapshot: PortfolioSnapshot) -> Optional[dict]:
+        """Get a snapshot's holdings from its blob, falling back to legacy inline JSON."""
+        if snapshot.holdings_blob is not None:
+            return snapshot.holdings_blob.holdings_json
+        return snapshot.holdings_json
+
+    @staticmethod
+    def _period_key(day: date, resolution: int):
+        """Get the period a date falls in at a resolution (day, ISO week or month)."""
+        if resolution == RESOLUTION_MONTHLY:
+            return day.year, day.month
+        if resolution == RESOLUTION_WEEKLY:
+            return day.isocalendar()[:2]
+        return day
+
+    @staticmethod
+    def resolution_for_lookback(days: int) -> int:
+        """Pick the snapshot resolution that keeps a lookback to a few hundred points."""
+        if days <= DAILY_RESOLUTION_MAX_DAYS:
+            return RESOLUTION_DAILY
+        if days <= WEEKLY_RESOLUTION_MAX_DAYS:
+            return RESOLUTION_WEEKLY
+        return RESOLUTION_MONTHLY
+
+    def compact_portfolio_snapshots(
+        self,
+        portfolio_id: Optional[int] = None,
+        daily_retention_days: Optional[int] = None,
+        weekly_retention_days: Optional[int] = None,
+    ) -> dict:
+        """
+        Downsample old snapshots into weekly/monthly tiers and deduplicate holdings.
+
+        Every snapshot is tagged with the coarsest period it closes (last of its
+        month, last of its ISO week, or daily). Daily-only snapshots older than
+        the daily window and week-end snapshots older than the weekly window are
+        deleted. Inline holdings_json is moved into hash-keyed blobs, and blobs
+        no longer referenced by any snapshot are removed. Portfolios are
+        compacted one at a time, each in its own transaction.
+
+        Args:
+            portfolio_id: Compact a single portfolio (all portfolios if None)
+            daily_retention_days: Days of daily snapshots to keep
+            weekly_retention_days: Days of weekly snapshots to keep
+
+        Returns:
+            Dictionary with counts of retagged, deleted and deduplicated rows
+        """
+        if daily_retention_days is None:
+            daily_retention_days = settings.snapshot_daily_retention_days
+        if weekly_retention_days is None:
+            weekly_retention_days = settings.snapshot_weekly_retention_days
+
+        today = date.today()
+        daily_cutoff = today - timedelta(days=daily_retention_days)
+        weekly_cutoff = today - timedelta(days=weekly_retention_days)
+
+        if portfolio_id is not None:
+            portfolio_ids = [portfolio_id]
+        else:
+            portfolio_ids = [
+                row.portfolio_id
+                for row in self.db.query(PortfolioSnapshot.portfolio_id).distinct()
+            ]
+
+        totals = {
+            "snapshots_scanned": 0,
+            "snapshots_retagged": 0,
+            "snapshots_deleted": 0,
+            "holdings_deduplicated": 0,
+        }
+
+        # One portfolio per transaction keeps memory bounded by the largest history
+        for pid in portfolio_ids:
+            counts = self._compact_portfolio(pid, daily_cutoff, weekly_cutoff)
+            for key, value in counts.items():
+                totals[key] += value
+            self.db.commit()
+            self.db.expunge_all()
+
+        referenced = self.db.query(PortfolioSnapshot.holdings_hash).filter(
+            PortfolioSnapshot.holdings_hash.isnot(None)
+        )
+        orphaned_blobs = self.db.query(PortfolioHoldingsBlob).filter(
+            PortfolioHoldingsBlob.content_hash.notin_(referenced)
+        ).delete(synchronize_session=False)
+
+        self.db.commit()
+
+        return {**totals, "orphaned_blobs_deleted": orphaned_blobs}
+
+    def _compact_portfolio(self, portfolio_id: int, daily_cutoff: date, weekly_cutoff: date) -> dict:
+        """
+        Retag, prune and deduplicate one portfolio's snapshots (flushed, not committed).
+
+        Args:
+            portfolio_id: ID of the portfolio
+            daily_cutoff: Daily-only snapshots before this date are deleted
+            weekly_cutoff: Week-end snapshots before this date are deleted
+
+        Returns:
+            Dictionary with counts of scanned, retagged, deleted and deduplicated rows
+        """
+        snapshots = self.db.query(PortfolioSnapshot).filter(
+            PortfolioSnapshot.portfolio_id == portfolio_id
+        ).order_by(PortfolioSnapshot.snapshot_date).all()
+
+        # Last snapshot of each week and month
+        week_ends = {}
+        month_ends = {}
+        for s in snapshots:
+            week_ends[self._period_key(s.snapshot_date, RESOLUTION_WEEKLY)] = s.id
+            month_ends[self._period_key(s.snapshot_date, RESOLUTION_MONTHLY)] = s.id
+        week_end_ids = set(week_ends.values())
+        month_end_ids = set(month_ends.values())
+
+        retagged = 0
+        deleted = 0
+        inline = []
+
+        for s in snapshots:
+            if s.id in month_end_ids:
+                resolution = RESOLUTION_MONTHLY
+            elif s.id in week_end_ids:
+                resolution = RESOLUTION_WEEKLY
+            else:
+                resolution = RESOLUTION_DAILY
+
+            if (resolution < RESOLUTION_WEEKLY and s.snapshot_date < daily_cutoff) or (
+                resolution < RESOLUTION_MONTHLY and s.snapshot_date < weekly_cutoff
+            ):
+                self.db.delete(s)
+                deleted += 1
+                continue
+
+            if s.resolution != resolution:
+                s.resolution = resolution
+                retagged += 1
+
+            if s.holdings_json is not None:
+                inline.append(s)
+
+        hashes = self._store_holdings_blobs([s.holdings_json for s in inline])
+        for s, content_hash in zip(inline, hashes):
+            s.holdings_hash = content_hash
+            s.holdings_json = None
+
+        self.db.flush()
+
+        return {
+            "snapshots_scanned": len(snapshots),
+            "snapshots_retagged": retagged,
+            "snapshots_deleted": deleted,
+            "holdings_deduplicated": len(inline),
+        }
+
     def get_portfolio_performance(
-        self, portfolio_id: int, days: int = 30
+        self, portfolio_id: int, days: int = 30, mode: str = "auto"
     ) -> dict:
         """
         Get historical portfolio performance over the last N days.
@@ -140,19 +385,52 @@ class PortfolioService:
         Args:
             portfolio_id: ID of the portfolio
             days: Number of days to look back
+            mode: 'snapshots' to use stored snapshots only, 'reconstructed' to
+                rebuild every day from holdings x stored closes, or 'auto' to use
+                snapshots where they exist and reconstruct the gaps
 
         Returns:
             Dictionary with performance metrics and historical data
         """
-        from datetime import datetime, timedelta
+        if mode not in PERFORMANCE_MODES:
+            raise ValueError(f"Unknown performance mode: {mode}")
 
-        start_date = date.today() - timedelta(days=days)
-        snapshots = self.db.query(PortfolioSnapshot).filter(
-            PortfolioSnapshot.portfolio_id == portfolio_id,
-            PortfolioSnapshot.snapshot_date >= start_date,
-        ).order_by(PortfolioSnapshot.snapshot_date).all()
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days)
+        resolution = self.resolution_for_lookback(days)
+
+        points: dict[date, dict] = {}
+
+        if mode != "reconstructed":
+            snapshots = self.db.query(PortfolioSnapshot).filter(
+                PortfolioSnapshot.portfolio_id == portfolio_id,
+                PortfolioSnapshot.resolution >= resolution,
+                PortfolioSnapshot.snapshot_date >= start_date,
+            ).order_by(PortfolioSnapshot.snapshot_date).all()
 
-        if not snapshots:
+            for s in snapshots:
+                points[s.snapshot_date] = {
+                    "date": s.snapshot_date,
+                    "value": float(s.total_value or Decimal("0")),
+                    "gain_loss": float(s.total_gain_loss or Decimal("0")),
+                    "source": "snapshot",
+                }
+
+        if mode != "snapshots":
+            gaps = self._find_snapshot_gaps(
+                sorted(points), start_date, end_date, MAX_SNAPSHOT_GAP_DAYS[resolution]
+            )
+            for point in self.reconstruct_portfolio_series(portfolio_id, gaps):
+                points.setdefault(point["date"], point)
+
+        # Keep the last point of each period so recent daily rows and
+        # reconstructed days match the tier chosen for the lookback
+        by_period = {}
+        for d in sorted(points):
+            by_period[self._period_key(d, resolution)] = points[d]
+        historical = list(by_period.values())
+
+        if not historical:
             return {
                 "performance": None,
                 "historical": [],
@@ -160,35 +438,159 @@ class PortfolioService:
                 "total_gain_loss": None,
             }
 
-        current = snapshots[-1]
-        first = snapshots[0]
+        current = historical[-1]
+        first = historical[0]
 
         # Calculate returns
-        start_value = first.total_value or Decimal("0")
-        current_value = current.total_value or Decimal("0")
+        start_value = first["value"]
+        current_value = current["value"]
         period_return = (
             (current_value - start_value) / start_value * 100
             if start_value > 0
-            else Decimal("0")
+            else 0.0
         )
 
         return {
             "performance": {
                 "period_return_percent": float(period_return),
-                "current_value": float(current_value),
-                "total_gain_loss": float(current.total_gain_loss or Decimal("0")),
-                "as_of_date": current.snapshot_date.isoformat(),
+                "current_value": current_value,
+                "total_gain_loss": current["gain_loss"],
+                "as_of_date": current["date"].isoformat(),
+                "mode": mode,
+                "resolution": RESOLUTION_NAMES[resolution],
             },
             "historical": [
                 {
-                    "date": s.snapshot_date.isoformat(),
-                    "value": float(s.total_value or Decimal("0")),
-                    "gain_loss": float(s.total_gain_loss or Decimal("0")),
+                    "date": p["date"].isoformat(),
+                    "value": p["value"],
+                    "gain_loss": p["gain_loss"],
+                    "source": p["source"],
                 }
-                for s in snapshots
+                for p in historical
             ],
         }
 
+    @staticmethod
+    def _find_snapshot_gaps(
+        snapshot_dates: list[date], start_date: date, end_date: date, max_gap_days: int
+    ) -> list[tuple[date, date]]:
+        """
+        Find the date ranges in a window that stored snapshots do not cover.
+
+        Args:
+            snapshot_dates: Sorted snapshot dates inside the window
+            start_date: First day of the window
+            end_date: Last day of the window
+            max_gap_days: Longest run of days between snapshots treated as covered
+
+        Returns:
+            List of inclusive (start, end) ranges that need reconstruction
+        """
+        gaps = []
+        cursor = start_date
+        for snapshot_date in snapshot_dates:
+            if (snapshot_date - cursor).days > max_gap_days:
+                gaps.append((cursor, snapshot_date - timedelta(days=1)))
+            cursor = snapshot_date + timedelta(days=1)
+
+        if snapshot_dates:
+            if (end_date - snapshot_dates[-1]).days > 0:
+                gaps.append((cursor, end_date))
+        else:
+            gaps.append((start_date, end_date))
+
+        return gaps
+
+    def reconstruct_portfolio_series(
+        self, portfolio_id: int, ranges: list[tuple[date, date]]
+    ) -> list[dict]:
+        """
+        Rebuild daily portfolio values from current holdings and stored closes.
+
+        All closes are loaded with a single query over the span of the requested
+        ranges, pivoted into a (date x symbol) matrix, forward-filled across
+        non-trading days per symbol and multiplied by the quantity vector.
+        Days on which any holding has no close yet are left out rather than
+        valued at zero against the full cost basis.
+
+        Args:
+            portfolio_id: ID of the portfolio
+            ranges: Inclusive (start, end) date ranges to reconstruct
+
+        Returns:
+            List of {date, value, gain_loss, source} points in date order
+        """
+        if not ranges:
+            return []
+
+        holdings = self.db.query(PortfolioHolding).filter(
+            PortfolioHolding.portfolio_id == portfolio_id
+        ).all()
+
+        if not holdings:
+            return []
+
+        symbols = sorted({h.symbol for h in holdings})
+        symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+
+        quantities = np.zeros(len(symbols))
+        total_cost = 0.0
+        for h in holdings:
+            quantities[symbol_index[h.symbol]] += float(h.quantity)
+            total_cost += float(h.quantity) * float(h.avg_buy_price or 0)
+
+        span_start = min(r[0] for r in ranges)
+        span_end = max(r[1] for r in ranges)
+
+        rows = self.db.query(
+            ChartTimeseries.symbol,
+            ChartTimeseries.date,
+            ChartTimeseries.close_price,
+        ).filter(
+            ChartTimeseries.symbol.in_(symbols),
+            ChartTimeseries.date >= span_start - timedelta(days=PRICE_LOOKBACK_BUFFER_DAYS),
+            ChartTimeseries.date <= span_end,
+        ).all()
+
+        if not rows:
+            return []
+
+        dates = sorted({r.date for r in rows})
+        date_index = {d: i for i, d in enumerate(dates)}
+
+        # Pivot closes into a (date x symbol) matrix, NaN where a symbol did not trade
+        prices = np.full((len(dates), len(symbols)), np.nan)
+        prices[
+            [date_index[r.date] for r in rows],
+            [symbol_index[r.symbol] for r in rows],
+        ] = [float(r.close_price) for r in rows]
+
+        # Forward-fill each column with its last known close (NaN until its first one)
+        filled_rows = np.where(~np.isnan(prices), np.arange(len(dates))[:, None], 0)
+        np.maximum.accumulate(filled_rows, axis=0, out=filled_rows)
+        prices = prices[filled_rows, np.arange(len(symbols))]
+        priced = ~np.isnan(prices).any(axis=1)
+
+        values = np.nan_to_num(prices) @ quantities
+
+        day_ordinals = np.array([d.toordinal() for d in dates])
+        in_range = np.zeros(len(dates), dtype=bool)
+        for range_start, range_end in ranges:
+            in_range |= (day_ordinals >= range_start.toordinal()) & (
+                day_ordinals <= range_end.toordinal()
+            )
+        in_range &= priced
+
+        return [
+            {
+                "date": dates[i],
+                "value": float(values[i]),
+                "gain_loss": float(values[i] - total_cost),
+                "source": "reconstructed",
+            }
+            for i in np.flatnonzero(in_range)
+        ]
+
     def get_relevant_news(
         self, portfolio_id: int, days: int = 7, limit: int = 20
     ) -> list[dict]:
@@ -239,3 +641,180 @@ class PortfolioService:
         ]
 
         return relevant[:limit]
+
+    def get_latest_closes(self, symbols: list[str]) -> dict[str, Decimal]:
+        """
+        Get the most recent stored close for each symbol.
+
+        Args:
+            symbols: List of stock ticker symbols
+
+        Returns:
+            Dictionary mapping symbol to latest close (symbols without data are omitted)
+        """
+        if not symbols:
+            return {}
+
+        latest = self.db.query(
+            ChartTimeseries.symbol,
+            func.max(ChartTimeseries.date).label("date"),
+        ).filter(
+            ChartTimeseries.symbol.in_(symbols)
+        ).group_by(ChartTimeseries.symbol).subquery()
+
+        rows = self.db.query(
+            ChartTimeseries.symbol, ChartTimeseries.close_price
+        ).join(
+            latest,
+            (ChartTimeseries.symbol == latest.c.symbol)
+            & (ChartTimeseries.date == latest.c.date),
+        ).all()
+
+        return {r.symbol: r.close_price for r in rows}
+
+    def get_allocation(self, portfolio_id: int) -> dict:
+        """
+        Get the portfolio allocation by holding at latest stored prices.
+
+        Holdings without a stored close are valued at their average buy price.
+
+        Args:
+            portfolio_id: ID of the portfolio
+
+        Returns:
+            Dictionary with total value and per-symbol value and weight
+        """
+        holdings = self.db.query(PortfolioHolding).filter(
+            PortfolioHolding.portfolio_id == portfolio_id
+        ).all()
+
+        closes = self.get_latest_closes([h.symbol for h in holdings])
+
+        values = {}
+        unpriced = []
+        for h in holdings:
+            price = closes.get(h.symbol)
+            if price is None:
+                unpriced.append(h.symbol)
+                price = h.avg_buy_price or Decimal("0")
+            values[h.symbol] = values.get(h.symbol, Decimal("0")) + h.quantity * price
+
+        total_value = sum(values.values(), Decimal("0"))
+
+        return {
+            "total_value": float(total_value),
+            "holdings": [
+                {
+                    "symbol": symbol,
+                    "value": float(value),
+                    "weight_percent": float(value / total_value * 100) if total_value > 0 else 0.0,
+                }
+                for symbol, value in sorted(values.items(), key=lambda kv: kv[1], reverse=True)
+            ],
+            "unpriced_symbols": unpriced,
+        }
+
+    def get_portfolio_stats(self, portfolio_id: int, days: int = 30) -> dict:
+        """
+        Get summary statistics for the portfolio over the last N days.
+
+        Args:
+            portfolio_id: ID of the portfolio
+            days: Number of days to look back
+
+        Returns:
+            Dictionary with return, value, gain/loss and daily volatility
+        """
+        performance = self.get_portfolio_performance(portfolio_id, days)
+        if not performance["performance"]:
+            return {}
+
+        values = np.array([p["value"] for p in performance["historical"]])
+        previous = values[:-1]
+        daily_returns = np.divide(
+            np.diff(values), previous, out=np.zeros_like(previous), where=previous > 0
+        )
+
+        return {
+            **performance["performance"],
+            "period_days": days,
+            "data_points": len(values),
+            "daily_volatility_percent": float(daily_returns.std() * 100) if len(daily_returns) > 1 else None,
+            "max_value": float(values.max()),
+            "min_value": float(values.min()),
+        }
+
+    @staticmethod
+    def get_risk_flags(allocation: dict, stats: dict) -> list[dict]:
+        """
+        Derive risk flags from a portfolio allocation and its statistics.
+
+        Args:
+            allocation: Output of get_allocation
+            stats: Output of get_portfolio_stats
+
+        Returns:
+            List of risk flags with type, severity and message
+        """
+        flags = []
+
+        for holding in allocation.get("holdings", []):
+            if holding["weight_percent"] > CONCENTRATION_LIMIT_PERCENT:
+                flags.append({
+                    "type": "concentration",
+                    "severity": "high",
+                    "symbol": holding["symbol"],
+                    "message": f"{holding['symbol']} is {holding['weight_percent']:.1f}% of the portfolio",
+                })
+
+        holding_count = len(allocation.get("holdings", []))
+        if 0 < holding_count < MIN_DIVERSIFIED_HOLDINGS:
+            flags.append({
+                "type": "diversification",
+                "severity": "medium",
+                "message": f"Only {holding_count} holdings in the portfolio",
+            })
+
+        period_return = stats.get("period_return_percent")
+        if period_return is not None and period_return < DRAWDOWN_ALERT_PERCENT:
+            flags.append({
+                "type": "drawdown",
+                "severity": "high",
+                "message": f"Portfolio is down {abs(period_return):.1f}% over {stats.get('period_days')} days",
+            })
+
+        if allocation.get("unpriced_symbols"):
+            flags.append({
+                "type": "missing_prices",
+                "severity": "low",
+                "symbols": allocation["unpriced_symbols"],
+                "message": "Some holdings have no stored prices and are valued at cost",
+            })
+
+        return flags
+
+    def get_macro_context(self) -> list[dict]:
+        """
+        Get the macro indicators from the most recent daily run.
+
+        Returns:
+            List of macro indicators with value, unit and change
+        """
+        latest_run_id = self.db.query(
+            func.max(MacroIndicatorSnapshot.daily_run_id)
+        ).scalar_subquery()
+
+        indicators = self.db.query(MacroIndicatorSnapshot).filter(
+            MacroIndicatorSnapshot.daily_run_id == latest_run_id
+        ).all()
+
+        return [
+            {
+                "name": i.name,
+                "value": i.value,
+                "unit": i.unit,
+                "change": i.change,
+                "date": i.date.isoformat() if i.date else None,
+            }
+            for i in indicators
+        ]
@@ -0,0 +1,213 @@
+"""Quote stream service for pushing live portfolio valuations to connected clients."""
+
+import asyncio
+from decimal import Decimal
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.models.portfolio import PortfolioHolding
+from app.services.market_data import market_data_service
+from app.services.rate_limiter import RateLimiter
+
+
+class PortfolioValuationStream:
+    """One connected client's view of a portfolio, revalued as quotes arrive."""
+
+    def __init__(self, portfolio_id: int, holdings: list[PortfolioHolding]):
+        self.portfolio_id = portfolio_id
+        self.positions: dict[str, tuple[Decimal, Decimal]] = {}
+        for h in holdings:
+            quantity, cost = self.positions.get(h.symbol, (Decimal("0"), Decimal("0")))
+            self.positions[h.symbol] = (
+                quantity + h.quantity,
+                cost + h.quantity * (h.avg_buy_price or Decimal("0")),
+            )
+        self.prices: dict[str, Decimal] = {}
+        self._changed = asyncio.Event()
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self.positions)
+
+    def update_price(self, symbol: str, price: Decimal) -> None:
+        """
+        Record a new quote and wake the sender.
+
+        Only the latest price per symbol is kept, so quotes arriving while the
+        client is still receiving the previous update are coalesced into one.
+        """
+        self.prices[symbol] = price
+        self._changed.set()
+
+    def valuation(self) -> dict:
+        """
+        Revalue the portfolio at the latest known prices.
+
+        Returns:
+            Dictionary with totals and per-holding value and P&L
+        """
+        total_value = Decimal("0")
+        total_cost = Decimal("0")
+        holdings = []
+
+        for symbol, (quantity, cost) in self.positions.items():
+            price = self.prices.get(symbol)
+            value = quantity * price if price is not None else None
+            holdings.append({
+                "symbol": symbol,
+                "quantity": float(quantity),
+                "price": float(price) if price is not None else None,
+                "value": float(value) if value is not None else None,
+                "gain_loss": float(value - cost) if value is not None else None,
+            })
+            if value is not None:
+                total_value += value
+                total_cost += cost
+
+        return {
+            "portfolio_id": self.portfolio_id,
+            "total_value": float(total_value),
+            "total_gain_loss": float(total_value - total_cost),
+            "priced_holdings": len(self.prices),
+            "holdings": holdings,
+        }
+
+    async def updates(self, heartbeat: float) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield a fresh valuation whenever prices change.
+
+        Yields None after `heartbeat` seconds without changes so callers can
+        keep idle connections alive.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            self._changed.clear()
+            yield self.valuation()
+
+
+class QuoteHub:
+    """
+    Shared quote subscriptions fanned out to every connected portfolio.
+
+    Each symbol is polled by exactly one task while at least one connected
+    portfolio holds it, so upstream cost grows with unique symbols rather than
+    with the number of clients. Polls are spaced out so that all symbols
+    together spend at most quota_share of every bucket of the quote api's
+    rate limiter, leaving the rest to daily builds and user requests.
+    """
+
+    def __init__(
+        self,
+        fetch_price: Callable[[str], Awaitable[Optional[Decimal]]],
+        poll_interval: float,
+        rate_limiter: Optional[Callable[[], Optional[RateLimiter]]] = None,
+        quota_share: float = 1.0,
+    ):
+        self._fetch_price = fetch_price
+        self._poll_interval = poll_interval
+        self._rate_limiter = rate_limiter
+        self._quota_share = quota_share
+        self._subscribers: dict[str, set[PortfolioValuationStream]] = {}
+        self._pollers: dict[str, asyncio.Task] = {}
+        self._last_prices: dict[str, Decimal] = {}
+
+    def subscribe(self, stream: PortfolioValuationStream) -> None:
+        """Attach a stream to the quote feeds of all its symbols."""
+        for symbol in stream.symbols:
+            self._subscribers.setdefault(symbol, set()).add(stream)
+            if symbol in self._last_prices:
+                stream.update_price(symbol, self._last_prices[symbol])
+            if symbol not in self._pollers:
+                self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+
+    def unsubscribe(self, stream: PortfolioValuationStream) -> None:
+        """Detach a stream, stopping pollers for symbols nobody holds any more."""
+        for symbol in stream.symbols:
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(stream)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._last_prices.pop(symbol, None)
+                poller = self._pollers.pop(symbol, None)
+                if poller:
+                    poller.cancel()
+
+    def poll_interval(self) -> float:
+        """
+        Seconds between polls of each symbol.
+
+        At least the configured interval, stretched so that one poll per
+        symbol per interval fits in quota_share of each rate limit bucket.
+        """
+        limiter = self._rate_limiter() if self._rate_limiter else None
+        if limiter is None:
+            return self._poll_interval
+        symbols = max(len(self._pollers), 1)
+        return max(
+            [self._poll_interval]
+            + [symbols / (self._quota_share * bucket.rate) for bucket in limiter.buckets.values()]
+        )
+
+    def stats(self) -> dict:
+        """Get the number of live symbol subscriptions and connected streams, and the poll interval."""
+        streams = set().union(*self._subscribers.values()) if self._subscribers else set()
+        return {
+            "symbols": len(self._pollers),
+            "streams": len(streams),
+            "poll_interval_seconds": round(self.poll_interval(), 1),
+        }
+
+    async def _poll(self, symbol: str) -> None:
+        """Poll one symbol and publish changed prices to its subscribers."""
+        while True:
+            try:
+                price = await self._fetch_price(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                price = None
+
+            if price is not None and price != self._last_prices.get(symbol):
+                self._last_prices[symbol] = price
+                for stream in self._subscribers.get(symbol, ()):
+                    stream.update_price(symbol, price)
+
+            await asyncio.sleep(self.poll_interval())
+
+
+async def stream_portfolio_valuations(
+    portfolio_id: int, holdings: list[PortfolioHolding]
+) -> AsyncIterator[Optional[dict]]:
+    """
+    Subscribe a portfolio to live quotes and yield revalued snapshots.
+
+    Args:
+        portfolio_id: ID of the portfolio
+        holdings: Holdings to value
+
+    Yields:
+        Valuation dictionaries, or None as a keep-alive heartbeat
+    """
+    stream = PortfolioValuationStream(portfolio_id, holdings)
+    quote_hub.subscribe(stream)
+    try:
+        async for update in stream.updates(settings.stream_heartbeat_seconds):
+            yield update
+    finally:
+        quote_hub.unsubscribe(stream)
+
+
+# Global hub instance; its pollers queue for quota behind daily builds
+quote_hub = QuoteHub(
+    fetch_price=partial(market_data_service.get_latest_price, priority="background"),
+    poll_interval=settings.quote_poll_interval_seconds,
+    rate_limiter=partial(market_data_service.rate_limiter, "alpha_vantage"),
+    quota_share=settings.quote_poll_quota_share,
+)
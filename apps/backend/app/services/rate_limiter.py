@@ -0,0 +1,143 @@
+"""Per-upstream token bucket rate limiting (minute and day quotas) with priority queueing."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, Optional
+
+
+# Lower values are served first; background covers pollers nobody is waiting on
+PRIORITIES = {"interactive": 0, "scheduled": 1, "backfill": 2, "background": 3}
+
+# Longest a request may queue for a token before it is rejected
+DEFAULT_MAX_WAIT_SECONDS = 60.0
+
+
+class QuotaExceededError(Exception):
+    """Raised when a request can't get a rate limit token within its client's max wait."""
+
+
+class TokenBucket:
+    """Token bucket holding up to `capacity` tokens, refilled evenly over `period` seconds."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float, count: int = 1) -> float:
+        """Seconds until `count` tokens have accrued (0 if they are available now)."""
+        self.refill(now)
+        return max(0.0, (count - self.tokens) / self.rate)
+
+    def take(self) -> None:
+        """Spend one token."""
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    Quota enforcement for one upstream client.
+
+    A request takes one token from every bucket (per minute, per day).
+    When tokens run out, requests queue by priority (then arrival) and a
+    dispatcher hands out tokens as the buckets refill, so interactive
+    traffic jumps ahead of scheduled builds and backfills. Requests whose
+    expected wait exceeds max_wait_seconds are rejected immediately.
+    """
+
+    def __init__(self, client: str, per_minute: Optional[int] = None, per_day: Optional[int] = None,
+                 max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS):
+        self.client = client
+        self.buckets: Dict[str, TokenBucket] = {}
+        if per_minute:
+            self.buckets["minute"] = TokenBucket(per_minute, 60.0)
+        if per_day:
+            self.buckets["day"] = TokenBucket(per_day, 86400.0)
+        self.max_wait_seconds = max_wait_seconds
+        self.counters = {"granted": 0, "queued": 0, "rejected": 0}
+        self._queue: list = []
+        self._order = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, client: str, limits: Dict[str, Any]) -> "RateLimiter":
+        """Build a limiter from a feeds.yaml api's rate_limits block."""
+        return cls(
+            client,
+            per_minute=limits.get("per_minute"),
+            per_day=limits.get("per_day"),
+            max_wait_seconds=float(limits.get("max_wait_seconds", DEFAULT_MAX_WAIT_SECONDS)),
+        )
+
+    def _wait_time(self, count: int = 1) -> float:
+        """Seconds until every bucket holds `count` tokens."""
+        now = time.monotonic()
+        return max((bucket.wait_time(now, count) for bucket in self.buckets.values()), default=0.0)
+
+    def _take(self) -> None:
+        for bucket in self.buckets.values():
+            bucket.take()
+        self.counters["granted"] += 1
+
+    async def acquire(self, priority: str = "interactive") -> None:
+        """
+        Wait for a token of every bucket.
+
+        Raises:
+            QuotaExceededError: If no token is expected within max_wait_seconds
+        """
+        if not self._queue and self._wait_time() == 0:
+            self._take()
+            return
+
+        # Everything queued ahead (same or higher priority) is served first
+        rank = PRIORITIES.get(priority, PRIORITIES["interactive"])
+        ahead = sum(1 for entry in self._queue if entry[0] <= rank and not entry[2].done())
+        expected = self._wait_time(ahead + 1)
+        if expected > self.max_wait_seconds:
+            self.counters["rejected"] += 1
+            raise QuotaExceededError(
+                f"{self.client} rate limit: next slot in {expected:.0f}s (max wait {self.max_wait_seconds:g}s)"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (rank, next(self._order), waiter))
+        self.counters["queued"] += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        # A cancelled waiter stays in the heap and is skipped by the dispatcher
+        await waiter
+
+    async def _dispatch(self) -> None:
+        """Grant tokens to queued requests in priority order as buckets refill."""
+        while self._queue:
+            wait = self._wait_time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.done():
+                continue
+            self._take()
+            waiter.set_result(None)
+
+    def headroom(self) -> Dict[str, Any]:
+        """Available tokens per bucket, queue depth and counters."""
+        now = time.monotonic()
+        buckets = {}
+        for name, bucket in self.buckets.items():
+            bucket.refill(now)
+            buckets[name] = {"limit": bucket.capacity, "available": int(bucket.tokens)}
+        return {
+            **buckets,
+            "queued_now": sum(1 for entry in self._queue if not entry[2].done()),
+            **self.counters,
+        }
@@ -0,0 +1,281 @@
+"""Batch valuation trend computation with window functions over private valuations."""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, delete, distinct, extract, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db.upsert import bulk_upsert
+from app.models.venture_capital import (
+    PrivateCompany,
+    PrivateValuation,
+    CompanyValuationTrend,
+    SectorValuationIndex,
+)
+
+
+# Rows per trend upsert statement
+TREND_BATCH_SIZE = 1000
+
+SECTOR_INDEX_BASE = 100.0
+
+
+def _percent_change(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    """Percentage change between two marks (None if there is no positive base)."""
+    if current is None or not previous:
+        return None
+    return (current - previous) / previous * 100
+
+
+class ValuationTrendService:
+    """Service for precomputed valuation trends, markup rankings and sector indexes."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _valuation_window():
+        """Every valuation mark with its previous mark and position in the company's history."""
+        by_company = PrivateValuation.company_id
+        return select(
+            PrivateValuation.id,
+            PrivateValuation.company_id,
+            PrivateValuation.valuation_date,
+            PrivateValuation.valuation,
+            func.lag(PrivateValuation.valuation).over(
+                partition_by=by_company, order_by=PrivateValuation.valuation_date
+            ).label("previous_valuation"),
+            func.row_number().over(
+                partition_by=by_company, order_by=PrivateValuation.valuation_date
+            ).label("position"),
+            func.row_number().over(
+                partition_by=by_company, order_by=PrivateValuation.valuation_date.desc()
+            ).label("recency"),
+        ).subquery()
+
+    def recompute_valuation_trends(self) -> Dict[str, Any]:
+        """
+        Recompute valuation_vs_previous, company trends and the sector index.
+
+        All three are derived from one LAG/ROW_NUMBER window over
+        private_valuations: an UPDATE ... FROM fills valuation_vs_previous
+        (rows that already hold the right value are skipped), a GROUP BY over
+        the window yields one trend row per company, and a GROUP BY sector and
+        month yields the mark-to-mark changes the sector index is chained from.
+
+        Returns:
+            Dictionary with counts of rows written
+        """
+        window = self._valuation_window()
+
+        # valuation_vs_previous
+        change = case(
+            (
+                window.c.previous_valuation > 0,
+                (window.c.valuation - window.c.previous_valuation) * 100 / window.c.previous_valuation,
+            ),
+            else_=None,
+        )
+        marks_updated = self.db.execute(
+            update(PrivateValuation)
+            .where(PrivateValuation.id == window.c.id)
+            .where(PrivateValuation.valuation_vs_previous.is_distinct_from(change))
+            .values(valuation_vs_previous=change)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        # Per-company trend stats
+        latest = window.c.recency == 1
+        first = window.c.position == 1
+        stats = self.db.execute(
+            select(
+                window.c.company_id,
+                func.count(),
+                func.min(window.c.valuation),
+                func.max(window.c.valuation),
+                func.max(case((first, window.c.valuation_date))),
+                func.max(case((first, window.c.valuation))),
+                func.max(case((latest, window.c.valuation_date))),
+                func.max(case((latest, window.c.valuation))),
+                func.max(case((window.c.recency == 2, window.c.valuation))),
+            ).group_by(window.c.company_id)
+        ).all()
+
+        trends = []
+        for company_id, count, low, high, first_date, first_value, latest_date, latest_value, previous in stats:
+            latest_value = float(latest_value) if latest_value is not None else None
+            previous = float(previous) if previous is not None else None
+            first_value = float(first_value) if first_value is not None else None
+
+            trend = None
+            if previous is not None and latest_value is not None:
+                trend = "up" if latest_value > previous else "down" if latest_value < previous else "flat"
+
+            trends.append({
+                "company_id": company_id,
+                "valuation_count": count,
+                "first_valuation_date": first_date,
+                "first_valuation": first_value,
+                "latest_valuation_date": latest_date,
+                "latest_valuation": latest_value,
+                "previous_valuation": previous,
+                "max_valuation": float(high) if high is not None else None,
+                "min_valuation": float(low) if low is not None else None,
+                "latest_change_percent": _percent_change(latest_value, previous),
+                "total_change_percent": _percent_change(latest_value, first_value) if count > 1 else None,
+                "trend": trend,
+            })
+
+        self.db.execute(
+            delete(CompanyValuationTrend).where(
+                CompanyValuationTrend.company_id.not_in(select(PrivateValuation.company_id).distinct())
+            )
+        )
+        for start in range(0, len(trends), TREND_BATCH_SIZE):
+            batch = trends[start:start + TREND_BATCH_SIZE]
+            bulk_upsert(
+                self.db,
+                CompanyValuationTrend,
+                batch,
+                conflict_columns=("company_id",),
+                update_columns=[c for c in batch[0] if c != "company_id"],
+            )
+
+        # Sector index: mean mark-to-mark ratio per sector and month, chain-linked
+        year = extract("year", window.c.valuation_date)
+        month = extract("month", window.c.valuation_date)
+        changes = self.db.execute(
+            select(
+                PrivateCompany.sector,
+                year,
+                month,
+                func.avg(window.c.valuation / window.c.previous_valuation),
+                func.count(distinct(window.c.company_id)),
+            ).join(
+                PrivateCompany, PrivateCompany.id == window.c.company_id
+            ).where(
+                window.c.previous_valuation > 0
+            ).group_by(
+                PrivateCompany.sector, year, month
+            ).order_by(
+                PrivateCompany.sector, year, month
+            )
+        ).all()
+
+        index_rows = []
+        level: Dict[str, float] = {}
+        for sector, period_year, period_month, ratio, companies in changes:
+            ratio = float(ratio)
+            level[sector] = level.get(sector, SECTOR_INDEX_BASE) * ratio
+            index_rows.append({
+                "sector": sector,
+                "period_date": date(int(period_year), int(period_month), 1),
+                "index_value": round(level[sector], 6),
+                "avg_change_percent": round((ratio - 1) * 100, 6),
+                "company_count": companies,
+            })
+
+        self.db.execute(delete(SectorValuationIndex))
+        if index_rows:
+            self.db.execute(insert(SectorValuationIndex), index_rows)
+
+        self.db.commit()
+
+        return {
+            "valuation_marks_updated": marks_updated,
+            "company_trends": len(trends),
+            "sector_index_points": len(index_rows),
+            "sectors_indexed": len(level),
+        }
+
+    def get_company_trend(self, company_id: int) -> Optional[CompanyValuationTrend]:
+        """Get a company's precomputed trend row, if the batch job has produced one."""
+        return self.db.query(CompanyValuationTrend).filter(
+            CompanyValuationTrend.company_id == company_id
+        ).first()
+
+    def get_valuation_movers(
+        self,
+        direction: str = "up",
+        days: int = 365,
+        limit: int = 20,
+        sector: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rank the biggest markups or markdowns from precomputed trends.
+
+        Args:
+            direction: 'up' for markups (change > 0), 'down' for markdowns (change < 0)
+            days: Only consider companies whose latest mark is this recent
+            limit: Maximum number of companies to return
+            sector: Restrict to one sector
+
+        Returns:
+            Dictionary with companies ranked by latest mark-to-mark change
+        """
+        cutoff_date = date.today() - timedelta(days=days)
+        change = CompanyValuationTrend.latest_change_percent
+
+        query = self.db.query(CompanyValuationTrend, PrivateCompany).join(
+            PrivateCompany, CompanyValuationTrend.company_id == PrivateCompany.id
+        ).filter(
+            change > 0 if direction == "up" else change < 0,
+            CompanyValuationTrend.latest_valuation_date >= cutoff_date,
+        )
+        if sector:
+            query = query.filter(PrivateCompany.sector == sector)
+
+        rows = query.order_by(
+            change.desc() if direction == "up" else change.asc()
+        ).limit(limit).all()
+
+        return {
+            "direction": direction,
+            "period_days": days,
+            "sector": sector,
+            "movers": [
+                {
+                    "company_id": company.id,
+                    "company_name": company.company_name,
+                    "sector": company.sector,
+                    "funding_stage": company.funding_stage,
+                    "latest_valuation_date": trend.latest_valuation_date.isoformat(),
+                    "latest_valuation": float(trend.latest_valuation),
+                    "previous_valuation": float(trend.previous_valuation),
+                    "change_percent": round(float(trend.latest_change_percent), 2),
+                }
+                for trend, company in rows
+            ],
+        }
+
+    def get_sector_valuation_index(self, sector: str) -> Dict[str, Any]:
+        """
+        Get the monthly valuation index series for a sector.
+
+        Args:
+            sector: Sector name
+
+        Returns:
+            Dictionary with the index series, or an error
+        """
+        points = self.db.query(SectorValuationIndex).filter(
+            SectorValuationIndex.sector == sector
+        ).order_by(SectorValuationIndex.period_date).all()
+
+        if not points:
+            return {"error": f"No valuation index for sector: {sector}"}
+
+        return {
+            "sector": sector,
+            "base": SECTOR_INDEX_BASE,
+            "series": [
+                {
+                    "period": p.period_date.isoformat(),
+                    "index_value": float(p.index_value),
+                    "avg_change_percent": float(p.avg_change_percent) if p.avg_change_percent is not None else None,
+                    "company_count": p.company_count,
+                }
+                for p in points
+            ],
+        }
@@ -0,0 +1,369 @@
+"""Streaming bulk ingestion of private company, funding, investor, valuation and M&A datasets."""
+
+import argparse
+import asyncio
+import csv
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.upsert import bulk_upsert
+from app.models.venture_capital import (
+    PrivateCompany,
+    FundingRound,
+    CompanyInvestor,
+    AcquisitionDeal,
+    PrivateValuation,
+)
+from app.services.holdings_import_service import iter_lines
+from app.services.vc_sector_stats_service import VCSectorStatsService
+
+
+INGEST_FORMATS = ("csv", "jsonl")
+
+# Rows per INSERT ... ON CONFLICT statement / transaction (capped by bind parameter limits)
+INGEST_BATCH_SIZE = 5000
+MAX_BIND_PARAMETERS = 30000
+
+# Cap on per-row errors returned in the report (the count is always exact)
+MAX_REPORTED_ERRORS = 1000
+
+
+def _text(record: dict, field: str, required: bool = False) -> Optional[str]:
+    """Read a trimmed text field (None when blank)."""
+    value = record.get(field)
+    value = str(value).strip() if value is not None else ""
+    if not value:
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    return value
+
+
+def _decimal(record: dict, field: str, required: bool = False) -> Optional[Decimal]:
+    """Parse a finite numeric field, tolerating thousands separators and currency signs."""
+    value = _text(record, field, required)
+    if value is None:
+        return None
+    try:
+        number = Decimal(value.replace(",", "").lstrip("$"))
+    except (InvalidOperation, ArithmeticError):
+        raise ValueError(f"invalid {field}: {value!r}")
+    # NaN and Infinity parse fine but can't be compared, converted to int or stored
+    if not number.is_finite():
+        raise ValueError(f"invalid {field}: {value!r}")
+    return number
+
+
+def _int(record: dict, field: str) -> Optional[int]:
+    """Parse an integer field."""
+    value = _decimal(record, field)
+    return int(value) if value is not None else None
+
+
+def _date(record: dict, field: str, required: bool = False) -> Optional[date]:
+    """Parse an ISO date (a trailing time part is ignored)."""
+    value = _text(record, field, required)
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise ValueError(f"invalid {field}: {value!r}")
+
+
+def _bool(record: dict, field: str) -> bool:
+    """Parse a boolean flag (true/yes/1; blank is False)."""
+    value = record.get(field)
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y", "t")
+
+
+def _company_key(name: str) -> str:
+    """Normalize a company name for lookups (case and whitespace insensitive)."""
+    return " ".join(name.lower().split())
+
+
+def parse_company(record: dict) -> dict:
+    """Validate one private company record."""
+    return {
+        "company_name": _text(record, "company_name", required=True),
+        "symbol": _text(record, "symbol"),
+        "sector": _text(record, "sector", required=True),
+        "subsector": _text(record, "subsector"),
+        "description": _text(record, "description"),
+        "founded_date": _date(record, "founded_date"),
+        "headquarters": _text(record, "headquarters"),
+        "website": _text(record, "website"),
+        "funding_stage": _text(record, "funding_stage", required=True),
+        "status": _text(record, "status") or "active",
+        "ipo_date": _date(record, "ipo_date"),
+        "is_ai_focused": _bool(record, "is_ai_focused"),
+        "is_space_tech": _bool(record, "is_space_tech"),
+        "last_valuation": _decimal(record, "last_valuation"),
+        "last_valuation_date": _date(record, "last_valuation_date"),
+        "estimated_valuation": _decimal(record, "estimated_valuation"),
+        "revenue_estimate": _decimal(record, "revenue_estimate"),
+        "employee_count": _int(record, "employee_count"),
+    }
+
+
+def parse_funding_round(record: dict) -> dict:
+    """Validate one funding round record (company resolved separately)."""
+    amount_raised = _decimal(record, "amount_raised", required=True)
+    if amount_raised < 0:
+        raise ValueError(f"amount_raised must not be negative: {amount_raised}")
+    return {
+        "round_type": _text(record, "round_type", required=True),
+        "round_number": _text(record, "round_number"),
+        "announcement_date": _date(record, "announcement_date", required=True),
+        "amount_raised": amount_raised,
+        "valuation": _decimal(record, "valuation"),
+        "lead_investor": _text(record, "lead_investor"),
+        "investors": _text(record, "investors"),
+        "investor_count": _int(record, "investor_count"),
+        "notes": _text(record, "notes"),
+    }
+
+
+def parse_company_investor(record: dict) -> dict:
+    """Validate one cap table record (company resolved separately)."""
+    return {
+        "investor_name": _text(record, "investor_name", required=True),
+        "investor_type": _text(record, "investor_type"),
+        "stake_percentage": _decimal(record, "stake_percentage"),
+        "invested_amount": _decimal(record, "invested_amount"),
+        "first_investment_date": _date(record, "first_investment_date"),
+        "board_member": _bool(record, "board_member"),
+        "lead_investor": _bool(record, "lead_investor"),
+    }
+
+
+def parse_valuation(record: dict) -> dict:
+    """Validate one valuation record (company resolved separately)."""
+    return {
+        "valuation_date": _date(record, "valuation_date", required=True),
+        "valuation": _decimal(record, "valuation", required=True),
+        "source": _text(record, "source"),
+        "valuation_method": _text(record, "valuation_method"),
+        "valuation_vs_previous": _decimal(record, "valuation_vs_previous"),
+        "notes": _text(record, "notes"),
+    }
+
+
+def parse_acquisition(record: dict) -> dict:
+    """Validate one acquisition record (target company resolved separately)."""
+    return {
+        "acquirer_name": _text(record, "acquirer_name", required=True),
+        "acquirer_type": _text(record, "acquirer_type"),
+        "deal_date": _date(record, "deal_date", required=True),
+        "acquisition_price": _decimal(record, "acquisition_price"),
+        "deal_type": _text(record, "deal_type"),
+        "status": _text(record, "status"),
+        "notes": _text(record, "notes"),
+    }
+
+
+# dataset -> (model, company FK column or None, parser, conflict columns)
+DATASETS: Dict[str, tuple] = {
+    "companies": (PrivateCompany, None, parse_company, ("company_name",)),
+    "funding_rounds": (FundingRound, "company_id", parse_funding_round, ("company_id", "round_type", "announcement_date")),
+    "company_investors": (CompanyInvestor, "company_id", parse_company_investor, ("company_id", "investor_name")),
+    "valuations": (PrivateValuation, "company_id", parse_valuation, ("company_id", "valuation_date")),
+    "acquisitions": (AcquisitionDeal, "target_company_id", parse_acquisition, ("target_company_id", "acquirer_name", "deal_date")),
+}
+
+
+class VCIngestService:
+    """Service for bulk loading VC datasets from CSV/JSONL exports."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._company_ids: Optional[Dict[str, int]] = None
+        self._known_ids: Optional[set] = None
+
+    @property
+    def company_ids(self) -> Dict[str, int]:
+        """Normalized company name -> ID, loaded with one query on first use."""
+        if self._company_ids is None:
+            self._company_ids = {
+                _company_key(name): company_id
+                for name, company_id in self.db.query(PrivateCompany.company_name, PrivateCompany.id)
+            }
+        return self._company_ids
+
+    @property
+    def known_ids(self) -> set:
+        """IDs of all companies, for validating explicit company_id values."""
+        if self._known_ids is None:
+            self._known_ids = set(self.company_ids.values())
+        return self._known_ids
+
+    def _resolve_company(self, record: dict) -> int:
+        """Resolve a record's company by company_id or company name, without a query."""
+        company_id = _int(record, "company_id")
+        if company_id is not None:
+            # Checked here so a bad ID is a row error, not an FK violation mid-batch
+            if company_id not in self.known_ids:
+                raise ValueError(f"unknown company_id: {company_id}")
+            return company_id
+        name = _text(record, "company_name") or _text(record, "company") or _text(record, "target_company")
+        if name is None:
+            raise ValueError("missing company_name")
+        company_id = self.company_ids.get(_company_key(name))
+        if company_id is None:
+            raise ValueError(f"unknown company: {name!r}")
+        return company_id
+
+    async def ingest_stream(
+        self, dataset: str, chunks: AsyncIterator[bytes], fmt: str
+    ) -> Dict[str, Any]:
+        """
+        Stream-parse a CSV or JSONL export and bulk-upsert it.
+
+        Rows are validated as they arrive and written in batches with one
+        INSERT ... ON CONFLICT statement and one commit each, keyed on the
+        dataset's unique constraint, so re-loading an export updates rows in
+        place. Only the columns a row actually carries are updated on
+        conflict, so an export with fewer columns doesn't blank out the rest.
+        Company names resolve through an in-memory name -> ID map.
+
+        Args:
+            dataset: One of DATASETS ('companies', 'funding_rounds', ...)
+            chunks: Async iterator of raw body chunks
+            fmt: 'csv' (header row required) or 'jsonl'
+
+        Returns:
+            Ingestion report with row counts and per-row errors
+
+        Raises:
+            ValueError: If the dataset or format is not supported
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"Unsupported dataset: {dataset}")
+        if fmt not in INGEST_FORMATS:
+            raise ValueError(f"Unsupported ingest format: {fmt}")
+
+        model, company_column, parse, conflict_columns = DATASETS[dataset]
+        # Pending rows grouped by the columns they update on conflict
+        batch: Dict[tuple, list] = {}
+        batch_rows = 0
+        batch_size: Optional[int] = None
+        rows_read = 0
+        rows_written = 0
+        batches = 0
+        error_count = 0
+        errors: list[dict] = []
+        header: Optional[list[str]] = None
+        line_number = 0
+
+        async for line in iter_lines(chunks):
+            line_number += 1
+            if not line.strip():
+                continue
+
+            try:
+                if fmt == "csv":
+                    values = next(csv.reader([line]))
+                    if header is None:
+                        header = [v.strip().lower() for v in values]
+                        continue
+                    record = dict(zip(header, values))
+                else:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("expected a JSON object")
+                    record = {str(k).lower(): v for k, v in record.items()}
+
+                rows_read += 1
+                row = parse(record)
+                if company_column:
+                    row[company_column] = self._resolve_company(record)
+            except (ValueError, ArithmeticError, csv.Error) as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": str(e)})
+                continue
+
+            if batch_size is None:
+                batch_size = max(1, min(INGEST_BATCH_SIZE, MAX_BIND_PARAMETERS // len(row)))
+            update_columns = tuple(c for c in row if c in record and c not in conflict_columns)
+            batch.setdefault(update_columns, []).append(row)
+            batch_rows += 1
+            if batch_rows >= batch_size:
+                rows_written += self._write_batch(model, batch, conflict_columns)
+                batches += 1
+                batch = {}
+                batch_rows = 0
+
+        if batch:
+            rows_written += self._write_batch(model, batch, conflict_columns)
+            batches += 1
+
+        # Bulk upserts bypass incremental stats maintenance
+        if rows_written and model in (PrivateCompany, FundingRound):
+            VCSectorStatsService(self.db).rebuild()
+
+        return {
+            "dataset": dataset,
+            "format": fmt,
+            "rows_read": rows_read,
+            "rows_upserted": rows_written,
+            "batches": batches,
+            "error_count": error_count,
+            "errors": errors,
+            "errors_truncated": error_count > len(errors),
+        }
+
+    def _write_batch(self, model: Any, batch: Dict[tuple, list], conflict_columns: tuple) -> int:
+        """Upsert one batch in its own transaction, one statement per update column set."""
+        written = 0
+        for update_columns, rows in batch.items():
+            written += bulk_upsert(self.db, model, rows, conflict_columns, update_columns)
+        self.db.commit()
+
+        if model is PrivateCompany:
+            # New companies become resolvable for later datasets in this session
+            names = [row["company_name"] for rows in batch.values() for row in rows]
+            resolved = self.db.query(
+                PrivateCompany.company_name, PrivateCompany.id
+            ).filter(PrivateCompany.company_name.in_(names)).all()
+            self.company_ids.update((_company_key(name), company_id) for name, company_id in resolved)
+            self.known_ids.update(company_id for _, company_id in resolved)
+        return written
+
+
+async def _read_file(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """Yield a file's contents in chunks."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Command-line entry point: python -m app.services.vc_ingest_service DATASET FILE..."""
+    parser = argparse.ArgumentParser(description="Bulk load VC datasets from CSV/JSONL exports")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--format", choices=INGEST_FORMATS, help="Defaults to the file extension")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        service = VCIngestService(db)
+        for path in args.files:
+            fmt = args.format or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+            report = asyncio.run(service.ingest_stream(args.dataset, _read_file(path), fmt))
+            report["file"] = path
+            print(json.dumps(report, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""Materialized VC statistics per (sector, funding_stage, is_ai_focused, is_space_tech)."""
+
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import bulk_upsert
+from app.models.venture_capital import PrivateCompany, FundingRound, VCSectorStats
+
+
+STATS_KEY_COLUMNS = ("sector", "funding_stage", "is_ai_focused", "is_space_tech")
+STATS_VALUE_COLUMNS = ("company_count", "total_valuation", "round_count", "capital_raised")
+
+# Tables whose writes change the statistics
+SOURCE_TABLES = {PrivateCompany.__table__, FundingRound.__table__}
+
+# Set once bulk statements (which bypass per-object delta tracking) have been
+# committed; the next read rebuilds the table
+_stats_stale = False
+
+
+def _stats_key(sector, funding_stage, is_ai_focused, is_space_tech) -> tuple:
+    """Statistics key with NULL flags folded to False."""
+    return (sector, funding_stage or "unknown", bool(is_ai_focused), bool(is_space_tech))
+
+
+def _company_key(company: PrivateCompany) -> tuple:
+    """Statistics key of a company's current attribute values."""
+    return _stats_key(company.sector, company.funding_stage, company.is_ai_focused, company.is_space_tech)
+
+
+def _old_and_new(obj: Any, attr: str) -> tuple:
+    """(committed value, flushed value) of an attribute from its history."""
+    history = inspect(obj).attrs[attr].history
+    unchanged = history.unchanged[0] if history.unchanged else None
+    old = history.deleted[0] if history.deleted else unchanged
+    new = history.added[0] if history.added else unchanged
+    return old, new
+
+
+def _add(deltas: dict, key: tuple, companies=0, valuation=None, rounds=0, raised=None) -> None:
+    """Accumulate a delta for one statistics key."""
+    current = deltas.setdefault(key, [0, Decimal(0), 0, Decimal(0)])
+    current[0] += companies
+    current[1] += Decimal(valuation or 0)
+    current[2] += rounds
+    current[3] += Decimal(raised or 0)
+
+
+def _pending_deltas(session: Session) -> dict:
+    """
+    Deltas of the session's innermost transaction (savepoint or root).
+
+    Deltas are kept per transaction so rolling back a savepoint forgets only
+    what was flushed inside it.
+    """
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    return session.info.setdefault("vc_sector_stats_deltas", {}).setdefault(transaction, {})
+
+
+def _keep_committed_value(target, value, oldvalue, initiator):
+    """
+    No-op attribute set hook.
+
+    Registered with active_history so the committed value of an expired
+    attribute is loaded before it is overwritten; delta tracking reads it
+    back from the attribute history.
+    """
+    return value
+
+
+for _attribute in (
+    PrivateCompany.sector,
+    PrivateCompany.funding_stage,
+    PrivateCompany.is_ai_focused,
+    PrivateCompany.is_space_tech,
+    PrivateCompany.estimated_valuation,
+    FundingRound.company_id,
+    FundingRound.amount_raised,
+):
+    event.listen(_attribute, "set", _keep_committed_value, active_history=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stats_deltas(session, flush_context):
+    """
+    Turn flushed company and funding round changes into statistics deltas.
+
+    Companies whose stats key changed (or that were created or deleted) move
+    their whole contribution between keys, using their post-flush round
+    totals; other companies only get this flush's round deltas.
+    """
+    moved: Dict[int, list] = {}  # company_id -> [old key, old valuation, new key, new valuation]
+    valuation_deltas: Dict[int, Decimal] = {}
+    round_deltas: Dict[int, list] = {}  # company_id -> [rounds, raised]
+
+    def add_round(company_id, count, amount):
+        current = round_deltas.setdefault(company_id, [0, Decimal(0)])
+        current[0] += count
+        current[1] += Decimal(amount or 0)
+
+    for obj in session.new:
+        if isinstance(obj, PrivateCompany):
+            moved[obj.id] = [None, None, _company_key(obj), obj.estimated_valuation]
+        elif isinstance(obj, FundingRound):
+            add_round(obj.company_id, 1, obj.amount_raised)
+
+    for obj in session.deleted:
+        if isinstance(obj, PrivateCompany):
+            moved[obj.id] = [_company_key(obj), obj.estimated_valuation, None, None]
+        elif isinstance(obj, FundingRound):
+            add_round(obj.company_id, -1, -(obj.amount_raised or 0))
+
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, PrivateCompany):
+            old_key = _stats_key(*(_old_and_new(obj, c)[0] for c in STATS_KEY_COLUMNS))
+            new_key = _company_key(obj)
+            old_valuation, new_valuation = _old_and_new(obj, "estimated_valuation")
+            if old_key != new_key:
+                moved[obj.id] = [old_key, old_valuation, new_key, new_valuation]
+            elif old_valuation != new_valuation:
+                valuation_deltas[obj.id] = Decimal(new_valuation or 0) - Decimal(old_valuation or 0)
+        elif isinstance(obj, FundingRound):
+            old_company, new_company = _old_and_new(obj, "company_id")
+            old_amount, new_amount = _old_and_new(obj, "amount_raised")
+            if old_company != new_company:
+                add_round(old_company, -1, -(old_amount or 0))
+                add_round(new_company, 1, new_amount)
+            elif old_amount != new_amount:
+                add_round(new_company, 0, Decimal(new_amount or 0) - Decimal(old_amount or 0))
+
+    if not (moved or valuation_deltas or round_deltas):
+        return
+
+    deltas = _pending_deltas(session)
+
+    if moved:
+        totals = {
+            company_id: (count, raised or 0)
+            for company_id, count, raised in session.execute(
+                select(
+                    FundingRound.company_id,
+                    func.count(FundingRound.id),
+                    func.sum(FundingRound.amount_raised),
+                ).where(FundingRound.company_id.in_(moved)).group_by(FundingRound.company_id)
+            )
+        }
+        for company_id, (old_key, old_valuation, new_key, new_valuation) in moved.items():
+            rounds_after, raised_after = totals.get(company_id, (0, 0))
+            rounds_delta, raised_delta = round_deltas.pop(company_id, (0, 0))
+            if old_key is not None:
+                _add(deltas, old_key, -1, -(old_valuation or 0),
+                     -(rounds_after - rounds_delta), -(Decimal(raised_after) - raised_delta))
+            if new_key is not None:
+                _add(deltas, new_key, 1, new_valuation, rounds_after, raised_after)
+
+    remaining = set(valuation_deltas) | set(round_deltas)
+    if remaining:
+        keys = {
+            row.id: _stats_key(row.sector, row.funding_stage, row.is_ai_focused, row.is_space_tech)
+            for row in session.execute(
+                select(
+                    PrivateCompany.id,
+                    PrivateCompany.sector,
+                    PrivateCompany.funding_stage,
+                    PrivateCompany.is_ai_focused,
+                    PrivateCompany.is_space_tech,
+                ).where(PrivateCompany.id.in_(remaining))
+            )
+        }
+        for company_id in remaining:
+            if company_id not in keys:
+                continue
+            rounds, raised = round_deltas.get(company_id, (0, 0))
+            _add(deltas, keys[company_id], 0, valuation_deltas.get(company_id), rounds, raised)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_stats_deltas(session):
+    """Write accumulated statistics deltas in the committing transaction (or savepoint)."""
+    session.flush()
+    pending = session.info.pop("vc_sector_stats_deltas", None)
+    if not pending:
+        return
+
+    deltas: dict = {}
+    for transaction_deltas in pending.values():
+        for key, (companies, valuation, rounds, raised) in transaction_deltas.items():
+            _add(deltas, key, companies, valuation, rounds, raised)
+    if not deltas:
+        return
+
+    rows = [
+        {
+            **dict(zip(STATS_KEY_COLUMNS, key)),
+            **dict(zip(STATS_VALUE_COLUMNS, values)),
+        }
+        for key, values in deltas.items()
+    ]
+    bulk_upsert(
+        session,
+        VCSectorStats,
+        rows,
+        conflict_columns=STATS_KEY_COLUMNS,
+        update_columns=(),
+        increment_columns=STATS_VALUE_COLUMNS,
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_source_writes(orm_execute_state):
+    """Flag bulk INSERT/UPDATE/DELETE statements on source tables (no per-row deltas)."""
+    state = orm_execute_state
+    if (state.is_insert or state.is_update or state.is_delete) and getattr(
+        state.statement, "table", None
+    ) in SOURCE_TABLES:
+        state.session.info["vc_sector_stats_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_stats_stale(session):
+    """Schedule a rebuild once bulk source writes are committed."""
+    global _stats_stale
+    if session.info.pop("vc_sector_stats_stale", False):
+        _stats_stale = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stats_deltas(session):
+    """
+    Forget deltas of rolled back writes.
+
+    A savepoint rollback (the savepoint is still the session's nested
+    transaction here) drops only the deltas flushed inside it and keeps the
+    stale flag, since bulk writes before the savepoint may still commit.
+    """
+    nested = session.get_nested_transaction()
+    if nested is not None:
+        session.info.get("vc_sector_stats_deltas", {}).pop(nested, None)
+        return
+    session.info.pop("vc_sector_stats_deltas", None)
+    session.info.pop("vc_sector_stats_stale", None)
+
+
+class VCSectorStatsService:
+    """Service for reading and rebuilding the vc_sector_stats materialization."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Rebuild vc_sector_stats from scratch with one INSERT ... SELECT.
+
+        Returns:
+            Dictionary with the number of statistics rows written
+        """
+        global _stats_stale
+        _stats_stale = False
+
+        # Pending ORM changes are flushed first; the rebuild already reflects them
+        self.db.flush()
+        self.db.info.pop("vc_sector_stats_deltas", None)
+        self.db.info.pop("vc_sector_stats_stale", None)
+
+        rounds = select(
+            FundingRound.company_id,
+            func.count(FundingRound.id).label("round_count"),
+            func.sum(FundingRound.amount_raised).label("capital_raised"),
+        ).group_by(FundingRound.company_id).subquery()
+
+        is_ai_focused = func.coalesce(PrivateCompany.is_ai_focused, False)
+        is_space_tech = func.coalesce(PrivateCompany.is_space_tech, False)
+        stats = select(
+            PrivateCompany.sector,
+            PrivateCompany.funding_stage,
+            is_ai_focused,
+            is_space_tech,
+            func.count(PrivateCompany.id),
+            func.coalesce(func.sum(PrivateCompany.estimated_valuation), 0),
+            func.coalesce(func.sum(rounds.c.round_count), 0),
+            func.coalesce(func.sum(rounds.c.capital_raised), 0),
+        ).outerjoin(
+            rounds, rounds.c.company_id == PrivateCompany.id
+        ).group_by(
+            PrivateCompany.sector, PrivateCompany.funding_stage, is_ai_focused, is_space_tech
+        )
+
+        self.db.execute(delete(VCSectorStats))
+        result = self.db.execute(
+            insert(VCSectorStats).from_select(
+                [*STATS_KEY_COLUMNS, *STATS_VALUE_COLUMNS], stats
+            )
+        )
+        self.db.commit()
+        return {"stats_rows": result.rowcount}
+
+    def ensure_fresh(self) -> None:
+        """Rebuild if committed bulk writes have bypassed incremental maintenance."""
+        if _stats_stale:
+            self.rebuild()
+
+    def get_stage_totals(self, stage: Optional[str] = None, **filters: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        Get company, valuation and funding totals per funding stage.
+
+        Args:
+            stage: Only return this funding stage
+            **filters: Key column filters (sector, is_ai_focused, is_space_tech)
+
+        Returns:
+            Dictionary mapping funding stage to its totals
+        """
+        self.ensure_fresh()
+
+        query = self.db.query(
+            VCSectorStats.funding_stage,
+            func.sum(VCSectorStats.company_count),
+            func.sum(VCSectorStats.total_valuation),
+            func.sum(VCSectorStats.round_count),
+            func.sum(VCSectorStats.capital_raised),
+        ).filter_by(**filters).filter(VCSectorStats.company_count > 0)
+        if stage is not None:
+            query = query.filter(VCSectorStats.funding_stage == stage)
+
+        return {
+            funding_stage: {
+                "company_count": int(count),
+                "total_valuation": float(valuation),
+                "avg_valuation": float(valuation) / int(count) if count else 0,
+                "round_count": int(rounds),
+                "capital_raised": float(raised),
+            }
+            for funding_stage, count, valuation, rounds, raised in query.group_by(
+                VCSectorStats.funding_stage
+            ).all()
+        }
+
+    def get_totals(self, **filters: Any) -> Dict[str, Any]:
+        """
+        Get overall company count and valuation for a set of key filters.
+
+        Args:
+            **filters: Key column filters (sector, is_ai_focused, is_space_tech)
+
+        Returns:
+            Dictionary with company count and total valuation
+        """
+        self.ensure_fresh()
+
+        count, valuation = self.db.query(
+            func.coalesce(func.sum(VCSectorStats.company_count), 0),
+            func.coalesce(func.sum(VCSectorStats.total_valuation), 0),
+        ).filter_by(**filters).one()
+
+        return {
+            "company_count": int(count),
+            "total_valuation": float(valuation),
+        }
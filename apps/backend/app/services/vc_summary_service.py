@@ -0,0 +1,153 @@
+"""VC market summary service with concurrent SQL aggregates and write-invalidated caching."""
+
+import asyncio
+import time
+from itertools import chain
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.venture_capital import (
+    PrivateCompany,
+    FundingRound,
+    CompanyInvestor,
+    AcquisitionDeal,
+    PrivateValuation,
+    VentureCapitalFund,
+    IPOPipeline,
+)
+from app.services.venture_capital_service import VentureCapitalService
+
+
+VC_TABLES = {
+    model.__table__
+    for model in (
+        PrivateCompany,
+        FundingRound,
+        CompanyInvestor,
+        AcquisitionDeal,
+        PrivateValuation,
+        VentureCapitalFund,
+        IPOPipeline,
+    )
+}
+
+# Cached summaries: key -> (expires_at, summary)
+_summary_cache: dict[str, tuple[float, dict]] = {}
+
+# Bumped on every committed VC write so other in-process caches can detect staleness
+_vc_write_generation = 0
+
+
+def invalidate_vc_cache() -> None:
+    """Drop all cached VC summaries and mark derived in-process caches stale."""
+    global _vc_write_generation
+    _summary_cache.clear()
+    _vc_write_generation += 1
+
+
+def get_vc_write_generation() -> int:
+    """Get the VC write generation (changes whenever VC data is committed)."""
+    return _vc_write_generation
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_vc_orm_writes(session, flush_context):
+    """Flag sessions that flushed ORM changes to any VC table."""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__table__", None) in VC_TABLES:
+            session.info["vc_tables_written"] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_vc_bulk_writes(orm_execute_state):
+    """Flag sessions that ran bulk INSERT/UPDATE/DELETE statements on VC tables."""
+    state = orm_execute_state
+    if (state.is_insert or state.is_update or state.is_delete) and getattr(
+        state.statement, "table", None
+    ) in VC_TABLES:
+        state.session.info["vc_tables_written"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_vc_commit(session):
+    """Invalidate cached summaries once VC writes are committed."""
+    if session.info.pop("vc_tables_written", False):
+        invalidate_vc_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_vc_write_flag(session):
+    """Forget uncommitted VC writes."""
+    session.info.pop("vc_tables_written", None)
+
+
+def _run_aggregate(fn: Callable[[VentureCapitalService], Any]) -> Any:
+    """Run one aggregate against its own session (aggregates run in worker threads)."""
+    db = SessionLocal()
+    try:
+        return fn(VentureCapitalService(db))
+    finally:
+        db.close()
+
+
+async def get_vc_market_summary(days: int = 90) -> dict:
+    """
+    Get the VC market summary from concurrent COUNT/SUM/GROUP BY aggregates.
+
+    The independent aggregates run in parallel, each on its own session. The
+    result is cached until any VC table write is committed, or for at most
+    settings.vc_summary_cache_ttl_seconds.
+
+    Args:
+        days: Number of days of recent activity to summarize
+
+    Returns:
+        Dictionary with sector totals, recent activity, IPO pipeline and top investors
+    """
+    key = f"summary:{days}"
+    now = time.monotonic()
+    cached = _summary_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    ai, space, funding, acquisitions, ipo, investors = await asyncio.gather(
+        asyncio.to_thread(_run_aggregate, lambda s: s.get_company_totals(is_ai_focused=True)),
+        asyncio.to_thread(_run_aggregate, lambda s: s.get_company_totals(is_space_tech=True)),
+        asyncio.to_thread(_run_aggregate, lambda s: s.get_funding_totals(days)),
+        asyncio.to_thread(_run_aggregate, lambda s: s.get_acquisition_totals(days)),
+        asyncio.to_thread(_run_aggregate, lambda s: s.get_ipo_confidence_counts()),
+        asyncio.to_thread(_run_aggregate, lambda s: s.get_top_investors(limit=10)),
+    )
+
+    summary = {
+        "summary": {
+            "total_ai_companies": ai["company_count"],
+            "total_ai_valuation": ai["total_valuation"],
+            "total_space_tech_companies": space["company_count"],
+            "total_space_tech_valuation": space["total_valuation"],
+        },
+        "recent_activity": {
+            f"funding_rounds_{days}d": funding["total_funding_rounds"],
+            f"capital_raised_{days}d": funding["total_capital_raised"],
+            f"acquisitions_{days}d": acquisitions["total_deals"],
+            f"acquisition_value_{days}d": acquisitions["total_deal_value"],
+        },
+        "ipo_pipeline": {
+            "total_candidates": ipo["total_ipo_candidates"],
+            "high_confidence": ipo["high_confidence"],
+            "medium_confidence": ipo["medium_confidence"],
+            "low_confidence": ipo["low_confidence"],
+        },
+        "top_investors": {
+            "count": investors["top_investors"],
+            "sample": investors["investors"][:5],
+        },
+    }
+
+    _summary_cache[key] = (now + settings.vc_summary_cache_ttl_seconds, summary)
+    return summary
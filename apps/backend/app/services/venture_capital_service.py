@@ -4,8 +4,8 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, contains_eager, joinedload
 
 from app.models.venture_capital import (
     PrivateCompany,
@@ -15,7 +15,12 @@ from app.models.venture_capital import (
     PrivateValuation,
     VentureCapitalFund,
     IPOPipeline,
+    Investor,
 )
+from app.db.pagination import encode_cursor, keyset_page
+from app.services.fund_returns_service import FundReturnsService
+from app.services.valuation_trend_service import ValuationTrendService
+from app.services.vc_sector_stats_service import VCSectorStatsService
 
 
 class VentureCapitalService:
@@ -24,6 +29,49 @@ class VentureCapitalService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _get_fund_investments(self, fund: VentureCapitalFund) -> List[CompanyInvestor]:
+        """
+        Get a fund's investments with their companies loaded in the same query.
+
+        Investments are matched on the fund's investor entity ID; rows whose
+        investor has not been resolved yet fall back to the fund name.
+        """
+        fund_investor_ids = select(Investor.id).where(Investor.fund_id == fund.id)
+
+        return self.db.query(CompanyInvestor).options(
+            joinedload(CompanyInvestor.company)
+        ).filter(
+            or_(
+                CompanyInvestor.investor_id.in_(fund_investor_ids),
+                and_(
+                    CompanyInvestor.investor_id.is_(None),
+                    CompanyInvestor.investor_name == fund.fund_name,
+                ),
+            )
+        ).all()
+
+    def _get_acquisition_map(self, company_ids: List[int]) -> Dict[int, AcquisitionDeal]:
+        """
+        Prefetch the first recorded acquisition deal for each company in one query.
+
+        Args:
+            company_ids: IDs of acquired companies
+
+        Returns:
+            Dictionary mapping company ID to its acquisition deal
+        """
+        if not company_ids:
+            return {}
+
+        deals = self.db.query(AcquisitionDeal).filter(
+            AcquisitionDeal.target_company_id.in_(set(company_ids))
+        ).order_by(AcquisitionDeal.id).all()
+
+        acquisitions = {}
+        for deal in deals:
+            acquisitions.setdefault(deal.target_company_id, deal)
+        return acquisitions
+
     def get_portfolio_by_vc_fund(self, fund_id: int) -> Dict[str, Any]:
         """
         Get all companies invested by a specific VC fund.
@@ -42,9 +90,7 @@ class VentureCapitalService:
             return {"error": "Fund not found"}
 
         # Get all companies where this fund is an investor
-        investments = self.db.query(CompanyInvestor).filter(
-            CompanyInvestor.investor_name == fund.fund_name
-        ).all()
+        investments = self._get_fund_investments(fund)
 
         companies = []
         total_invested = Decimal(0)
@@ -88,24 +134,45 @@ class VentureCapitalService:
             }
         }
 
-    def get_ipo_pipeline(self, confidence_level: Optional[str] = None) -> Dict[str, Any]:
+    def get_ipo_pipeline(
+        self,
+        confidence_level: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Get companies expected to go public soon.
 
         Args:
             confidence_level: Filter by 'high', 'medium', or 'low' confidence
+            limit: Page size (all candidates if None)
+            cursor: Cursor from the previous page (keyset on readiness score, id)
 
         Returns:
-            Dictionary with IPO pipeline companies sorted by readiness
+            Dictionary with IPO pipeline companies sorted by readiness and
+            candidate counts (restricted to confidence_level when given)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
+        readiness = IPOPipeline.readiness_score
+
         query = self.db.query(IPOPipeline).join(
             PrivateCompany, IPOPipeline.company_id == PrivateCompany.id
-        )
+        ).options(contains_eager(IPOPipeline.company))
 
         if confidence_level:
             query = query.filter(IPOPipeline.confidence_level == confidence_level)
 
-        pipeline = query.order_by(IPOPipeline.readiness_score.desc()).all()
+        if limit is None:
+            pipeline = query.order_by(readiness.desc(), IPOPipeline.id.desc()).all()
+            next_cursor = None
+        else:
+            pipeline, next_cursor = keyset_page(
+                query, readiness, IPOPipeline.id, limit,
+                key=lambda ipo: (ipo.readiness_score, ipo.id),
+                cursor=cursor,
+            )
 
         companies = []
         for ipo in pipeline:
@@ -129,32 +196,50 @@ class VentureCapitalService:
             })
 
         return {
-            "total_ipo_candidates": len(companies),
-            "high_confidence": len([c for c in companies if c["confidence_level"] == "high"]),
-            "medium_confidence": len([c for c in companies if c["confidence_level"] == "medium"]),
-            "low_confidence": len([c for c in companies if c["confidence_level"] == "low"]),
+            **self.get_ipo_confidence_counts(confidence_level),
             "pipeline": companies,
+            "next_cursor": next_cursor,
         }
 
-    def track_acquisition_activity(self, days: int = 30) -> Dict[str, Any]:
+    def track_acquisition_activity(
+        self,
+        days: int = 30,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Get recent M&A activity from the past N days.
 
         Args:
             days: Number of days to look back
+            limit: Page size (all deals if None)
+            cursor: Cursor from the previous page (keyset on deal date, id)
 
         Returns:
-            Dictionary with acquisition deals sorted by date
+            Dictionary with acquisition deals sorted by date and period totals
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         cutoff_date = date.today() - timedelta(days=days)
 
-        deals = self.db.query(AcquisitionDeal).filter(
+        query = self.db.query(AcquisitionDeal).options(
+            joinedload(AcquisitionDeal.target_company)
+        ).filter(
             AcquisitionDeal.deal_date >= cutoff_date
-        ).order_by(AcquisitionDeal.deal_date.desc()).all()
+        )
 
-        acquisitions = []
-        total_deal_value = Decimal(0)
+        if limit is None:
+            deals = query.order_by(AcquisitionDeal.deal_date.desc(), AcquisitionDeal.id.desc()).all()
+            next_cursor = None
+        else:
+            deals, next_cursor = keyset_page(
+                query, AcquisitionDeal.deal_date, AcquisitionDeal.id, limit,
+                key=lambda deal: (deal.deal_date, deal.id),
+                cursor=cursor,
+            )
 
+        acquisitions = []
         for deal in deals:
             company = deal.target_company
             acquisitions.append({
@@ -171,113 +256,192 @@ class VentureCapitalService:
                 "status": deal.status,
                 "notes": deal.notes,
             })
-            if deal.acquisition_price:
-                total_deal_value += deal.acquisition_price
 
         return {
             "period_days": days,
-            "total_deals": len(acquisitions),
-            "total_deal_value": float(total_deal_value),
+            **self.get_acquisition_totals(days),
             "deals": acquisitions,
+            "next_cursor": next_cursor,
+        }
+
+    def _company_summary(self, company: PrivateCompany) -> Dict[str, Any]:
+        """Format a company for landscape listings."""
+        return {
+            "id": company.id,
+            "name": company.company_name,
+            "sector": company.sector,
+            "subsector": company.subsector,
+            "funding_stage": company.funding_stage,
+            "founded_date": company.founded_date.isoformat() if company.founded_date else None,
+            "headquarters": company.headquarters,
+            "is_ai_focused": company.is_ai_focused,
+            "is_space_tech": company.is_space_tech,
+            "valuation": float(company.estimated_valuation) if company.estimated_valuation else None,
+            "revenue_estimate": float(company.revenue_estimate) if company.revenue_estimate else None,
+            "employee_count": company.employee_count,
+            "status": company.status,
         }
 
-    def get_ai_startup_landscape(self) -> Dict[str, Any]:
+    def get_stage_aggregates(self, stage: Optional[str] = None, **filters: Any) -> Dict[str, Dict[str, Any]]:
         """
-        Get overview of AI-focused companies by funding stage.
+        Get company count and total/average valuation per funding stage.
+
+        Read from the vc_sector_stats materialization.
+
+        Args:
+            stage: Only return this funding stage
+            **filters: Key column filters (sector, is_ai_focused, is_space_tech)
 
         Returns:
-            Dictionary with AI companies grouped by stage and metrics
+            Dictionary mapping funding stage to count, total and average valuation
         """
-        ai_companies = self.db.query(PrivateCompany).filter(
-            PrivateCompany.is_ai_focused == True
-        ).all()
-
-        stages = {}
-        total_valuation = Decimal(0)
+        return VCSectorStatsService(self.db).get_stage_totals(stage=stage, **filters)
+
+    def get_stage_companies(
+        self,
+        limit: int,
+        stage: Optional[str] = None,
+        cursor: Optional[str] = None,
+        **filters: Any,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a page of companies for each funding stage.
 
-        for company in ai_companies:
-            stage = company.funding_stage or "unknown"
-            if stage not in stages:
-                stages[stage] = {
-                    "count": 0,
-                    "total_valuation": Decimal(0),
-                    "companies": [],
-                }
+        Without a stage, the first `limit` companies of every stage come back
+        from one ROW_NUMBER() query; with a stage, that stage is paged by
+        cursor.
 
-            stages[stage]["count"] += 1
-            if company.estimated_valuation:
-                stages[stage]["total_valuation"] += company.estimated_valuation
-                total_valuation += company.estimated_valuation
+        Args:
+            limit: Companies per stage
+            stage: Only list this funding stage
+            cursor: next_cursor of the previous page (requires stage)
+            **filters: Column equality filters (e.g. is_ai_focused=True)
 
-            stages[stage]["companies"].append({
-                "id": company.id,
-                "name": company.company_name,
-                "subsector": company.subsector,
-                "is_space_tech": company.is_space_tech,
-                "valuation": float(company.estimated_valuation) if company.estimated_valuation else None,
-                "revenue_estimate": float(company.revenue_estimate) if company.revenue_estimate else None,
-                "employee_count": company.employee_count,
-                "status": company.status,
-            })
+        Returns:
+            Dictionary mapping funding stage to companies and next_cursor
 
-        # Format output
-        landscape = {}
-        for stage, data in stages.items():
-            landscape[stage] = {
-                "company_count": data["count"],
-                "total_valuation": float(data["total_valuation"]),
-                "avg_valuation": float(data["total_valuation"] / data["count"]) if data["count"] > 0 else 0,
-                "companies": data["companies"],
-            }
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        if stage is not None:
+            query = self.db.query(PrivateCompany).filter_by(funding_stage=stage, **filters)
+            companies, next_cursor = keyset_page(
+                query, PrivateCompany.id, PrivateCompany.id, limit,
+                key=lambda c: (c.id, c.id),
+                cursor=cursor,
+            )
+            return {stage: {"companies": [self._company_summary(c) for c in companies], "next_cursor": next_cursor}}
+
+        ranked = select(
+            PrivateCompany.id,
+            func.row_number().over(
+                partition_by=PrivateCompany.funding_stage,
+                order_by=PrivateCompany.id.desc(),
+            ).label("position"),
+        ).where(
+            *(getattr(PrivateCompany, column) == value for column, value in filters.items())
+        ).subquery()
+
+        companies = self.db.query(PrivateCompany).join(
+            ranked, PrivateCompany.id == ranked.c.id
+        ).filter(
+            ranked.c.position <= limit + 1
+        ).order_by(PrivateCompany.id.desc()).all()
+
+        pages: Dict[str, Dict[str, Any]] = {}
+        for company in companies:
+            page = pages.setdefault(company.funding_stage or "unknown", {"companies": [], "next_cursor": None})
+            if len(page["companies"]) < limit:
+                page["companies"].append(self._company_summary(company))
+            else:
+                last_id = page["companies"][-1]["id"]
+                page["next_cursor"] = encode_cursor(last_id, last_id)
+        return pages
+
+    def _stage_landscape(
+        self,
+        include_companies: bool,
+        companies_limit: int,
+        stage: Optional[str],
+        cursor: Optional[str],
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """Build headline totals and per-stage aggregates, optionally with company pages."""
+        by_stage = self.get_stage_aggregates(stage=stage, **filters)
+
+        total_companies = sum(data["company_count"] for data in by_stage.values())
+        total_valuation = sum(data["total_valuation"] for data in by_stage.values())
+
+        if include_companies and by_stage:
+            pages = self.get_stage_companies(companies_limit, stage=stage, cursor=cursor, **filters)
+            for s, data in by_stage.items():
+                data.update(pages.get(s, {"companies": [], "next_cursor": None}))
 
         return {
-            "total_ai_companies": len(ai_companies),
-            "total_ai_valuation": float(total_valuation),
-            "by_stage": landscape,
+            "total_companies": total_companies,
+            "total_valuation": total_valuation,
+            "avg_valuation": total_valuation / total_companies if total_companies else 0,
+            "by_stage": by_stage,
         }
 
-    def get_space_tech_landscape(self) -> Dict[str, Any]:
+    def get_ai_startup_landscape(
+        self,
+        include_companies: bool = False,
+        companies_limit: int = 10,
+        stage: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
-        Get overview of space technology companies.
+        Get overview of AI-focused companies by funding stage.
+
+        Args:
+            include_companies: Add a page of companies to each stage
+            companies_limit: Companies per stage page
+            stage: Restrict to one funding stage
+            cursor: next_cursor of a stage's previous page (requires stage)
 
         Returns:
-            Dictionary with space tech companies and metrics
+            Dictionary with AI company counts and valuations grouped by stage
         """
-        space_companies = self.db.query(PrivateCompany).filter(
-            PrivateCompany.is_space_tech == True
-        ).all()
+        landscape = self._stage_landscape(
+            include_companies, companies_limit, stage, cursor, is_ai_focused=True
+        )
 
-        companies = []
-        total_valuation = Decimal(0)
-        by_stage = {}
+        return {
+            "total_ai_companies": landscape["total_companies"],
+            "total_ai_valuation": landscape["total_valuation"],
+            "avg_valuation": landscape["avg_valuation"],
+            "by_stage": landscape["by_stage"],
+        }
 
-        for company in space_companies:
-            stage = company.funding_stage or "unknown"
-            if stage not in by_stage:
-                by_stage[stage] = []
+    def get_space_tech_landscape(
+        self,
+        include_companies: bool = False,
+        companies_limit: int = 10,
+        stage: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get overview of space technology companies.
 
-            company_data = {
-                "id": company.id,
-                "name": company.company_name,
-                "sector": company.sector,
-                "subsector": company.subsector,
-                "founded_date": company.founded_date.isoformat() if company.founded_date else None,
-                "headquarters": company.headquarters,
-                "valuation": float(company.estimated_valuation) if company.estimated_valuation else None,
-                "status": company.status,
-                "employee_count": company.employee_count,
-            }
-            companies.append(company_data)
-            by_stage[stage].append(company_data)
+        Args:
+            include_companies: Add a page of companies to each stage
+            companies_limit: Companies per stage page
+            stage: Restrict to one funding stage
+            cursor: next_cursor of a stage's previous page (requires stage)
 
-            if company.estimated_valuation:
-                total_valuation += company.estimated_valuation
+        Returns:
+            Dictionary with space tech company counts and valuations grouped by stage
+        """
+        landscape = self._stage_landscape(
+            include_companies, companies_limit, stage, cursor, is_space_tech=True
+        )
 
         return {
-            "total_space_tech_companies": len(companies),
-            "total_valuation": float(total_valuation),
-            "by_stage": {stage: {"count": len(comps), "companies": comps} for stage, comps in by_stage.items()},
-            "companies": companies,
+            "total_space_tech_companies": landscape["total_companies"],
+            "total_valuation": landscape["total_valuation"],
+            "avg_valuation": landscape["avg_valuation"],
+            "by_stage": landscape["by_stage"],
         }
 
     def calculate_vc_fund_returns(self, fund_id: int) -> Dict[str, Any]:
@@ -298,9 +462,10 @@ class VentureCapitalService:
             return {"error": "Fund not found"}
 
         # Get all investments by this fund
-        investments = self.db.query(CompanyInvestor).filter(
-            CompanyInvestor.investor_name == fund.fund_name
-        ).all()
+        investments = self._get_fund_investments(fund)
+        acquisitions = self._get_acquisition_map(
+            [inv.company_id for inv in investments if inv.company.status == "acquired"]
+        )
 
         exited_companies = []
         active_companies = []
@@ -319,9 +484,7 @@ class VentureCapitalService:
 
                 # Try to find exit price from acquisitions
                 if company.status == "acquired":
-                    acquisition = self.db.query(AcquisitionDeal).filter(
-                        AcquisitionDeal.target_company_id == company.id
-                    ).first()
+                    acquisition = acquisitions.get(company.id)
                     if acquisition and acquisition.acquisition_price:
                         exit_value = acquisition.acquisition_price
                         if investment.stake_percentage:
@@ -358,6 +521,8 @@ class VentureCapitalService:
         else:
             multiple = 0
 
+        performance = FundReturnsService(self.db).calculate_fund_returns([fund.id])[fund.id]
+
         return {
             "fund": {
                 "id": fund.id,
@@ -375,33 +540,58 @@ class VentureCapitalService:
                 "unrealized_gain": float(current_portfolio_value - sum(
                     Decimal(inv["invested_amount"]) for inv in active_companies
                 )) if active_companies else 0,
+                "irr": performance["irr"],
+                "tvpi": performance["tvpi"],
+                "dpi": performance["dpi"],
+                "rvpi": performance["rvpi"],
             },
             "exited_companies": exited_companies,
             "active_companies": active_companies,
         }
 
-    def get_recent_funding_rounds(self, days: int = 90) -> Dict[str, Any]:
+    def get_recent_funding_rounds(
+        self,
+        days: int = 90,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Get recent funding rounds from the past N days.
 
         Args:
             days: Number of days to look back
+            limit: Page size (all rounds if None)
+            cursor: Cursor from the previous page (keyset on announcement date, id)
 
         Returns:
-            Dictionary with recent funding activity sorted by date
+            Dictionary with recent funding activity sorted by date and period totals
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         cutoff_date = date.today() - timedelta(days=days)
 
-        rounds = self.db.query(FundingRound).filter(
+        query = self.db.query(FundingRound).options(
+            joinedload(FundingRound.company)
+        ).filter(
             FundingRound.announcement_date >= cutoff_date
-        ).order_by(FundingRound.announcement_date.desc()).all()
+        )
 
-        funding_data = []
-        total_raised = Decimal(0)
+        if limit is None:
+            rounds = query.order_by(FundingRound.announcement_date.desc(), FundingRound.id.desc()).all()
+            next_cursor = None
+        else:
+            rounds, next_cursor = keyset_page(
+                query, FundingRound.announcement_date, FundingRound.id, limit,
+                key=lambda r: (r.announcement_date, r.id),
+                cursor=cursor,
+            )
 
+        funding_data = []
         for round_data in rounds:
             company = round_data.company
             funding_data.append({
+                "round_id": round_data.id,
                 "company_id": company.id,
                 "company_name": company.company_name,
                 "sector": company.sector,
@@ -416,14 +606,16 @@ class VentureCapitalService:
                 "investor_count": round_data.investor_count,
                 "notes": round_data.notes,
             })
-            total_raised += round_data.amount_raised
+
+        totals = self.get_funding_totals(days)
+        count = totals["total_funding_rounds"]
 
         return {
             "period_days": days,
-            "total_funding_rounds": len(funding_data),
-            "total_capital_raised": float(total_raised),
-            "avg_round_size": float(total_raised / len(funding_data)) if funding_data else 0,
+            **totals,
+            "avg_round_size": totals["total_capital_raised"] / count if count else 0,
             "rounds": funding_data,
+            "next_cursor": next_cursor,
         }
 
     def track_valuation_trends(self, company_id: int) -> Dict[str, Any]:
@@ -447,35 +639,36 @@ class VentureCapitalService:
             PrivateValuation.company_id == company_id
         ).order_by(PrivateValuation.valuation_date).all()
 
-        valuation_history = []
-        max_valuation = Decimal(0)
-        min_valuation = Decimal(0)
-
-        for val in valuations:
-            valuation_history.append({
+        valuation_history = [
+            {
                 "date": val.valuation_date.isoformat(),
                 "valuation": float(val.valuation),
                 "source": val.source,
                 "method": val.valuation_method,
-                "vs_previous": float(val.valuation_vs_previous) if val.valuation_vs_previous else None,
+                "vs_previous": float(val.valuation_vs_previous) if val.valuation_vs_previous is not None else None,
                 "notes": val.notes,
-            })
-            if val.valuation > max_valuation:
-                max_valuation = val.valuation
-            if min_valuation == 0 or val.valuation < min_valuation:
-                min_valuation = val.valuation
-
-        # Calculate trend
-        trend = None
-        if len(valuation_history) >= 2:
-            latest = valuations[-1].valuation
-            previous = valuations[-2].valuation
-            if latest > previous:
-                trend = "up"
-            elif latest < previous:
-                trend = "down"
-            else:
-                trend = "flat"
+            }
+            for val in valuations
+        ]
+
+        # Stats come from the batch trend job; recompute inline until it has run
+        stats = ValuationTrendService(self.db).get_company_trend(company_id)
+        if stats and stats.valuation_count == len(valuations):
+            max_valuation = stats.max_valuation or Decimal(0)
+            min_valuation = stats.min_valuation or Decimal(0)
+            trend = stats.trend
+            latest_change = float(stats.latest_change_percent) if stats.latest_change_percent is not None else None
+        else:
+            max_valuation = max((v.valuation for v in valuations), default=Decimal(0))
+            min_valuation = min((v.valuation for v in valuations), default=Decimal(0))
+            trend = None
+            latest_change = None
+            if len(valuations) >= 2:
+                latest = valuations[-1].valuation
+                previous = valuations[-2].valuation
+                trend = "up" if latest > previous else "down" if latest < previous else "flat"
+                if previous:
+                    latest_change = float((latest - previous) / previous * 100)
 
         return {
             "company": {
@@ -491,57 +684,47 @@ class VentureCapitalService:
                 "max_valuation": float(max_valuation),
                 "min_valuation": float(min_valuation),
                 "trend": trend,
+                "latest_change_percent": latest_change,
                 "history_count": len(valuation_history),
             },
             "history": valuation_history,
         }
 
-    def get_sector_overview(self, sector: str) -> Dict[str, Any]:
+    def get_sector_overview(
+        self,
+        sector: str,
+        include_companies: bool = False,
+        companies_limit: int = 10,
+        stage: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Get overview of companies in a specific sector.
 
         Args:
             sector: Sector name (e.g., 'AI', 'biotech', 'fintech', 'cleantech', 'space')
+            include_companies: Add a page of companies to each stage
+            companies_limit: Companies per stage page
+            stage: Restrict to one funding stage
+            cursor: next_cursor of a stage's previous page (requires stage)
 
         Returns:
-            Dictionary with sector metrics and companies
+            Dictionary with sector metrics grouped by stage (by_stage is empty
+            when the sector has no companies at the requested stage)
         """
-        companies = self.db.query(PrivateCompany).filter(
-            PrivateCompany.sector == sector
-        ).all()
+        landscape = self._stage_landscape(
+            include_companies, companies_limit, stage, cursor, sector=sector
+        )
 
-        if not companies:
+        # Unknown sectors are an error; a known sector with no companies at the stage is not
+        if not landscape["total_companies"] and (
+            stage is None or not self.get_company_totals(sector=sector)["company_count"]
+        ):
             return {"error": f"No companies found in sector: {sector}"}
 
-        by_stage = {}
-        total_valuation = Decimal(0)
-
-        for company in companies:
-            stage = company.funding_stage or "unknown"
-            if stage not in by_stage:
-                by_stage[stage] = []
-
-            company_data = {
-                "id": company.id,
-                "name": company.company_name,
-                "subsector": company.subsector,
-                "founded_date": company.founded_date.isoformat() if company.founded_date else None,
-                "funding_stage": stage,
-                "status": company.status,
-                "valuation": float(company.estimated_valuation) if company.estimated_valuation else None,
-                "employee_count": company.employee_count,
-            }
-            by_stage[stage].append(company_data)
-
-            if company.estimated_valuation:
-                total_valuation += company.estimated_valuation
-
         return {
             "sector": sector,
-            "total_companies": len(companies),
-            "total_valuation": float(total_valuation),
-            "avg_valuation": float(total_valuation / len(companies)) if companies else 0,
-            "by_stage": {stage: {"count": len(comps), "companies": comps} for stage, comps in by_stage.items()},
+            **landscape,
         }
 
     def get_top_investors(self, limit: int = 20) -> Dict[str, Any]:
@@ -580,3 +763,92 @@ class VentureCapitalService:
             "top_investors": len(investors),
             "investors": investors,
         }
+
+    def get_company_totals(self, **filters: Any) -> Dict[str, Any]:
+        """
+        Count companies and sum their estimated valuations.
+
+        Read from the vc_sector_stats materialization.
+
+        Args:
+            **filters: Key column filters (sector, funding_stage, is_ai_focused, is_space_tech)
+
+        Returns:
+            Dictionary with company count and total valuation
+        """
+        return VCSectorStatsService(self.db).get_totals(**filters)
+
+    def get_funding_totals(self, days: int = 90) -> Dict[str, Any]:
+        """
+        Count funding rounds and sum capital raised over the past N days in SQL.
+
+        Args:
+            days: Number of days to look back
+
+        Returns:
+            Dictionary with round count and total capital raised
+        """
+        cutoff_date = date.today() - timedelta(days=days)
+
+        count, total_raised = self.db.query(
+            func.count(FundingRound.id),
+            func.coalesce(func.sum(FundingRound.amount_raised), 0),
+        ).filter(
+            FundingRound.announcement_date >= cutoff_date
+        ).one()
+
+        return {
+            "total_funding_rounds": count,
+            "total_capital_raised": float(total_raised),
+        }
+
+    def get_acquisition_totals(self, days: int = 90) -> Dict[str, Any]:
+        """
+        Count acquisition deals and sum deal value over the past N days in SQL.
+
+        Args:
+            days: Number of days to look back
+
+        Returns:
+            Dictionary with deal count and total deal value
+        """
+        cutoff_date = date.today() - timedelta(days=days)
+
+        count, total_value = self.db.query(
+            func.count(AcquisitionDeal.id),
+            func.coalesce(func.sum(AcquisitionDeal.acquisition_price), 0),
+        ).filter(
+            AcquisitionDeal.deal_date >= cutoff_date
+        ).one()
+
+        return {
+            "total_deals": count,
+            "total_deal_value": float(total_value),
+        }
+
+    def get_ipo_confidence_counts(self, confidence_level: Optional[str] = None) -> Dict[str, int]:
+        """
+        Count IPO pipeline candidates per confidence level in SQL.
+
+        Args:
+            confidence_level: Count only candidates at this level (all if None)
+
+        Returns:
+            Dictionary with total and per-confidence candidate counts
+        """
+        query = self.db.query(
+            IPOPipeline.confidence_level,
+            func.count(IPOPipeline.id),
+        )
+        if confidence_level:
+            query = query.filter(IPOPipeline.confidence_level == confidence_level)
+        rows = query.group_by(IPOPipeline.confidence_level).all()
+
+        counts = {level: count for level, count in rows}
+
+        return {
+            "total_ipo_candidates": sum(counts.values()),
+            "high_confidence": counts.get("high", 0),
+            "medium_confidence": counts.get("medium", 0),
+            "low_confidence": counts.get("low", 0),
+        }
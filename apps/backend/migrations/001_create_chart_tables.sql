@@ -28,9 +28,9 @@ CREATE TABLE chart_signals (
     created_at TIMESTAMPTZ DEFAULT now()
 );
 
-CREATE INDEX idx_symbol_timeframe_date ON chart_signals(symbol, timeframe, date);
+CREATE INDEX idx_symbol_timeframe_date ON chart_signals(symbol, timeframe, signal_date);
 CREATE INDEX idx_signal_type ON chart_signals(signal_type);
-CREATE UNIQUE INDEX uq_symbol_timeframe_date ON chart_signals(symbol, timeframe, date);
+CREATE UNIQUE INDEX uq_symbol_timeframe_date ON chart_signals(symbol, timeframe, signal_date);
 
 CREATE TABLE chart_metadata (
     id BIGSERIAL PRIMARY KEY,
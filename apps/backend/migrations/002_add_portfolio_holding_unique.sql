@@ -0,0 +1,11 @@
+-- Migration: Enforce one holding per symbol per portfolio
+-- Required for bulk holdings import (INSERT ... ON CONFLICT on portfolio_id, symbol)
+
+-- Collapse existing duplicates, keeping the most recently inserted row
+DELETE FROM portfolio_holdings a
+USING portfolio_holdings b
+WHERE a.portfolio_id = b.portfolio_id
+  AND a.symbol = b.symbol
+  AND a.id < b.id;
+
+CREATE UNIQUE INDEX uq_portfolio_holding ON portfolio_holdings(portfolio_id, symbol);
@@ -0,0 +1,18 @@
+-- Migration: Tiered retention for portfolio snapshots
+-- Holdings content is deduplicated into portfolio_holdings_blobs by sha256 hash and
+-- each snapshot records the coarsest resolution it represents (0 daily, 1 week-end, 2 month-end)
+
+CREATE TABLE portfolio_holdings_blobs (
+    id BIGSERIAL PRIMARY KEY,
+    content_hash VARCHAR(64) NOT NULL,
+    holdings_json JSON NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_portfolio_holdings_blob_hash ON portfolio_holdings_blobs(content_hash);
+
+ALTER TABLE portfolio_snapshots
+    ADD COLUMN holdings_hash VARCHAR REFERENCES portfolio_holdings_blobs(content_hash),
+    ADD COLUMN resolution SMALLINT NOT NULL DEFAULT 0;
+
+CREATE INDEX idx_portfolio_snapshot_resolution ON portfolio_snapshots(portfolio_id, resolution, snapshot_date);
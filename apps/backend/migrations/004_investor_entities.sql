@@ -0,0 +1,50 @@
+-- Migration: Normalized investor entities and co-investment adjacency index
+-- company_investors.investor_name stays for display; joins use investor_id
+
+CREATE TABLE investors (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    normalized_name VARCHAR NOT NULL,
+    investor_type VARCHAR,
+    fund_id INTEGER REFERENCES venture_capital_funds(id),
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_investor_normalized_name ON investors(normalized_name);
+CREATE INDEX idx_investor_fund_id ON investors(fund_id);
+
+CREATE TABLE investor_aliases (
+    id BIGSERIAL PRIMARY KEY,
+    investor_id INTEGER NOT NULL REFERENCES investors(id),
+    alias VARCHAR NOT NULL,
+    normalized_alias VARCHAR NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_investor_alias ON investor_aliases(normalized_alias);
+CREATE INDEX idx_investor_alias_investor_id ON investor_aliases(investor_id);
+
+ALTER TABLE company_investors ADD COLUMN investor_id INTEGER REFERENCES investors(id);
+CREATE INDEX idx_company_investor_investor_id ON company_investors(investor_id);
+
+CREATE TABLE funding_round_investors (
+    id BIGSERIAL PRIMARY KEY,
+    funding_round_id INTEGER NOT NULL REFERENCES funding_rounds(id),
+    investor_id INTEGER NOT NULL REFERENCES investors(id),
+    is_lead BOOLEAN DEFAULT FALSE
+);
+
+CREATE UNIQUE INDEX uq_funding_round_investor ON funding_round_investors(funding_round_id, investor_id);
+CREATE INDEX idx_round_investor_investor_id ON funding_round_investors(investor_id);
+
+CREATE TABLE co_investment_edges (
+    id BIGSERIAL PRIMARY KEY,
+    investor_id INTEGER NOT NULL REFERENCES investors(id),
+    co_investor_id INTEGER NOT NULL REFERENCES investors(id),
+    shared_companies INTEGER NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_co_investment_edge ON co_investment_edges(investor_id, co_investor_id);
+CREATE INDEX idx_co_investment_investor_shared ON co_investment_edges(investor_id, shared_companies);
+CREATE INDEX idx_co_investment_shared ON co_investment_edges(shared_companies);
@@ -0,0 +1,15 @@
+-- Migration: Trigram indexes for fuzzy private company search
+-- Backs GET /venture-capital/companies/search (similarity, word_similarity, <% and prefix LIKE)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_private_company_name_trgm
+    ON private_companies USING gin (company_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_private_company_subsector_trgm
+    ON private_companies USING gin (subsector gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_private_company_description_trgm
+    ON private_companies USING gin (description gin_trgm_ops);
+
+-- Name prefix matches (lower(company_name) LIKE 'q%')
+CREATE INDEX IF NOT EXISTS idx_private_company_name_prefix
+    ON private_companies (lower(company_name) text_pattern_ops);
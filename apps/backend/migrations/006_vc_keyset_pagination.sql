@@ -0,0 +1,6 @@
+-- Migration: Indexes for keyset pagination of VC listing endpoints
+-- Pages are ordered by (sort key DESC, id DESC) and resume after the cursor row
+
+CREATE INDEX IF NOT EXISTS idx_funding_round_date_id ON funding_rounds(announcement_date, id);
+CREATE INDEX IF NOT EXISTS idx_acquisition_date_id ON acquisition_deals(deal_date, id);
+CREATE INDEX IF NOT EXISTS idx_ipo_pipeline_readiness_id ON ipo_pipeline((COALESCE(readiness_score, 0)), id);
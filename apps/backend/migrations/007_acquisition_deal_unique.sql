@@ -0,0 +1,12 @@
+-- Migration: Unique key for acquisition deals so bulk ingestion can upsert them
+
+-- Collapse existing duplicate (target, acquirer, date) rows, keeping the most recently inserted row
+DELETE FROM acquisition_deals a
+USING acquisition_deals b
+WHERE a.target_company_id = b.target_company_id
+  AND a.acquirer_name = b.acquirer_name
+  AND a.deal_date = b.deal_date
+  AND a.id < b.id;
+
+ALTER TABLE acquisition_deals
+    ADD CONSTRAINT uq_acquisition_deal UNIQUE (target_company_id, acquirer_name, deal_date);
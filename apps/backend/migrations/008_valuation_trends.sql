@@ -0,0 +1,34 @@
+-- Migration: Precomputed valuation trends and sector valuation index
+-- Filled by the batch trend job (window functions over private_valuations)
+
+CREATE TABLE company_valuation_trends (
+    id BIGSERIAL PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES private_companies(id),
+    valuation_count INTEGER NOT NULL,
+    first_valuation_date DATE,
+    first_valuation NUMERIC,
+    latest_valuation_date DATE,
+    latest_valuation NUMERIC,
+    previous_valuation NUMERIC,
+    max_valuation NUMERIC,
+    min_valuation NUMERIC,
+    latest_change_percent NUMERIC,
+    total_change_percent NUMERIC,
+    trend VARCHAR,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_company_valuation_trend ON company_valuation_trends(company_id);
+CREATE INDEX idx_valuation_trend_change ON company_valuation_trends(latest_change_percent);
+CREATE INDEX idx_valuation_trend_latest_date ON company_valuation_trends(latest_valuation_date);
+
+CREATE TABLE sector_valuation_index (
+    id BIGSERIAL PRIMARY KEY,
+    sector VARCHAR NOT NULL,
+    period_date DATE NOT NULL,
+    index_value NUMERIC NOT NULL,
+    avg_change_percent NUMERIC,
+    company_count INTEGER NOT NULL
+);
+
+CREATE UNIQUE INDEX uq_sector_valuation_index ON sector_valuation_index(sector, period_date);
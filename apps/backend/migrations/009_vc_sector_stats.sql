@@ -0,0 +1,39 @@
+-- Migration: Materialized per-sector/stage statistics for VC landscapes
+-- Maintained incrementally on ORM writes; rebuilt with POST /venture-capital/sector-stats/rebuild
+
+CREATE TABLE vc_sector_stats (
+    id BIGSERIAL PRIMARY KEY,
+    sector VARCHAR NOT NULL,
+    funding_stage VARCHAR NOT NULL,
+    is_ai_focused BOOLEAN NOT NULL,
+    is_space_tech BOOLEAN NOT NULL,
+    company_count INTEGER NOT NULL DEFAULT 0,
+    total_valuation NUMERIC NOT NULL DEFAULT 0,
+    round_count INTEGER NOT NULL DEFAULT 0,
+    capital_raised NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_vc_sector_stats ON vc_sector_stats(sector, funding_stage, is_ai_focused, is_space_tech);
+CREATE INDEX idx_vc_sector_stats_stage ON vc_sector_stats(funding_stage);
+
+INSERT INTO vc_sector_stats (
+    sector, funding_stage, is_ai_focused, is_space_tech,
+    company_count, total_valuation, round_count, capital_raised
+)
+SELECT
+    c.sector,
+    c.funding_stage,
+    COALESCE(c.is_ai_focused, FALSE),
+    COALESCE(c.is_space_tech, FALSE),
+    COUNT(c.id),
+    COALESCE(SUM(c.estimated_valuation), 0),
+    COALESCE(SUM(r.round_count), 0),
+    COALESCE(SUM(r.capital_raised), 0)
+FROM private_companies c
+LEFT JOIN (
+    SELECT company_id, COUNT(id) AS round_count, SUM(amount_raised) AS capital_raised
+    FROM funding_rounds
+    GROUP BY company_id
+) r ON r.company_id = c.id
+GROUP BY c.sector, c.funding_stage, COALESCE(c.is_ai_focused, FALSE), COALESCE(c.is_space_tech, FALSE);
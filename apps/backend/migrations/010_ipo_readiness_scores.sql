@@ -0,0 +1,12 @@
+-- Migration: Derived IPO readiness scores
+-- readiness_score/confidence_level are written by IPOReadinessService
+-- (POST /venture-capital/ipo-pipeline/score); 0 marks a candidate not yet scored
+
+UPDATE ipo_pipeline SET readiness_score = 0 WHERE readiness_score IS NULL;
+ALTER TABLE ipo_pipeline ALTER COLUMN readiness_score SET DEFAULT 0;
+ALTER TABLE ipo_pipeline ALTER COLUMN readiness_score SET NOT NULL;
+
+-- The pipeline is ordered by the plain column now that it cannot be NULL
+DROP INDEX IF EXISTS idx_ipo_pipeline_readiness_id;
+CREATE INDEX idx_ipo_pipeline_readiness_id ON ipo_pipeline(readiness_score, id);
+CREATE INDEX idx_ipo_pipeline_confidence_readiness ON ipo_pipeline(confidence_level, readiness_score, id);
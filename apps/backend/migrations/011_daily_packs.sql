@@ -0,0 +1,14 @@
+-- Migration: Precomputed daily pack documents
+-- One gzip-compressed JSON pack per daily run, written when the run is generated
+-- and served by GET / with a single keyed read
+
+CREATE TABLE daily_packs (
+    id SERIAL PRIMARY KEY,
+    daily_run_id INTEGER NOT NULL UNIQUE REFERENCES daily_runs(id),
+    date DATE NOT NULL UNIQUE,
+    etag VARCHAR NOT NULL,
+    body BYTEA NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
@@ -0,0 +1,18 @@
+-- Migration: Per-section outcomes and timing waterfall of daily run builds
+-- Written by the daily aggregation engine in the same transaction as the run
+
+CREATE TABLE daily_run_sections (
+    id SERIAL PRIMARY KEY,
+    daily_run_id INTEGER NOT NULL REFERENCES daily_runs(id),
+    section_id VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    error VARCHAR,
+    wave INTEGER NOT NULL,
+    depends_on JSON,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    start_ms DOUBLE PRECISION,
+    duration_ms DOUBLE PRECISION,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE UNIQUE INDEX uq_daily_run_section ON daily_run_sections(daily_run_id, section_id);
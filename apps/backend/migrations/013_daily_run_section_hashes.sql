@@ -0,0 +1,9 @@
+-- Migration: Content hashes and row tracking for section-level refreshes
+-- Sections are refetched only when failed, stale, named or when their input hash
+-- changes; snapshot rows are replaced only when the output hash changes
+
+ALTER TABLE daily_run_sections ADD COLUMN input_hash VARCHAR;
+ALTER TABLE daily_run_sections ADD COLUMN output_hash VARCHAR;
+ALTER TABLE daily_run_sections ADD COLUMN output JSON;
+ALTER TABLE daily_run_sections ADD COLUMN row_ids JSON;
+ALTER TABLE daily_run_sections ADD COLUMN fetched_at TIMESTAMPTZ;
@@ -0,0 +1,4 @@
+-- Migration: Listing date for private companies that went public
+-- Used by IPO readiness scoring for the sector IPO window (rows without it fall back to updated_at)
+
+ALTER TABLE private_companies ADD COLUMN ipo_date DATE;
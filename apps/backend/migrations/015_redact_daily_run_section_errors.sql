@@ -0,0 +1,6 @@
+-- Migration: Strip upstream URL query strings (API keys) from stored section errors
+-- Errors written before the engine redacted them quote the full request URL
+
+UPDATE daily_run_sections
+SET error = regexp_replace(error, '(https?://[^\s?''"]+)\?[^\s''"]*', '\1', 'g')
+WHERE error ~ 'https?://[^\s?''"]+\?';
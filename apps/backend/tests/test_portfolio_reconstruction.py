@@ -0,0 +1,91 @@
+"""Tests for rebuilding portfolio values from stored closes."""
+
+import asyncio
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# portfolio_service loads News, whose DailyRun relationships need the full model set
+pytest.importorskip("app.models.content")
+pytest.importorskip("app.models.events")
+
+from app.db.base import Base  # noqa: E402
+from app.models import daily_run, earnings, news, snapshots  # noqa: E402,F401
+from app.models.charts import ChartTimeseries  # noqa: E402
+from app.models.portfolio import PortfolioHolding, UserPortfolio  # noqa: E402
+from app.services.portfolio_service import PortfolioService  # noqa: E402
+
+
+START = date(2024, 3, 4)  # a Monday
+
+TABLES = ("user_portfolios", "portfolio_holdings_blobs", "portfolio_holdings", "portfolio_snapshots", "chart_timeseries")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    # Just the portfolio and price tables (tables only, as in test_query_counts)
+    with engine.begin() as conn:
+        for name in TABLES:
+            conn.execute(CreateTable(Base.metadata.tables[name]))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed(db, closes: dict[str, dict[date, str]]) -> int:
+    """Seed a portfolio holding 10 AAA at 100 and 4 BBB at 50 plus the given closes, and return its id."""
+    portfolio = UserPortfolio(user_id="user-1", name="Test")
+    db.add(portfolio)
+    db.flush()
+    db.add_all([
+        PortfolioHolding(portfolio_id=portfolio.id, symbol="AAA", quantity=Decimal("10"), avg_buy_price=Decimal("100")),
+        PortfolioHolding(portfolio_id=portfolio.id, symbol="BBB", quantity=Decimal("4"), avg_buy_price=Decimal("50")),
+    ])
+    for symbol, by_date in closes.items():
+        for day, close in by_date.items():
+            db.add(ChartTimeseries(symbol=symbol, asset_class="equity", date=day, close_price=Decimal(close)))
+    db.commit()
+    return portfolio.id
+
+
+def test_reconstructed_point_matches_snapshot(db):
+    friday = START + timedelta(days=4)
+    portfolio_id = _seed(db, {
+        "AAA": {START: "110", friday: "120"},
+        "BBB": {START: "45", START + timedelta(days=2): "48"},
+    })
+    service = PortfolioService(db)
+
+    # Snapshot Friday's value from the closes known on that day
+    prices = {"AAA": Decimal("120"), "BBB": Decimal("48")}
+    total_value, total_gain_loss = asyncio.run(service.calculate_portfolio_value(portfolio_id, prices))
+    snapshot = service.create_portfolio_snapshot(portfolio_id, friday, total_value, total_gain_loss)
+
+    points = {p["date"]: p for p in service.reconstruct_portfolio_series(portfolio_id, [(START, friday)])}
+
+    assert points[friday]["value"] == pytest.approx(float(snapshot.total_value))
+    assert points[friday]["gain_loss"] == pytest.approx(float(snapshot.total_gain_loss))
+
+
+def test_days_with_unpriced_holdings_are_left_out(db):
+    portfolio_id = _seed(db, {
+        "AAA": {START: "110", START + timedelta(days=1): "111", START + timedelta(days=2): "112"},
+        "BBB": {START + timedelta(days=2): "48"},
+    })
+
+    points = PortfolioService(db).reconstruct_portfolio_series(
+        portfolio_id, [(START, START + timedelta(days=2))]
+    )
+
+    assert [p["date"] for p in points] == [START + timedelta(days=2)]
+    assert points[0]["value"] == pytest.approx(10 * 112 + 4 * 48)
+    assert points[0]["gain_loss"] == pytest.approx(10 * 112 + 4 * 48 - (10 * 100 + 4 * 50))
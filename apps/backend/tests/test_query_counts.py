@@ -0,0 +1,138 @@
+"""Query-count regression tests for the eager-loaded venture capital endpoints.
+
+Each endpoint must issue a fixed number of SQL statements however many
+companies, rounds and deals it returns; a lazy load sneaking back in shows
+up as a count that grows with the seeded data.
+"""
+
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.db.base import Base  # noqa: E402
+from app.models.venture_capital import (  # noqa: E402
+    AcquisitionDeal,
+    CompanyInvestor,
+    FundingRound,
+    IPOPipeline,
+    PrivateCompany,
+    VentureCapitalFund,
+)
+from app.services.venture_capital_service import VentureCapitalService  # noqa: E402
+
+
+# Statements per call, independent of the number of rows returned
+EXPECTED_QUERIES = {
+    "get_portfolio_by_vc_fund": 2,
+    "calculate_vc_fund_returns": 10,
+    "get_ipo_pipeline": 2,
+    "track_acquisition_activity": 2,
+    "get_recent_funding_rounds": 2,
+}
+
+
+class QueryCounter:
+    """Count statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def _seed(db, companies: int) -> int:
+    """Seed one fund invested in `companies` companies, each with a round, and return its id."""
+    fund = VentureCapitalFund(fund_name="Query Count Ventures", fund_status="active")
+    db.add(fund)
+    today = date.today()
+    for i in range(companies):
+        status = ("active", "acquired", "ipo")[i % 3]
+        company = PrivateCompany(
+            company_name=f"Company {i}",
+            sector="AI",
+            funding_stage="series_a",
+            status=status,
+            estimated_valuation=Decimal(100_000_000 + i),
+        )
+        db.add(company)
+        db.add(CompanyInvestor(
+            company=company,
+            investor_name=fund.fund_name,
+            stake_percentage=Decimal("5"),
+            invested_amount=Decimal(1_000_000),
+            first_investment_date=today - timedelta(days=400),
+        ))
+        db.add(FundingRound(
+            company=company,
+            round_type="series_a",
+            announcement_date=today - timedelta(days=i % 30),
+            amount_raised=Decimal(10_000_000),
+            valuation=Decimal(50_000_000),
+        ))
+        db.add(IPOPipeline(company=company, readiness_score=i % 10, confidence_level="high"))
+        if status == "acquired":
+            db.add(AcquisitionDeal(
+                target_company=company,
+                acquirer_name=f"Acquirer {i}",
+                deal_date=today - timedelta(days=i % 30),
+                acquisition_price=Decimal(500_000_000),
+            ))
+    db.commit()
+    return fund.id
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    # Tables only: several VC index names are reused across tables, which
+    # SQLite rejects, and indexes don't change the statements issued
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+    yield engine
+    engine.dispose()
+
+
+def _calls(fund_id: int) -> dict:
+    return {
+        "get_portfolio_by_vc_fund": lambda s: s.get_portfolio_by_vc_fund(fund_id),
+        "calculate_vc_fund_returns": lambda s: s.calculate_vc_fund_returns(fund_id),
+        "get_ipo_pipeline": lambda s: s.get_ipo_pipeline(),
+        "track_acquisition_activity": lambda s: s.track_acquisition_activity(days=60),
+        "get_recent_funding_rounds": lambda s: s.get_recent_funding_rounds(days=60),
+    }
+
+
+@pytest.mark.parametrize("companies", [3, 30])
+@pytest.mark.parametrize("endpoint", sorted(EXPECTED_QUERIES))
+def test_query_count_is_constant(engine, endpoint, companies):
+    db = sessionmaker(bind=engine)()
+    try:
+        fund_id = _seed(db, companies)
+        db.expire_all()
+        call = _calls(fund_id)[endpoint]
+
+        with QueryCounter(engine) as counter:
+            result = call(VentureCapitalService(db))
+
+        assert "error" not in result
+        assert counter.count == EXPECTED_QUERIES[endpoint]
+    finally:
+        db.close()
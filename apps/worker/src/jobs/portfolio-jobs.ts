@@ -158,3 +158,41 @@ export async function handleGeneratePortfolioAlerts(job: Job): Promise<any> {
     throw error;
   }
 }
+
+/**
+ * Compact portfolio snapshots into daily/weekly/monthly retention tiers.
+ * Called weekly to downsample old snapshots and deduplicate unchanged holdings.
+ */
+export async function handleCompactPortfolioSnapshots(job: Job): Promise<any> {
+  try {
+    logger.info(`[Job ${job.id}] Starting portfolio snapshot compaction...`);
+
+    const response = await axios.post(
+      `${BACKEND_API_URL}/portfolio/snapshots/compact`,
+      {},
+      {
+        timeout: 120000, // Full-table pass over snapshots
+        headers: {
+          'Content-Type': 'application/json',
+        },
+      }
+    );
+
+    const result = response.data;
+
+    logger.info(
+      `[Job ${job.id}] Compacted snapshots: ${result.snapshots_deleted || 0} deleted, ${result.holdings_deduplicated || 0} holdings deduplicated`
+    );
+
+    return {
+      success: true,
+      snapshotsScanned: result.snapshots_scanned || 0,
+      snapshotsDeleted: result.snapshots_deleted || 0,
+      holdingsDeduplicated: result.holdings_deduplicated || 0,
+      timestamp: new Date().toISOString(),
+    };
+  } catch (error) {
+    logger.error(`[Job ${job.id}] Failed to compact portfolio snapshots`, error);
+    throw error;
+  }
+}
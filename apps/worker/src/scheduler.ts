@@ -227,6 +227,21 @@ export async function configureSchedules() {
     );
     logger.info('✓ Portfolio alerts: Daily at 18:00 UTC');
 
+    // Compact portfolio snapshots weekly on Sunday at 7 PM UTC
+    await portfolioQueue.add(
+      'compact-portfolio-snapshots',
+      {},
+      {
+        repeat: {
+          pattern: '0 19 * * 0', // Sundays at 7 PM UTC
+          tz: 'UTC',
+        },
+        removeOnComplete: true,
+        removeOnFail: false,
+      }
+    );
+    logger.info('✓ Portfolio snapshot compaction: Weekly Sundays at 19:00 UTC');
+
     // ==========================================
     // CHART & TECHNICAL ANALYSIS JOBS
     // ==========================================
@@ -344,4 +359,5 @@ export async function configureSchedules() {
  * WEEKLY JOBS:
  * - Monday 06:00 UTC: Top investors tracking
  * - Sunday 08:00 UTC: Chart summary
+ * - Sunday 19:00 UTC: Portfolio snapshot compaction
  */